@@ -1,8 +1,18 @@
 import streamlit as st
 import os
-from openai import OpenAI
+import sys
 import json
 
+# Make the shared ai_core package importable when launched via `streamlit run app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core import metrics
+from ai_core.cache import shared_cache
+from ai_core.client import shared_client
+from ai_core.fanout import FanOut
+from ai_core.storage import shared_store
+from ai_core.ui import get_user_id, pager, profile_panel, reported, rerun_profiler
+from generation import generate_recipe, get_recipe_suggestions
+
 # Page configuration
 st.set_page_config(
     page_title="AI Recipe Generator Agent",
@@ -10,94 +20,52 @@ st.set_page_config(
     layout="wide"
 )
 
-# Initialize OpenAI client
-@st.cache_resource
-def get_openai_client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
-        st.stop()
-    return OpenAI(api_key=api_key)
+# Rerun timing per section, shown in the sidebar with PROFILE_RERUNS=1 or ?profile=1 (see ai_core/profiling.py)
+profile = rerun_profiler()
+
+# OpenAI client (one async connection pool shared by all sessions, see ai_core/client.py)
+if not os.getenv("OPENAI_API_KEY"):
+    st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
+    st.stop()
+client = shared_client()
+
+# Per-call latency and token metrics, exported when METRICS_JSONL or METRICS_PORT is set (see ai_core/metrics.py)
+metrics.install_from_env()
 
-client = get_openai_client()
+# Response cache shared by all sessions (SQLite-backed by default, see ai_core/cache.py)
+response_cache = shared_cache()
+
+# Persistent history shared with the Pro app (SQLite, see ai_core/storage.py)
+store = shared_store()
+user_id = get_user_id()
 
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
 if "generated_recipe" not in st.session_state:
     st.session_state.generated_recipe = None
+if "suggestions" not in st.session_state:
+    st.session_state.suggestions = []
 
-def generate_recipe(ingredients, dietary_restrictions, cuisine_preference, skill_level, cooking_time):
-    """Generate a personalized recipe using OpenAI GPT-4"""
-    
-    system_prompt = """You are a professional chef and recipe developer with expertise in creating 
-    delicious, personalized recipes. You excel at working with available ingredients and adapting 
-    recipes to dietary needs and preferences. 
-    
-    When generating recipes, provide:
-    1. A creative recipe name
-    2. Brief description
-    3. Preparation time and cooking time
-    4. Difficulty level
-    5. Servings
-    6. Detailed ingredient list with measurements
-    7. Step-by-step cooking instructions
-    8. Helpful cooking tips
-    9. Nutritional information (approximate)
-    10. Possible variations or substitutions
-    
-    Format your response in a clear, structured way using markdown."""
-    
-    user_prompt = f"""Create a personalized recipe based on the following:
-
-Available Ingredients: {ingredients}
-Dietary Restrictions: {dietary_restrictions if dietary_restrictions else 'None'}
-Cuisine Preference: {cuisine_preference if cuisine_preference else 'Any'}
-Skill Level: {skill_level}
-Maximum Cooking Time: {cooking_time} minutes
-
-Please create a recipe that:
-- Primarily uses the available ingredients
-- Respects all dietary restrictions
-- Matches the cuisine preference if specified
-- Is appropriate for the skill level
-- Can be completed within the time limit
-- Suggests any additional common ingredients that might enhance the dish"""
+def render_stream(chunks, on_chunk=None):
+    """Render streamed markdown as it arrives and return the full text
 
+    on_chunk is called after every chunk, e.g. to render other results that finished meanwhile.
+    """
+    placeholder = st.empty()
+    text = ""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.8,
-            max_tokens=2000
-        )
-        
-        return response.choices[0].message.content
+        for chunk in chunks:
+            text += chunk
+            placeholder.markdown(text + "▌")
+            if on_chunk:
+                on_chunk()
     except Exception as e:
         st.error(f"Error generating recipe: {str(e)}")
         return None
+    placeholder.markdown(text)
+    return text
 
-def get_recipe_suggestions(ingredients):
-    """Get quick recipe ideas based on ingredients"""
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a helpful chef assistant. Suggest 5 quick recipe ideas based on given ingredients. Return only the recipe names, one per line."},
-                {"role": "user", "content": f"Suggest 5 recipe ideas using these ingredients: {ingredients}"}
-            ],
-            temperature=0.7,
-            max_tokens=200
-        )
-        
-        suggestions = response.choices[0].message.content.strip().split('\n')
-        return [s.strip('1234567890. -') for s in suggestions if s.strip()]
-    except Exception as e:
-        return []
+def render_suggestions(suggestions):
+    st.markdown("**💡 More ideas with these ingredients:** " + " · ".join(suggestions))
 
 # App Header
 st.title("👨‍🍳 AI Recipe Generator Agent")
@@ -105,7 +73,7 @@ st.markdown("### Create personalized recipes based on your available ingredients
 st.markdown("---")
 
 # Sidebar for inputs
-with st.sidebar:
+with st.sidebar, profile.section("sidebar"):
     st.header("🥘 Recipe Preferences")
     
     # Ingredients input
@@ -154,6 +122,12 @@ with st.sidebar:
     
     st.markdown("---")
     
+    stream_output = st.toggle(
+        "⚡ Stream recipe as it is written",
+        value=True,
+        help="Show the recipe while it is being generated instead of waiting for the full response"
+    )
+    
     # Generate button
     generate_button = st.button("🔥 Generate Recipe", type="primary", use_container_width=True)
     
@@ -170,33 +144,74 @@ with st.sidebar:
 # Main content area
 col1, col2 = st.columns([2, 1])
 
-with col1:
+with col1, profile.section("recipe"):
     if generate_button:
         if not ingredients or len(ingredients.strip()) == 0:
             st.warning("⚠️ Please enter at least some ingredients to generate a recipe.")
         else:
-            with st.spinner("👨‍🍳 Creating your personalized recipe..."):
-                recipe = generate_recipe(
+            # Quick ideas only need the ingredients, so fetch them while the recipe is generated
+            extras = FanOut(max_workers=1)
+            extras.submit("suggestions", get_recipe_suggestions, ingredients)
+            suggestions_slot = st.empty()
+            suggestions = []
+            
+            def show_suggestions(block=False):
+                for _, result in (extras.wait() if block else extras.ready()):
+                    suggestions.extend(result)
+                    if result:
+                        with suggestions_slot.container():
+                            render_suggestions(result)
+            
+            if stream_output:
+                st.markdown("## 📖 Your Personalized Recipe")
+                chunks = reported(
+                    "generating recipe",
+                    generate_recipe,
                     ingredients, 
                     dietary_restrictions, 
                     cuisine_preference, 
                     skill_level, 
-                    cooking_time
+                    cooking_time,
+                    stream=True,
+                    client=client,
+                    cache=response_cache
                 )
-                
-                if recipe:
-                    st.session_state.generated_recipe = recipe
-                    st.session_state.messages.append({
-                        "ingredients": ingredients,
-                        "restrictions": dietary_restrictions,
-                        "cuisine": cuisine_preference,
-                        "skill": skill_level,
-                        "time": cooking_time,
-                        "recipe": recipe
-                    })
+                recipe = render_stream(chunks, on_chunk=show_suggestions) if chunks else None
+            else:
+                with st.spinner("👨‍🍳 Creating your personalized recipe..."):
+                    recipe = reported(
+                        "generating recipe",
+                        generate_recipe,
+                        ingredients, 
+                        dietary_restrictions, 
+                        cuisine_preference, 
+                        skill_level, 
+                        cooking_time,
+                        client=client,
+                        cache=response_cache
+                    )
+            
+            if recipe:
+                show_suggestions(block=True)
+            extras.close()
+            
+            if recipe:
+                st.session_state.generated_recipe = recipe
+                st.session_state.suggestions = suggestions
+                store.add_history(user_id, "recipe", {
+                    "ingredients": ingredients,
+                    "restrictions": dietary_restrictions,
+                    "cuisine": cuisine_preference,
+                    "skill": skill_level,
+                    "time": cooking_time
+                }, recipe)
+                # Re-render once so the live draft is replaced by the final view
+                st.rerun()
     
     # Display generated recipe
     if st.session_state.generated_recipe:
+        if st.session_state.suggestions:
+            render_suggestions(st.session_state.suggestions)
         st.markdown("## 📖 Your Personalized Recipe")
         st.markdown(st.session_state.generated_recipe)
         
@@ -229,21 +244,34 @@ with col1:
         - ✅ Suggests variations and substitutions
         """)
 
-with col2:
+with col2, profile.section("history"):
     st.markdown("### 📝 Recipe History")
     
-    if st.session_state.messages:
-        for idx, msg in enumerate(reversed(st.session_state.messages[-5:]), 1):
-            with st.expander(f"Recipe {len(st.session_state.messages) - idx + 1}"):
-                st.write(f"**Ingredients:** {msg['ingredients'][:50]}...")
-                st.write(f"**Cuisine:** {msg['cuisine']}")
-                st.write(f"**Skill Level:** {msg['skill']}")
-                if st.button(f"View Recipe {len(st.session_state.messages) - idx + 1}", key=f"view_{idx}"):
-                    st.session_state.generated_recipe = msg['recipe']
-                    st.rerun()
+    search_text = st.text_input("🔍 Search history", placeholder="e.g., chicken thai", key="history_search")
+    total_recipes = store.count_history(user_id, "recipe")
+    entries, titles = [], []
+    if search_text:
+        entries = store.search(user_id, "recipe", search_text, limit=10)
+        titles = [f"Match {idx + 1} - {msg['timestamp']}" for idx, msg in enumerate(entries)]
+        if not entries:
+            st.info("No matching recipes.")
+    elif total_recipes:
+        offset = pager("History", total_recipes, 5, key="history_page")
+        entries = store.history(user_id, "recipe", limit=5, offset=offset)
+        titles = [f"Recipe {total_recipes - offset - idx}" for idx in range(len(entries))]
     else:
         st.info("No recipes generated yet. Start by entering your ingredients!")
     
+    for msg, title in zip(entries, titles):
+        with st.expander(title):
+            st.write(f"**Ingredients:** {msg['ingredients'][:50]}...")
+            st.write(f"**Cuisine:** {msg['cuisine']}")
+            st.write(f"**Skill Level:** {msg.get('skill', 'N/A')}")
+            if st.button("View Recipe", key=f"view_{msg['id']}"):
+                st.session_state.generated_recipe = msg['content']
+                st.session_state.suggestions = []
+                st.rerun()
+    
     # Tips section
     st.markdown("---")
     st.markdown("### 💡 Cooking Tips")
@@ -266,3 +294,6 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+# Debug panel with the slowest sections (only when profiling is enabled)
+profile_panel(profile)
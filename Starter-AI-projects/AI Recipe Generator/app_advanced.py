@@ -1,9 +1,33 @@
 import streamlit as st
 import os
-from openai import OpenAI
+import sys
 import json
+import html
 from datetime import datetime
 
+# Make the shared ai_core package importable when launched via `streamlit run app_advanced.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core import metrics
+from ai_core.cache import shared_cache
+from ai_core.client import shared_client
+from ai_core.fanout import FanOut
+from ai_core.scheduler import BATCH
+from ai_core.storage import shared_store
+from ai_core.ui import get_user_id, pager, profile_panel, reported, rerun_profiler
+from recipe_schema import Recipe, render_markdown
+from pantry import Pantry
+from shopping import build_shopping_list, format_shopping_list
+from units import canonical_unit
+from nutrition import analyze_recipe, analyze_recipes, combine, parse_servings
+from scaling import scale_markdown, scale_recipe
+from recipe_prompt import MARKDOWN_MAX_TOKENS
+from model_routing import AUTO, FAST_MODEL, MODEL_CHOICES, route
+from similar_recipes import SimilarRecipes, threshold_from_env
+from generation import (
+    generate_meal_plan, generate_recipe_with_nutrition, generate_shopping_list, generate_speculative_shopping_list,
+    get_recipe_suggestions, get_routing_budget,
+)
+
 # Page configuration
 st.set_page_config(
     page_title="AI Recipe Generator Agent Pro",
@@ -12,8 +36,12 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Rerun timing per section, shown in the sidebar with PROFILE_RERUNS=1 or ?profile=1 (see ai_core/profiling.py)
+profile = rerun_profiler()
+
 # Custom CSS for better styling
-st.markdown("""
+with profile.section("css"):
+    st.markdown("""
 <style>
     .recipe-card {
         background-color: #f0f2f6;
@@ -21,6 +49,10 @@ st.markdown("""
         border-radius: 10px;
         margin: 10px 0;
     }
+    .ingredient-tag.expiring {
+        background-color: #fdecea;
+        color: #b42318;
+    }
     .ingredient-tag {
         display: inline-block;
         background-color: #e8f4f8;
@@ -41,161 +73,100 @@ st.markdown("""
         width: 100%;
     }
 </style>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
+
+# OpenAI client (one async connection pool shared by all sessions, see ai_core/client.py)
+if not os.getenv("OPENAI_API_KEY"):
+    st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
+    st.stop()
+client = shared_client()
+
+# Per-call latency and token metrics, exported when METRICS_JSONL or METRICS_PORT is set (see ai_core/metrics.py)
+metrics.install_from_env()
 
-# Initialize OpenAI client
+# Response cache shared by all sessions (SQLite-backed by default, see ai_core/cache.py)
+response_cache = shared_cache()
+
+# Persistent history, favorites and pantry (SQLite, see ai_core/storage.py)
+store = shared_store()
+user_id = get_user_id()
+
+# Previously generated recipes shared by all sessions, checked before each new
+# generation for near-duplicate requests (see similar_recipes.py)
 @st.cache_resource
-def get_openai_client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
-        st.stop()
-    return OpenAI(api_key=api_key)
+def get_similar_recipes():
+    similar = SimilarRecipes(threshold=threshold_from_env())
+    for entry in reversed(store.recent_history("recipe", limit=2000)):
+        similar.add(entry)
+    return similar
 
-client = get_openai_client()
+similar_recipes = get_similar_recipes()
 
 # Initialize session state
-if "messages" not in st.session_state:
-    st.session_state.messages = []
 if "generated_recipe" not in st.session_state:
     st.session_state.generated_recipe = None
-if "favorites" not in st.session_state:
-    st.session_state.favorites = []
 if "ingredient_pantry" not in st.session_state:
-    st.session_state.ingredient_pantry = []
+    st.session_state.ingredient_pantry = Pantry.from_list(store.load_value(user_id, "recipe", "pantry", []))
+if "quick_ideas" not in st.session_state:
+    st.session_state.quick_ideas = []
+if "shopping_list" not in st.session_state:
+    st.session_state.shopping_list = None
+if "recipe_data" not in st.session_state:
+    st.session_state.recipe_data = None
+if "similar_match" not in st.session_state:
+    st.session_state.similar_match = None
+if "nutrition" not in st.session_state:
+    st.session_state.nutrition = None
 
-def generate_recipe_with_nutrition(ingredients, dietary_restrictions, cuisine_preference, 
-                                   skill_level, cooking_time, servings, meal_type):
-    """Generate a detailed recipe with nutritional information"""
-    
-    system_prompt = """You are an expert chef and nutritionist with 20 years of experience. 
-    You create delicious, balanced recipes that are both tasty and nutritious.
-    
-    Provide recipes in the following structured format:
-    
-    # [Recipe Name]
-    
-    ## Description
-    [A compelling 2-3 sentence description]
-    
-    ## Info
-    - **Prep Time:** X minutes
-    - **Cook Time:** X minutes
-    - **Total Time:** X minutes
-    - **Difficulty:** [Beginner/Intermediate/Advanced]
-    - **Servings:** X
-    - **Meal Type:** [Breakfast/Lunch/Dinner/Snack/Dessert]
-    
-    ## Ingredients
-    [List with exact measurements]
-    
-    ## Instructions
-    [Detailed numbered steps]
-    
-    ## Cooking Tips
-    [Professional tips and tricks]
-    
-    ## Nutritional Information (per serving)
-    - Calories: X kcal
-    - Protein: X g
-    - Carbohydrates: X g
-    - Fat: X g
-    - Fiber: X g
-    - Sugar: X g
-    
-    ## Variations
-    [Possible substitutions and variations]
-    
-    ## Wine/Beverage Pairing
-    [Suggested drink pairing]
-    """
-    
-    user_prompt = f"""Create an exceptional {meal_type} recipe with these specifications:
+def save_pantry():
+    store.save_value(user_id, "recipe", "pantry", st.session_state.ingredient_pantry.to_list())
 
-**Available Ingredients:** {ingredients}
-**Dietary Restrictions:** {dietary_restrictions if dietary_restrictions else 'None'}
-**Cuisine:** {cuisine_preference if cuisine_preference else 'Any'}
-**Skill Level:** {skill_level}
-**Max Cooking Time:** {cooking_time} minutes
-**Servings:** {servings}
-
-Requirements:
-1. Make the best use of available ingredients
-2. Strictly follow dietary restrictions
-3. Match the cuisine style
-4. Be appropriate for skill level
-5. Complete within time limit
-6. Provide accurate nutritional estimates
-7. Include professional cooking techniques
-8. Suggest complementary ingredients if needed"""
+def render_stream(chunks, on_chunk=None):
+    """Render streamed markdown as it arrives and return the full text
 
+    on_chunk is called after every chunk, e.g. to render other results that finished meanwhile.
+    """
+    placeholder = st.empty()
+    text = ""
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.8,
-            max_tokens=2500
-        )
-        
-        return response.choices[0].message.content
+        for chunk in chunks:
+            text += chunk
+            placeholder.markdown(text + "▌")
+            if on_chunk:
+                on_chunk()
     except Exception as e:
         st.error(f"Error generating recipe: {str(e)}")
         return None
+    placeholder.markdown(text)
+    return text
 
-def generate_meal_plan(ingredients, days, dietary_restrictions):
-    """Generate a multi-day meal plan"""
-    
-    system_prompt = """You are a meal planning expert. Create balanced, varied meal plans 
-    that use available ingredients efficiently and minimize food waste."""
-    
-    user_prompt = f"""Create a {days}-day meal plan using these ingredients: {ingredients}
-    
-Dietary Restrictions: {dietary_restrictions if dietary_restrictions else 'None'}
-
-For each day provide:
-- Breakfast
-- Lunch
-- Dinner
-- Snack (optional)
+def render_quick_ideas(ideas):
+    st.markdown("**💡 More ideas with these ingredients:** " + " · ".join(ideas))
 
-Include brief descriptions and ensure variety across days."""
+def render_shopping_list(shopping_list):
+    st.markdown(f"### {shopping_list['title']}")
+    st.markdown(shopping_list['text'])
 
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=2000
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating meal plan: {str(e)}")
-        return None
+def render_nutrition(nutrition, title="📊 Nutrition per Serving"):
+    """Show locally computed nutrition (a ``Nutrition``) as metrics"""
+    st.markdown(f"### {title}")
+    cols = st.columns(6)
+    cols[0].metric("Calories", f"{nutrition.calories:.0f} kcal")
+    cols[1].metric("Protein", f"{nutrition.protein:.0f} g")
+    cols[2].metric("Carbs", f"{nutrition.carbohydrates:.0f} g")
+    cols[3].metric("Fat", f"{nutrition.fat:.0f} g")
+    cols[4].metric("Fiber", f"{nutrition.fiber:.0f} g")
+    cols[5].metric("Sugar", f"{nutrition.sugar:.0f} g")
 
-def generate_shopping_list(recipe_text, pantry_items):
-    """Generate a shopping list from recipe minus pantry items"""
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "Extract ingredients from recipe and create a shopping list. Remove items already in pantry. Format as a clean bullet list."},
-                {"role": "user", "content": f"Recipe:\n{recipe_text}\n\nPantry Items:\n{', '.join(pantry_items) if pantry_items else 'None'}"}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        return None
+def render_extra(name, result, slots):
+    """Render a finished fan-out result into its placeholder"""
+    if not result:
+        return
+    with slots[name].container():
+        if name == "quick_ideas":
+            render_quick_ideas(result)
+        else:
+            render_shopping_list({"title": "🛒 Likely Shopping List", "text": result})
 
 # App Header
 st.title("👨‍🍳 AI Recipe Generator Agent Pro")
@@ -205,14 +176,42 @@ st.markdown("### Your personal AI chef with advanced features")
 tab1, tab2, tab3, tab4 = st.tabs(["🥘 Recipe Generator", "📅 Meal Planner", "❤️ Favorites", "🛒 Pantry"])
 
 # Sidebar for common inputs
-with st.sidebar:
+with st.sidebar, profile.section("sidebar"):
     st.header("⚙️ Settings")
     
     # Model selection
     model_choice = st.selectbox(
         "AI Model",
-        ["gpt-4o-mini (Fast & Cheap)", "gpt-4o (Balanced)", "gpt-4 (Best Quality)"],
-        help="Choose based on speed vs quality preference"
+        list(MODEL_CHOICES),
+        help="Choose based on speed vs quality preference. Recipe ideas and shopping lists always use "
+             "the fast model; Auto uses the bigger model only for full recipes."
+    )
+    if model_choice == AUTO:
+        recipe_model = route("recipe", AUTO, get_routing_budget(), max_tokens=MARKDOWN_MAX_TOKENS)
+        st.caption(f"Full recipes use {recipe_model}, everything else {FAST_MODEL}")
+    
+    stream_output = st.toggle(
+        "⚡ Stream responses",
+        value=True,
+        help="Show recipes while they are being generated instead of waiting for the full response"
+    )
+    
+    structured_output = st.toggle(
+        "🧩 Structured recipes",
+        value=False,
+        help="Ask for recipes as structured data - enables instant local shopping lists (no streaming)"
+    )
+    
+    prefetch_extras = st.toggle(
+        "🚀 Prefetch ideas & shopping list",
+        value=True,
+        help="Fetch quick ideas and a likely shopping list at the same time as the recipe"
+    )
+    
+    reuse_similar = st.toggle(
+        "♻️ Offer similar recipes",
+        value=True,
+        help="Before generating, check whether a recipe for a near-identical request already exists"
     )
     
     st.markdown("---")
@@ -223,18 +222,27 @@ with st.sidebar:
         st.info("Coming soon! Will generate a random recipe from your pantry.")
     
     if st.button("📊 Nutrition Analysis", use_container_width=True):
-        st.info("Coming soon! Will analyze nutritional balance.")
+        if st.session_state.generated_recipe:
+            recipe_data = st.session_state.recipe_data
+            st.session_state.nutrition = {
+                "recipe": st.session_state.generated_recipe,
+                "result": analyze_recipe(
+                    Recipe.from_dict(recipe_data) if recipe_data else st.session_state.generated_recipe
+                )
+            }
+        else:
+            st.info("Generate or open a recipe first to analyze its nutrition.")
     
     st.markdown("---")
     
     # Statistics
     st.subheader("📈 Your Stats")
-    st.metric("Recipes Generated", len(st.session_state.messages))
-    st.metric("Favorites Saved", len(st.session_state.favorites))
+    st.metric("Recipes Generated", store.count_history(user_id, "recipe"))
+    st.metric("Favorites Saved", store.count_favorites(user_id, "recipe"))
     st.metric("Pantry Items", len(st.session_state.ingredient_pantry))
 
 # TAB 1: Recipe Generator
-with tab1:
+with tab1, profile.section("recipe"):
     col_left, col_right = st.columns([2, 1])
     
     with col_left:
@@ -303,50 +311,177 @@ with tab1:
         with col_btn1:
             generate_button = st.button("🔥 Generate Recipe", type="primary", use_container_width=True)
         with col_btn2:
-            if st.button("💡 Quick Ideas", use_container_width=True):
-                st.info("Getting quick recipe ideas...")
+            ideas_button = st.button("💡 Quick Ideas", use_container_width=True)
+        
+        if ideas_button:
+            if not ingredients or len(ingredients.strip()) == 0:
+                st.warning("⚠️ Please enter at least some ingredients.")
+            else:
+                with st.spinner("Getting recipe ideas..."):
+                    st.session_state.quick_ideas = get_recipe_suggestions(ingredients)
+        
+        # Filled live by the fan-out while a recipe is generating
+        slots = {"quick_ideas": st.empty(), "shopping_list": st.empty()}
+        if st.session_state.quick_ideas:
+            with slots["quick_ideas"].container():
+                render_quick_ideas(st.session_state.quick_ideas)
         
         # Display recipe
-        if generate_button:
+        generate_anyway = st.session_state.pop("generate_anyway", False)
+        if generate_button or generate_anyway:
+            request = {
+                "ingredients": ingredients,
+                "restrictions": dietary_restrictions,
+                "cuisine": cuisine_preference,
+                "skill": skill_level,
+                "time": cooking_time,
+                "servings": servings,
+                "meal_type": meal_type
+            }
+            matches = []
+            if reuse_similar and not generate_anyway and ingredients.strip():
+                matches = similar_recipes.find(request)
+            st.session_state.similar_match = None
+            
             if not ingredients or len(ingredients.strip()) == 0:
                 st.warning("⚠️ Please enter at least some ingredients.")
+            elif matches:
+                score, entry = matches[0]
+                st.session_state.similar_match = {"score": score, "entry": entry}
             else:
-                with st.spinner("👨‍🍳 Creating your personalized recipe..."):
-                    recipe = generate_recipe_with_nutrition(
+                # Ideas and a speculative shopping list only need the inputs, so they
+                # run concurrently with the recipe instead of after it
+                extras = FanOut()
+                if prefetch_extras:
+                    extras.submit("quick_ideas", get_recipe_suggestions, ingredients, priority=BATCH)
+                    extras.submit(
+                        "shopping_list", generate_speculative_shopping_list,
+                        ingredients, cuisine_preference, meal_type,
+                        list(st.session_state.ingredient_pantry)
+                    )
+                finished = {}
+                
+                def show_ready_extras():
+                    for name, result in extras.ready():
+                        finished[name] = result
+                        render_extra(name, result, slots)
+                
+                structured = None
+                if structured_output:
+                    with st.spinner("👨‍🍳 Creating your personalized recipe..."):
+                        structured = reported(
+                            "generating recipe", generate_recipe_with_nutrition,
+                            ingredients, dietary_restrictions, cuisine_preference, 
+                            skill_level, cooking_time, servings, meal_type, structured=True,
+                            model_choice=model_choice
+                        )
+                        show_ready_extras()
+                    recipe = render_markdown(structured) if structured else None
+                elif stream_output:
+                    st.markdown("---")
+                    st.markdown("## 📖 Your Recipe")
+                    chunks = reported(
+                        "generating recipe", generate_recipe_with_nutrition,
                         ingredients, dietary_restrictions, cuisine_preference, 
-                        skill_level, cooking_time, servings, meal_type
+                        skill_level, cooking_time, servings, meal_type, stream=True,
+                        model_choice=model_choice
                     )
-                    
-                    if recipe:
-                        st.session_state.generated_recipe = recipe
-                        recipe_data = {
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "ingredients": ingredients,
-                            "restrictions": dietary_restrictions,
-                            "cuisine": cuisine_preference,
-                            "skill": skill_level,
-                            "time": cooking_time,
-                            "servings": servings,
-                            "meal_type": meal_type,
-                            "recipe": recipe
-                        }
-                        st.session_state.messages.append(recipe_data)
+                    recipe = render_stream(chunks, on_chunk=show_ready_extras) if chunks else None
+                else:
+                    with st.spinner("👨‍🍳 Creating your personalized recipe..."):
+                        recipe = reported(
+                            "generating recipe", generate_recipe_with_nutrition,
+                            ingredients, dietary_restrictions, cuisine_preference, 
+                            skill_level, cooking_time, servings, meal_type,
+                            model_choice=model_choice
+                        )
+                
+                if recipe and len(extras):
+                    with st.spinner("Finishing ideas and shopping list..."):
+                        for name, result in extras.wait():
+                            finished[name] = result
+                            render_extra(name, result, slots)
+                extras.close()
+                
+                if recipe:
+                    st.session_state.generated_recipe = recipe
+                    st.session_state.recipe_data = structured.to_dict() if structured else None
+                    if prefetch_extras:
+                        st.session_state.quick_ideas = finished.get("quick_ideas") or []
+                    speculative_list = finished.get("shopping_list")
+                    st.session_state.shopping_list = {
+                        "title": "🛒 Likely Shopping List", "text": speculative_list
+                    } if speculative_list else None
+                    recipe_data = {
+                        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        **request
+                    }
+                    store.add_history(user_id, "recipe", recipe_data, recipe, st.session_state.recipe_data)
+                    similar_recipes.add({
+                        **recipe_data, "content": recipe, "structured": st.session_state.recipe_data
+                    })
+                    # Re-render once so the live draft and extras are replaced by the final view
+                    st.rerun()
+        
+        if st.session_state.similar_match:
+            match = st.session_state.similar_match
+            entry = match["entry"]
+            st.info(
+                f"♻️ A similar recipe already exists ({match['score']:.0%} match, "
+                f"{entry.get('servings', '?')} servings, {entry.get('time', '?')} min). "
+                "Use it instead of generating a new one?"
+            )
+            with st.expander(f"Similar recipe: {entry['ingredients'][:60]}", expanded=False):
+                st.markdown(entry["content"])
+            col_use, col_new = st.columns(2)
+            with col_use:
+                if st.button("♻️ Use This Recipe", type="primary", use_container_width=True):
+                    st.session_state.generated_recipe = entry["content"]
+                    st.session_state.recipe_data = entry.get("structured")
+                    st.session_state.shopping_list = None
+                    st.session_state.similar_match = None
+                    st.rerun()
+            with col_new:
+                if st.button("🔥 Generate New Anyway", use_container_width=True):
+                    st.session_state.similar_match = None
+                    st.session_state.generate_anyway = True
+                    st.rerun()
         
         if st.session_state.generated_recipe:
             st.markdown("---")
             st.markdown("## 📖 Your Recipe")
             st.markdown(st.session_state.generated_recipe)
             
+            # Rescale locally instead of generating again for a different number of servings
+            recipe_data = st.session_state.recipe_data
+            current_servings = recipe_data["servings"] if recipe_data else parse_servings(st.session_state.generated_recipe)
+            col_servings, col_scale = st.columns([2, 1])
+            with col_servings:
+                new_servings = st.number_input("Scale to servings", min_value=1, max_value=50,
+                                               value=max(1, min(50, int(current_servings or 1))))
+            with col_scale:
+                st.write("")
+                if st.button("⚖️ Rescale", use_container_width=True, disabled=new_servings == current_servings):
+                    if recipe_data:
+                        scaled = scale_recipe(Recipe.from_dict(recipe_data), new_servings)
+                        st.session_state.recipe_data = scaled.to_dict()
+                        st.session_state.generated_recipe = render_markdown(scaled)
+                    else:
+                        st.session_state.generated_recipe = scale_markdown(st.session_state.generated_recipe, new_servings)
+                    st.session_state.shopping_list = None
+                    st.rerun()
+            
             # Action buttons
             col_action1, col_action2, col_action3 = st.columns(3)
             
             with col_action1:
                 if st.button("❤️ Add to Favorites", use_container_width=True):
-                    if st.session_state.generated_recipe not in st.session_state.favorites:
-                        st.session_state.favorites.append({
-                            "recipe": st.session_state.generated_recipe,
-                            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                        })
+                    if not store.has_favorite(user_id, "recipe", st.session_state.generated_recipe):
+                        store.add_favorite(
+                            user_id, "recipe",
+                            st.session_state.generated_recipe,
+                            st.session_state.recipe_data
+                        )
                         st.success("Added to favorites!")
                     else:
                         st.info("Already in favorites!")
@@ -363,30 +498,59 @@ with tab1:
             with col_action3:
                 if st.button("🛒 Shopping List", use_container_width=True):
                     with st.spinner("Generating shopping list..."):
+                        recipe_data = st.session_state.recipe_data
                         shopping_list = generate_shopping_list(
-                            st.session_state.generated_recipe, 
+                            Recipe.from_dict(recipe_data) if recipe_data else st.session_state.generated_recipe, 
                             st.session_state.ingredient_pantry
                         )
                         if shopping_list:
-                            st.markdown("### 🛒 Shopping List")
-                            st.markdown(shopping_list)
+                            st.session_state.shopping_list = {
+                                "title": "🛒 Shopping List", "text": shopping_list
+                            }
+            
+            if st.session_state.shopping_list:
+                render_shopping_list(st.session_state.shopping_list)
+            
+            nutrition = st.session_state.nutrition
+            if nutrition and nutrition["recipe"] == st.session_state.generated_recipe:
+                result = nutrition["result"]
+                render_nutrition(result.per_serving)
+                st.caption(
+                    f"Computed locally for {result.servings} servings from "
+                    f"{len(result.matched)} of {len(result.matched) + len(result.unmatched)} measured ingredients"
+                    + (f" (not counted: {', '.join(result.unmatched)})" if result.unmatched else "")
+                )
     
-    with col_right:
+    with col_right, profile.section("history"):
         st.subheader("📜 Recent Recipes")
         
-        if st.session_state.messages:
-            for idx, msg in enumerate(reversed(st.session_state.messages[-5:])):
-                with st.expander(f"Recipe {len(st.session_state.messages) - idx}", expanded=False):
-                    st.write(f"**Time:** {msg.get('timestamp', 'N/A')}")
-                    st.write(f"**Cuisine:** {msg['cuisine']}")
-                    st.write(f"**Meal:** {msg.get('meal_type', 'N/A')}")
-                    st.write(f"**Servings:** {msg.get('servings', 'N/A')}")
-                    if st.button(f"View Full Recipe", key=f"view_{idx}", use_container_width=True):
-                        st.session_state.generated_recipe = msg['recipe']
-                        st.rerun()
+        search_text = st.text_input("🔍 Search history", placeholder="e.g., chicken thai", key="history_search")
+        total_recipes = store.count_history(user_id, "recipe")
+        entries, titles = [], []
+        if search_text:
+            entries = store.search(user_id, "recipe", search_text, limit=10)
+            titles = [f"Match {idx + 1} - {msg['timestamp']}" for idx, msg in enumerate(entries)]
+            if not entries:
+                st.info("No matching recipes.")
+        elif total_recipes:
+            offset = pager("History", total_recipes, 5, key="history_page")
+            entries = store.history(user_id, "recipe", limit=5, offset=offset)
+            titles = [f"Recipe {total_recipes - offset - idx}" for idx in range(len(entries))]
         else:
             st.info("No recipes yet. Start generating!")
         
+        for msg, title in zip(entries, titles):
+            with st.expander(title, expanded=False):
+                st.write(f"**Time:** {msg.get('timestamp', 'N/A')}")
+                st.write(f"**Cuisine:** {msg['cuisine']}")
+                st.write(f"**Meal:** {msg.get('meal_type', 'N/A')}")
+                st.write(f"**Servings:** {msg.get('servings', 'N/A')}")
+                if st.button(f"View Full Recipe", key=f"view_{msg['id']}", use_container_width=True):
+                    st.session_state.generated_recipe = msg['content']
+                    st.session_state.recipe_data = msg.get('structured')
+                    st.session_state.shopping_list = None
+                    st.rerun()
+        
         st.markdown("---")
         st.markdown("### 💡 Pro Tips")
         st.markdown("""
@@ -398,7 +562,7 @@ with tab1:
         """)
 
 # TAB 2: Meal Planner
-with tab2:
+with tab2, profile.section("meal_plan"):
     st.subheader("📅 Weekly Meal Planner")
     
     col1, col2 = st.columns([2, 1])
@@ -420,11 +584,21 @@ with tab2:
                 key="meal_plan_restrictions"
             )
         
+        plan_in_parallel = st.toggle(
+            "⚡ Plan days in parallel",
+            value=True,
+            help="Generate each day separately at the same time - faster and never cut off for long plans"
+        )
+        
         if st.button("📅 Generate Meal Plan", type="primary", use_container_width=True):
             if meal_plan_ingredients:
                 with st.spinner("Creating your meal plan..."):
                     restrictions = ", ".join(meal_plan_restrictions) if meal_plan_restrictions else "None"
-                    meal_plan = generate_meal_plan(meal_plan_ingredients, meal_plan_days, restrictions)
+                    meal_plan = reported(
+                        "generating meal plan", generate_meal_plan,
+                        meal_plan_ingredients, meal_plan_days, restrictions, parallel=plan_in_parallel,
+                        model_choice=model_choice
+                    )
                     if meal_plan:
                         st.markdown("## 📅 Your Meal Plan")
                         st.markdown(meal_plan)
@@ -455,70 +629,138 @@ with tab2:
         """)
 
 # TAB 3: Favorites
-with tab3:
+with tab3, profile.section("favorites"):
     st.subheader("❤️ Your Favorite Recipes")
     
-    if st.session_state.favorites:
-        for idx, fav in enumerate(st.session_state.favorites):
+    total_favorites = store.count_favorites(user_id, "recipe")
+    if total_favorites:
+        if st.button("🛒 Combined Shopping List", use_container_width=True):
+            items = build_shopping_list(
+                {
+                    f"Favorite {idx + 1}": Recipe.from_dict(fav['structured']) if fav.get('structured') else fav['content']
+                    for idx, fav in enumerate(store.favorites(user_id, "recipe", limit=total_favorites))
+                },
+                st.session_state.ingredient_pantry
+            )
+            if items is None:
+                st.warning("Couldn't find ingredient lists in your favorites.")
+            else:
+                st.markdown("### 🛒 Shopping List for All Favorites")
+                st.markdown(format_shopping_list(items))
+        
+        if st.button("📊 Combined Nutrition", use_container_width=True):
+            favorites = store.favorites(user_id, "recipe", limit=total_favorites)
+            results = analyze_recipes([
+                Recipe.from_dict(fav['structured']) if fav.get('structured') else fav['content']
+                for fav in favorites
+            ])
+            render_nutrition(combine(results), title="📊 One Serving of Every Favorite")
+            st.table([
+                {
+                    "Favorite": f"Favorite {idx + 1}",
+                    "Servings": result.servings,
+                    "kcal / serving": f"{result.per_serving.calories:.0f}",
+                    "Protein (g)": f"{result.per_serving.protein:.0f}",
+                    "Carbs (g)": f"{result.per_serving.carbohydrates:.0f}",
+                    "Fat (g)": f"{result.per_serving.fat:.0f}",
+                    "Counted": f"{result.coverage:.0%}"
+                }
+                for idx, result in enumerate(results)
+            ])
+        
+        offset = pager("Favorites", total_favorites, 10, key="favorites_page")
+        for idx, fav in enumerate(store.favorites(user_id, "recipe", limit=10, offset=offset), offset):
             with st.expander(f"Favorite Recipe {idx + 1} - {fav['timestamp']}", expanded=False):
-                st.markdown(fav['recipe'])
+                st.markdown(fav['content'])
                 
                 col1, col2 = st.columns(2)
                 with col1:
-                    if st.button(f"🗑️ Remove", key=f"remove_fav_{idx}", use_container_width=True):
-                        st.session_state.favorites.pop(idx)
+                    if st.button(f"🗑️ Remove", key=f"remove_fav_{fav['id']}", use_container_width=True):
+                        store.remove_favorite(user_id, fav['id'])
                         st.rerun()
                 with col2:
                     st.download_button(
                         label="📥 Download",
-                        data=fav['recipe'],
+                        data=fav['content'],
                         file_name=f"favorite_recipe_{idx+1}.txt",
                         mime="text/plain",
-                        key=f"download_fav_{idx}",
+                        key=f"download_fav_{fav['id']}",
                         use_container_width=True
                     )
     else:
         st.info("No favorite recipes yet. Generate recipes and add them to favorites!")
 
 # TAB 4: Pantry
-with tab4:
+with tab4, profile.section("pantry"):
     st.subheader("🛒 Virtual Pantry")
     
     col1, col2 = st.columns([2, 1])
     
     with col1:
         st.markdown("### Add Items to Pantry")
+        pantry = st.session_state.ingredient_pantry
         new_item = st.text_input("Enter ingredient name")
         
+        # Autocomplete from the pantry's prefix index
+        if new_item:
+            matches = pantry.complete(new_item.split()[-1] if new_item.split() else "")
+            if matches:
+                st.caption("Already in pantry: " + ", ".join(matches))
+        
+        col_qty, col_unit, col_expiry = st.columns(3)
+        with col_qty:
+            new_quantity = st.number_input("Quantity (optional)", min_value=0.0, value=0.0, step=0.5)
+        with col_unit:
+            new_unit = st.text_input("Unit", placeholder="e.g., cup, g, cloves")
+        with col_expiry:
+            new_expiry = st.date_input("Expires (optional)", value=None)
+        
         col_add, col_clear = st.columns(2)
         with col_add:
             if st.button("➕ Add to Pantry", use_container_width=True):
-                if new_item and new_item not in st.session_state.ingredient_pantry:
-                    st.session_state.ingredient_pantry.append(new_item)
-                    st.success(f"Added {new_item}!")
+                if new_item:
+                    unit = canonical_unit(new_unit) if new_unit else ""
+                    if new_unit and unit is None:
+                        st.warning(f"Unknown unit '{new_unit}' - quantity ignored")
+                    added = pantry.add(
+                        new_item,
+                        quantity=new_quantity if new_quantity > 0 and unit is not None else None,
+                        unit=unit or "",
+                        expires=new_expiry
+                    )
+                    save_pantry()
+                    st.success(f"Added {new_item}!" if added else f"Updated {new_item}!")
                     st.rerun()
         
         with col_clear:
             if st.button("🗑️ Clear All", use_container_width=True):
-                st.session_state.ingredient_pantry = []
+                pantry.clear()
+                save_pantry()
                 st.rerun()
         
         st.markdown("---")
         st.markdown("### 📦 Your Pantry Items")
         
-        if st.session_state.ingredient_pantry:
-            # Display as tags
-            tags_html = ""
-            for item in st.session_state.ingredient_pantry:
-                tags_html += f'<span class="ingredient-tag">{item}</span>'
+        if pantry:
+            # Display as tags, highlighting items that expire within 3 days
+            expiring = {id(item) for item in pantry.expiring(3)}
+            tags_html = "".join(
+                f'<span class="ingredient-tag{" expiring" if id(item) in expiring else ""}">'
+                f'{html.escape(item.name)}'
+                f'{f" · {item.quantity:g} {item.unit}".rstrip() if item.quantity is not None else ""}'
+                f'{f" · ⏰ {item.expires:%b %d}" if item.expires else ""}'
+                f'</span>'
+                for item in pantry.items()
+            )
             st.markdown(tags_html, unsafe_allow_html=True)
             
             st.markdown("---")
             
             # Remove individual items
-            item_to_remove = st.selectbox("Select item to remove", st.session_state.ingredient_pantry)
+            item_to_remove = st.selectbox("Select item to remove", list(pantry))
             if st.button("Remove Selected", use_container_width=True):
-                st.session_state.ingredient_pantry.remove(item_to_remove)
+                pantry.remove(item_to_remove)
+                save_pantry()
                 st.rerun()
         else:
             st.info("Your pantry is empty. Add ingredients above!")
@@ -547,3 +789,6 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+# Debug panel with the slowest sections (only when profiling is enabled)
+profile_panel(profile)
@@ -0,0 +1,27 @@
+"""
+Pre-generate recipes offline to warm the shared response cache
+
+Reads one parameter set per JSONL line or CSV row, using the recipe history
+keys (ingredients, restrictions, cuisine, skill, time, servings, meal_type)
+and an optional model (default gpt-4o-mini, the app's default selection),
+and generates the Pro app's markdown recipe for each:
+
+    python batch_generate.py top_requests.csv                 # bounded worker pool
+    python batch_generate.py top_requests.jsonl --batch-api   # OpenAI Batch API
+    python batch_generate.py --collect batch_abc123           # store a finished batch
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core.batch import main
+from recipe_prompt import PROMPTS, recipe_request
+
+
+def build_requests(params):
+    return [recipe_request(params)]
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_requests, description="Pre-generate recipes into the response cache", prompts=PROMPTS))
@@ -0,0 +1,65 @@
+"""
+Benchmark the Pro app's generation paths against a local mock OpenAI server
+
+Drives basic and Pro recipe streaming, parallel meal plans and the model
+fallback of shopping lists (the functions in generation.py) through the shared client pool, cache and
+scheduler under concurrent load, without API calls (see ai_core/bench.py):
+
+    python benchmark.py --requests 300 --concurrency 32
+    python benchmark.py --scenario recipe --rate-limit 0.05 --max-p95 2.5
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core.bench import Scenario, main
+from generation import generate_meal_plan, generate_recipe, generate_recipe_with_nutrition, generate_shopping_list
+
+INGREDIENTS = ["chicken breast", "rice", "tomatoes", "onion", "garlic", "spinach", "eggs", "chickpeas",
+               "salmon", "bell pepper", "pasta", "mushrooms", "tofu", "potatoes", "carrots", "basil"]
+CUISINES = ["Any", "Italian", "Thai", "Mexican", "Indian", "Mediterranean"]
+
+
+def make_params(i):
+    ingredients = [INGREDIENTS[(i * 3 + k) % len(INGREDIENTS)] for k in range(3 + i % 3)]
+    return {
+        "ingredients": ", ".join(ingredients),
+        "cuisine": CUISINES[i % len(CUISINES)],
+        "servings": 2 + i % 4,
+        "days": 3 + i % 5,
+    }
+
+
+def basic_recipe(client, cache, params):
+    return generate_recipe(params["ingredients"], "None", params["cuisine"], "Intermediate", 45, stream=True,
+                           client=client, cache=cache)
+
+
+def recipe(client, cache, params):
+    return generate_recipe_with_nutrition(params["ingredients"], "None", params["cuisine"], "Intermediate", 45,
+                                          params["servings"], "Dinner", stream=True, client=client, cache=cache)
+
+
+def meal_plan(client, cache, params):
+    return generate_meal_plan(params["ingredients"], params["days"], "None", parallel=True,
+                              client=client, cache=cache)
+
+
+def shopping_list(client, cache, params):
+    # Recipes with parseable ingredients are listed locally without a request; free-form
+    # text with no ingredients section takes the model path this scenario measures
+    recipe_text = f"Cook the {params['ingredients']} together and serve {params['servings']}."
+    return generate_shopping_list(recipe_text, ["garlic", "onion"], client=client, cache=cache)
+
+
+SCENARIOS = [
+    Scenario("basic_recipe", basic_recipe, make_params),
+    Scenario("recipe", recipe, make_params),
+    Scenario("meal_plan", meal_plan, make_params),
+    Scenario("shopping_list", shopping_list, make_params),
+]
+
+
+if __name__ == "__main__":
+    sys.exit(main(SCENARIOS, description="Benchmark the recipe app against a mock OpenAI server"))
@@ -0,0 +1,317 @@
+"""
+Recipe, meal plan and shopping list generation, without Streamlit
+
+Used by both apps, ``benchmark.py`` and the tests. Importing this module
+creates nothing: the OpenAI client pool, response cache, token budgets and
+routing budget are process-wide and built on first use (see ai_core/lazy.py),
+and every function also takes an explicit ``client`` and ``cache``.
+
+Recipes and meal plans raise on API errors; the apps show them with
+``reported`` (ai_core/ui.py). Ideas and shopping lists are optional extras
+and return an empty result instead.
+"""
+
+from ai_core import chat
+from ai_core.budgets import BudgetRule, TokenBudgets
+from ai_core.cache import shared_cache
+from ai_core.client import shared_client
+from ai_core.fanout import FanOut
+from ai_core.lazy import once
+from ai_core.scheduler import BATCH
+from ingredients import canonical_ingredients, normalize_ingredients
+from meal_plan import (
+    DAY_MAX_TOKENS, MAX_CONTINUATIONS, MEAL_PLAN_SYSTEM_PROMPT, build_day_prompt, merge_day_plans, plan_days,
+)
+from model_routing import DEFAULT_CHOICE, Budget, prompt_tokens, route, route_request
+from recipe_prompt import MARKDOWN_MAX_TOKENS, recipe_request
+from recipe_schema import recipe_from_json, render_markdown
+from shopping import build_shopping_list, format_shopping_list
+
+BASIC_RECIPE_SYSTEM_PROMPT = """You are a professional chef and recipe developer with expertise in creating
+    delicious, personalized recipes. You excel at working with available ingredients and adapting
+    recipes to dietary needs and preferences.
+
+    When generating recipes, provide:
+    1. A creative recipe name
+    2. Brief description
+    3. Preparation time and cooking time
+    4. Difficulty level
+    5. Servings
+    6. Detailed ingredient list with measurements
+    7. Step-by-step cooking instructions
+    8. Helpful cooking tips
+    9. Nutritional information (approximate)
+    10. Possible variations or substitutions
+
+    Format your response in a clear, structured way using markdown."""
+
+SUGGESTIONS_SYSTEM_PROMPT = "You are a helpful chef assistant. Suggest 5 quick recipe ideas based on given ingredients. Return only the recipe names, one per line."
+
+
+@once
+def get_token_budgets():
+    """max_tokens per request type, sized from the request and refined from finished answers (see ai_core/budgets.py)"""
+    return TokenBudgets({
+        "recipe": BudgetRule(base=1600, ceiling=MARKDOWN_MAX_TOKENS),
+        "meal_plan": BudgetRule(base=200, per_unit=300),
+        "meal_plan_day": BudgetRule(base=DAY_MAX_TOKENS),
+    })
+
+
+# Latency/cost limits for model routing (see model_routing.py)
+get_routing_budget = once(Budget.from_env)
+
+
+def _client(client):
+    return client if client is not None else shared_client()
+
+
+def _cache(cache):
+    return cache if cache is not None else shared_cache()
+
+
+def _require_ingredients(ingredients):
+    ingredients = canonical_ingredients(ingredients)
+    if not ingredients:
+        raise ValueError("Please enter at least some ingredients")
+    return ingredients
+
+
+def generate_recipe(ingredients, dietary_restrictions, cuisine_preference, skill_level, cooking_time, stream=False,
+                    client=None, cache=None):
+    """Generate a personalized recipe (the basic app's prompt)
+
+    With stream=True an iterator of markdown chunks is returned instead of the full text.
+    """
+
+    ingredients = _require_ingredients(ingredients)
+
+    user_prompt = f"""Create a personalized recipe based on the following:
+
+Available Ingredients: {ingredients}
+Dietary Restrictions: {dietary_restrictions if dietary_restrictions else 'None'}
+Cuisine Preference: {cuisine_preference if cuisine_preference else 'Any'}
+Skill Level: {skill_level}
+Maximum Cooking Time: {cooking_time} minutes
+
+Please create a recipe that:
+- Primarily uses the available ingredients
+- Respects all dietary restrictions
+- Matches the cuisine preference if specified
+- Is appropriate for the skill level
+- Can be completed within the time limit
+- Suggests any additional common ingredients that might enhance the dish"""
+
+    messages = [
+        {"role": "system", "content": BASIC_RECIPE_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+    generate = chat.stream if stream else chat.complete
+    return generate(
+        _client(client),
+        messages,
+        model="gpt-4o-mini",
+        temperature=0.8,
+        max_tokens=2000,
+        cache=_cache(cache),
+        site="recipe"
+    )
+
+
+def generate_recipe_with_nutrition(ingredients, dietary_restrictions, cuisine_preference,
+                                   skill_level, cooking_time, servings, meal_type, stream=False,
+                                   structured=False, model_choice=DEFAULT_CHOICE, client=None, cache=None):
+    """Generate a detailed recipe with nutritional information (the Pro app's prompt)
+
+    With stream=True an iterator of markdown chunks is returned instead of the full text.
+    With structured=True the model answers in JSON and a Recipe object is returned
+    (see recipe_schema.py); streaming does not apply. model_choice is a
+    MODEL_CHOICES label (see model_routing.py).
+    """
+
+    _require_ingredients(ingredients)
+    token_budgets = get_token_budgets()
+    request = recipe_request({
+        "ingredients": ingredients,
+        "restrictions": dietary_restrictions,
+        "cuisine": cuisine_preference,
+        "skill": skill_level,
+        "time": cooking_time,
+        "servings": servings,
+        "meal_type": meal_type
+    }, structured=structured, max_tokens=None if structured else token_budgets.estimate("recipe"))
+    request = route_request("recipe", request, model_choice, get_routing_budget())
+
+    if structured:
+        return recipe_from_json(chat.complete(_client(client), **request, cache=_cache(cache), site="recipe"))
+    generate = chat.stream if stream else chat.complete
+    return generate(_client(client), **request, cache=_cache(cache), record_usage=token_budgets.recorder("recipe"),
+                    site="recipe")
+
+
+def generate_meal_plan(ingredients, days, dietary_restrictions, parallel=False, model_choice=DEFAULT_CHOICE,
+                       client=None, cache=None):
+    """Generate a multi-day meal plan
+
+    With parallel=True each day is requested separately and concurrently (see meal_plan.py)
+    and the days are merged into one plan.
+    """
+
+    if parallel and days > 1:
+        return generate_meal_plan_by_day(normalize_ingredients(ingredients), days, dietary_restrictions,
+                                         model_choice=model_choice, client=client, cache=cache)
+
+    ingredients = _require_ingredients(ingredients)
+
+    user_prompt = f"""Create a {days}-day meal plan using these ingredients: {ingredients}
+
+Dietary Restrictions: {dietary_restrictions if dietary_restrictions else 'None'}
+
+For each day provide:
+- Breakfast
+- Lunch
+- Dinner
+- Snack (optional)
+
+Include brief descriptions and ensure variety across days."""
+
+    messages = [
+        {"role": "system", "content": MEAL_PLAN_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+    token_budgets = get_token_budgets()
+    max_tokens = token_budgets.estimate("meal_plan", days)
+    return chat.complete(
+        _client(client),
+        messages,
+        model=route("meal_plan", model_choice, get_routing_budget(), prompt_tokens(messages), max_tokens),
+        temperature=0.7,
+        max_tokens=max_tokens,
+        cache=_cache(cache),
+        max_continuations=MAX_CONTINUATIONS,
+        record_usage=token_budgets.recorder("meal_plan", days),
+        site="meal_plan"
+    )
+
+
+def generate_meal_plan_by_day(ingredients, days, dietary_restrictions, model_choice=DEFAULT_CHOICE,
+                              client=None, cache=None):
+    """Generate each day of a meal plan concurrently and merge them
+
+    ingredients is a list of normalized ingredient names.
+    """
+
+    if not ingredients:
+        raise ValueError("Please enter at least some ingredients")
+    client, cache = _client(client), _cache(cache)
+    token_budgets = get_token_budgets()
+    plan = plan_days(ingredients, days)
+    max_tokens = token_budgets.estimate("meal_plan_day")
+    with FanOut(max_workers=days) as fan:
+        for day in range(1, days + 1):
+            messages = [
+                {"role": "system", "content": MEAL_PLAN_SYSTEM_PROMPT},
+                {"role": "user", "content": build_day_prompt(day, plan, ingredients, dietary_restrictions)}
+            ]
+            fan.submit(
+                day,
+                chat.complete,
+                client,
+                messages,
+                model=route("meal_plan", model_choice, get_routing_budget(), prompt_tokens(messages), max_tokens),
+                temperature=0.7,
+                max_tokens=max_tokens,
+                cache=cache,
+                max_continuations=MAX_CONTINUATIONS,
+                record_usage=token_budgets.recorder("meal_plan_day"),
+                site="meal_plan"
+            )
+        day_texts = dict(fan.wait())
+    return merge_day_plans([day_texts[day] for day in range(1, days + 1)])
+
+
+def generate_shopping_list(recipe, pantry_items, client=None, cache=None):
+    """Generate a shopping list from recipe minus pantry items
+
+    recipe is markdown text or a structured Recipe. The list is computed locally
+    (see shopping.py); the model is only asked when no ingredients could be parsed.
+    Returns None if that request fails.
+    """
+
+    items = build_shopping_list(recipe, pantry_items)
+    if items is not None:
+        return format_shopping_list(items)
+
+    recipe_text = recipe if isinstance(recipe, str) else render_markdown(recipe)
+    try:
+        return chat.complete(
+            _client(client),
+            [
+                {"role": "system", "content": "Extract ingredients from recipe and create a shopping list. Remove items already in pantry. Format as a clean bullet list."},
+                {"role": "user", "content": f"Recipe:\n{recipe_text}\n\nPantry Items:\n{', '.join(pantry_items) if pantry_items else 'None'}"}
+            ],
+            model=route("shopping_list"),
+            temperature=0.3,
+            max_tokens=500,
+            cache=_cache(cache),
+            site="shopping_list"
+        )
+    except Exception:
+        return None
+
+
+def get_recipe_suggestions(ingredients, priority=None, client=None, cache=None):
+    """Get quick recipe ideas based on ingredients; [] if the request fails
+
+    Prefetches pass priority=BATCH so they never delay interactive requests.
+    """
+
+    ingredients = canonical_ingredients(ingredients)
+
+    try:
+        content = chat.complete(
+            _client(client),
+            [
+                {"role": "system", "content": SUGGESTIONS_SYSTEM_PROMPT},
+                {"role": "user", "content": f"Suggest 5 recipe ideas using these ingredients: {ingredients}"}
+            ],
+            model=route("suggestions"),
+            temperature=0.7,
+            max_tokens=200,
+            cache=_cache(cache),
+            priority=priority,
+            site="suggestions"
+        )
+
+        suggestions = content.strip().split('\n')
+        return [s.strip('1234567890. -') for s in suggestions if s.strip()]
+    except Exception:
+        return []
+
+
+def generate_speculative_shopping_list(ingredients, cuisine_preference, meal_type, pantry_items,
+                                       client=None, cache=None):
+    """Predict the extra items a recipe from these ingredients will need; None if the request fails
+
+    Runs alongside recipe generation, so it only sees the inputs, not the recipe text.
+    """
+
+    ingredients = canonical_ingredients(ingredients)
+
+    try:
+        return chat.complete(
+            _client(client),
+            [
+                {"role": "system", "content": "You are a chef's assistant. Given the ingredients a cook already has, list the additional ingredients a typical recipe of the requested style would need. Exclude anything already available or in the pantry. Format as a clean bullet list."},
+                {"role": "user", "content": f"Available Ingredients: {ingredients}\nCuisine: {cuisine_preference}\nMeal Type: {meal_type}\n\nPantry Items:\n{', '.join(pantry_items) if pantry_items else 'None'}"}
+            ],
+            model=route("shopping_list"),
+            temperature=0.3,
+            max_tokens=300,
+            cache=_cache(cache),
+            priority=BATCH,
+            site="shopping_list_prefetch"
+        )
+    except Exception:
+        return None
@@ -0,0 +1,111 @@
+"""
+Ingredient canonicalization for the AI Recipe Generator
+
+Free-text ingredient lists are reduced to a sorted, de-duplicated list of
+canonical names before they are put into a prompt, so that
+"Chicken, tomato ,garlic" and "garlic, chicken, tomatoes" produce the same
+prompt (and therefore the same response cache entry).
+"""
+
+import re
+
+# Different names for the same ingredient, keyed by the singular lowercase form
+ALIASES = {
+    "aubergine": "eggplant",
+    "capsicum": "bell pepper",
+    "cilantro": "coriander",
+    "coriander leaf": "coriander",
+    "courgette": "zucchini",
+    "evoo": "olive oil",
+    "extra virgin olive oil": "olive oil",
+    "garbanzo": "chickpea",
+    "garbanzo bean": "chickpea",
+    "green onion": "scallion",
+    "spring onion": "scallion",
+    "ground beef": "beef mince",
+    "minced beef": "beef mince",
+    "prawn": "shrimp",
+    "rocket": "arugula",
+    "swede": "rutabaga",
+    "corn flour": "cornstarch",
+    "cornflour": "cornstarch",
+    "confectioners sugar": "powdered sugar",
+    "icing sugar": "powdered sugar",
+}
+
+# Plural forms that the suffix rules below would get wrong
+IRREGULAR_PLURALS = {
+    "leaves": "leaf",
+    "loaves": "loaf",
+    "halves": "half",
+    "knives": "knife",
+    "teeth": "tooth",
+    "geese": "goose",
+}
+
+# Singulars ending in "ie", whose plurals the "ies" -> "y" rule would get wrong
+IE_SINGULARS = {
+    "pie", "cookie", "brownie", "smoothie", "veggie", "hoagie", "calorie",
+}
+
+# Words ending in "s" that are not plurals
+UNCOUNTABLE = {
+    "asparagus", "brussels", "couscous", "citrus", "hummus", "molasses", "oats",
+    "swiss", "bass", "grits", "schnapps", "watercress", "greens", "lemongrass",
+}
+
+_SPLIT_RE = re.compile(r"[,;\n]+")
+# Punctuation, except "&" ("mac & cheese") and "/" or "." inside numbers ("1/2 cup", "2.5 lbs")
+_STRIP_RE = re.compile(r"[^\w\s'&/.]|(?<!\d)[/.]|[/.](?!\d)")
+_BULLET_RE = re.compile(r"^\s*(?:[-*•]|\d+[.)])\s+")
+
+
+def singularize(word):
+    """Return the singular form of a single lowercase word"""
+    if word in IRREGULAR_PLURALS:
+        return IRREGULAR_PLURALS[word]
+    if word in UNCOUNTABLE or len(word) <= 3 or not word.endswith("s"):
+        return word
+    if word.endswith(("ss", "us", "is")):
+        return word
+    if word.endswith("ies"):
+        return word[:-1] if word[:-1] in IE_SINGULARS else word[:-3] + "y"
+    if word.endswith(("ches", "shes", "xes", "zes", "sses", "oes")):
+        return word[:-2]
+    return word[:-1]
+
+
+def normalize_ingredient(name):
+    """Return the canonical form of a single ingredient name.
+
+    Lowercases, strips punctuation (but not quantities such as "1/2" or
+    "2.5", or the "&" of "mac & cheese") and extra whitespace, singularizes
+    the last word and maps known aliases to one name. Returns "" for blank
+    input.
+    """
+    name = _BULLET_RE.sub("", name.lower())
+    name = _STRIP_RE.sub(" ", name)
+    words = name.replace("'", "").split()
+    if not words:
+        return ""
+    words[-1] = singularize(words[-1])
+    name = " ".join(words)
+    return ALIASES.get(name, name)
+
+
+def normalize_ingredients(ingredients):
+    """Return the sorted, de-duplicated canonical names in ``ingredients``.
+
+    ``ingredients`` may be the raw comma/newline separated text from the UI or
+    an iterable of names.
+    """
+    if isinstance(ingredients, str):
+        ingredients = _SPLIT_RE.split(ingredients)
+    names = {normalize_ingredient(item) for item in ingredients}
+    names.discard("")
+    return sorted(names)
+
+
+def canonical_ingredients(ingredients):
+    """Return ``ingredients`` as a canonical comma-separated string for prompts"""
+    return ", ".join(normalize_ingredients(ingredients))
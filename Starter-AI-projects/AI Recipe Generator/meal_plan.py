@@ -0,0 +1,84 @@
+"""
+Per-day meal plan prompts for parallel generation
+
+A multi-day plan is split into one request per day. To keep the days varied
+without them seeing each other's output, every day is assigned a distinct
+cooking style and a rotating subset of featured ingredients up front, and each
+prompt lists what the other days feature.
+"""
+
+import re
+
+DAY_STYLES = [
+    "stir-fry or sauté",
+    "oven roast or bake",
+    "soup or stew",
+    "grain or noodle bowl",
+    "fresh salad-based",
+    "curry or braise",
+    "grill or skillet",
+]
+
+MEAL_PLAN_SYSTEM_PROMPT = """You are a meal planning expert. Create balanced, varied meal plans 
+    that use available ingredients efficiently and minimize food waste."""
+
+DAY_MAX_TOKENS = 600
+# Plans cut off by max_tokens are continued (see ai_core.chat)
+MAX_CONTINUATIONS = 2
+
+_DAY_HEADING_RE = re.compile(r"^\s*#*\s*\**\s*day\s*\d+\b.*$", re.IGNORECASE | re.MULTILINE)
+
+
+def plan_days(ingredients, days):
+    """Return a list of ``{"style", "featured"}`` dicts, one per day.
+
+    Ingredients are dealt round-robin so each one is featured on some day and
+    neighbouring days lead with different ones.
+    """
+    featured = [[] for _ in range(days)]
+    for idx, ingredient in enumerate(ingredients):
+        featured[idx % days].append(ingredient)
+    if ingredients:
+        for day, day_items in enumerate(featured):
+            if not day_items:
+                day_items.append(ingredients[day % len(ingredients)])
+    return [
+        {"style": DAY_STYLES[day % len(DAY_STYLES)], "featured": featured[day]}
+        for day in range(days)
+    ]
+
+
+def build_day_prompt(day, plan, ingredients, dietary_restrictions):
+    """Return the user prompt for ``day`` (1-based) of ``plan``"""
+    today = plan[day - 1]
+    others = "\n".join(
+        f"- Day {idx}: {entry['style']} featuring {', '.join(entry['featured']) or 'any ingredients'}"
+        for idx, entry in enumerate(plan, 1) if idx != day
+    )
+    return f"""Plan meals for Day {day} of a {len(plan)}-day meal plan.
+
+Available Ingredients: {', '.join(ingredients)}
+Dietary Restrictions: {dietary_restrictions if dietary_restrictions else 'None'}
+
+For Day {day}, feature: {', '.join(today['featured']) or 'any available ingredients'}
+Dinner style for Day {day}: {today['style']}
+
+Other days of the plan (do not repeat their dishes):
+{others or '- None'}
+
+Provide:
+- Breakfast
+- Lunch
+- Dinner
+- Snack (optional)
+
+Include brief descriptions. Do not add a title or a "Day" heading."""
+
+
+def merge_day_plans(day_texts):
+    """Merge per-day markdown into one plan, in day order"""
+    sections = [f"# {len(day_texts)}-Day Meal Plan"]
+    for day, text in enumerate(day_texts, 1):
+        body = _DAY_HEADING_RE.sub("", text or "", count=1).strip()
+        sections.append(f"## Day {day}\n\n{body}")
+    return "\n\n".join(sections) + "\n"
@@ -0,0 +1,129 @@
+"""
+Model routing for the Pro app
+
+Maps the sidebar's model choice to a model per task. Light tasks (recipe
+ideas, shopping lists) always use the fast, cheap model; full recipes and
+meal plans use the selected model, and "Auto" picks per task (the bigger
+model only for full recipes). Optional latency and cost budgets then step
+down to cheaper, faster models until the request's worst case (its full
+max_tokens) fits. Requests with a ``response_format`` (structured recipes)
+only go to models that support structured outputs.
+
+Prices are USD per million tokens and speeds rough output tokens per second,
+used only for these estimates.
+"""
+
+import os
+from dataclasses import dataclass
+
+AUTO = "Auto (per task)"
+
+# Sidebar label -> model; AUTO routes per task
+MODEL_CHOICES = {
+    "gpt-4o-mini (Fast & Cheap)": "gpt-4o-mini",
+    "gpt-4o (Balanced)": "gpt-4o",
+    "gpt-4 (Best Quality)": "gpt-4",
+    AUTO: None,
+}
+
+# The sidebar's default, which is also the model the batch CLI warms the cache for
+DEFAULT_CHOICE = next(iter(MODEL_CHOICES))
+
+
+@dataclass
+class ModelInfo:
+    input_price: float
+    output_price: float
+    tokens_per_second: float
+    first_token_seconds: float = 0.5
+    structured_outputs: bool = True
+
+
+# Cheapest first
+MODELS = {
+    "gpt-4o-mini": ModelInfo(input_price=0.15, output_price=0.60, tokens_per_second=90),
+    "gpt-4o": ModelInfo(input_price=2.50, output_price=10.00, tokens_per_second=60),
+    "gpt-4": ModelInfo(input_price=30.00, output_price=60.00, tokens_per_second=25, first_token_seconds=1.0,
+                       structured_outputs=False),
+}
+FAST_MODEL = "gpt-4o-mini"
+
+# Model per task when the choice is AUTO
+TASK_MODELS = {
+    "recipe": "gpt-4o",
+    "meal_plan": "gpt-4o-mini",
+    "shopping_list": FAST_MODEL,
+    "suggestions": FAST_MODEL,
+}
+
+# Tasks that use the fast model whatever is selected
+LIGHT_TASKS = {"shopping_list", "suggestions"}
+
+
+@dataclass
+class Budget:
+    """Per-request limits; 0 means no limit"""
+
+    max_seconds: float = 0.0
+    max_cost: float = 0.0
+
+    @classmethod
+    def from_env(cls):
+        """Read MODEL_LATENCY_BUDGET (seconds) and MODEL_COST_BUDGET (USD)"""
+        return cls(
+            max_seconds=float(os.getenv("MODEL_LATENCY_BUDGET", 0)),
+            max_cost=float(os.getenv("MODEL_COST_BUDGET", 0)),
+        )
+
+
+def prompt_tokens(messages):
+    """Rough prompt size: characters / 4"""
+    return sum(len(m.get("content") or "") for m in messages) // 4
+
+
+def estimate_seconds(model, max_tokens):
+    info = MODELS[model]
+    return info.first_token_seconds + max_tokens / info.tokens_per_second
+
+
+def estimate_cost(model, input_tokens, max_tokens):
+    info = MODELS[model]
+    return (input_tokens * info.input_price + max_tokens * info.output_price) / 1_000_000
+
+
+def fits(model, budget, input_tokens, max_tokens):
+    if budget.max_seconds and estimate_seconds(model, max_tokens) > budget.max_seconds:
+        return False
+    if budget.max_cost and estimate_cost(model, input_tokens, max_tokens) > budget.max_cost:
+        return False
+    return True
+
+
+def route(task, choice=AUTO, budget=None, input_tokens=0, max_tokens=1000, structured=False):
+    """Model for ``task`` given the sidebar ``choice`` and an optional ``Budget``.
+
+    With ``structured`` a selected model without structured outputs is
+    replaced by the next cheaper one. If no model fits the budget the fast
+    model is used.
+    """
+    if task in LIGHT_TASKS:
+        model = FAST_MODEL
+    else:
+        model = MODEL_CHOICES.get(choice) or TASK_MODELS.get(task, FAST_MODEL)
+    candidates = list(MODELS)
+    candidates = candidates[:candidates.index(model) + 1]
+    if structured:
+        candidates = [m for m in candidates if MODELS[m].structured_outputs]
+    if budget is None:
+        return candidates[-1]
+    for candidate in reversed(candidates):
+        if fits(candidate, budget, input_tokens, max_tokens):
+            return candidate
+    return FAST_MODEL
+
+
+def route_request(task, request, choice=AUTO, budget=None):
+    """Copy of a chat completion request dict with its model routed"""
+    model = route(task, choice, budget, prompt_tokens(request["messages"]), request["max_tokens"],
+                  structured="response_format" in request)
+    return dict(request, model=model)
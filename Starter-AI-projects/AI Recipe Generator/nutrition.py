@@ -0,0 +1,206 @@
+"""
+Local nutrition calculator
+
+Nutrient values per 100 g for common ingredients are bundled in
+nutrients.csv and loaded once into NumPy arrays. Recipe ingredients are
+parsed with the shopping list parser, converted to grams (mass directly,
+volume through the ingredient's density, pieces through its typical weight)
+and multiplied against the nutrient matrix in one vectorized step per batch,
+so a single recipe, a meal plan or thousands of saved recipes are analyzed
+the same way - without an API call.
+"""
+
+import csv
+import functools
+import os
+import re
+from dataclasses import dataclass, field, fields
+
+import numpy as np
+
+from ingredients import normalize_ingredient
+from recipe_schema import Nutrition
+from shopping import parse_recipe_ingredients
+from units import UNITS, to_base
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "nutrients.csv")
+
+NUTRIENTS = tuple(f.name for f in fields(Nutrition))
+
+# Count units that stand for one typical piece of the ingredient
+_PIECE_UNITS = {"", "piece", "clove", "slice", "fillet", "head", "stalk", "stick"}
+
+# Count units with a fixed weight regardless of the ingredient, in grams
+_PACKAGE_GRAMS = {
+    "can": 400, "jar": 400, "package": 450, "bag": 450, "bottle": 750,
+    "bunch": 100, "handful": 30, "sprig": 1, "sheet": 5,
+}
+
+# How a quantity becomes grams
+_MASS, _VOLUME, _PIECE, _FIXED = range(4)
+
+_SERVINGS_RE = re.compile(r"servings?\W*(\d+)", re.IGNORECASE)
+
+
+class NutrientTable:
+    """Nutrient matrix (grams of each nutrient per gram of food) with name lookup"""
+
+    def __init__(self, names, per_100g, grams_per_ml, grams_per_piece):
+        self.names = [normalize_ingredient(name) for name in names]
+        self.index = {name: row for row, name in enumerate(self.names)}
+        self.per_gram = np.asarray(per_100g, dtype=np.float64) / 100.0
+        self.grams_per_ml = np.asarray(grams_per_ml, dtype=np.float64)
+        self.grams_per_piece = np.asarray(grams_per_piece, dtype=np.float64)
+        self._lookups = {}
+
+    @classmethod
+    def from_csv(cls, path=DEFAULT_TABLE_PATH):
+        names, per_100g, grams_per_ml, grams_per_piece = [], [], [], []
+        with open(path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                names.append(row["name"])
+                per_100g.append([float(row[nutrient]) for nutrient in NUTRIENTS])
+                grams_per_ml.append(float(row["grams_per_ml"] or "nan"))
+                grams_per_piece.append(float(row["grams_per_piece"] or "nan"))
+        return cls(names, per_100g, grams_per_ml, grams_per_piece)
+
+    def lookup(self, item):
+        """Row for an ingredient name or None.
+
+        Falls back to the longest run of words that is in the table, preferring
+        the end of the name ("boneless skinless chicken breast" -> "chicken
+        breast", "fresh basil leaves" -> "basil").
+        """
+        name = normalize_ingredient(item)
+        if name not in self._lookups:
+            words = name.split()
+            row = None
+            for size in range(len(words), 0, -1):
+                for start in range(len(words) - size, -1, -1):
+                    row = self.index.get(normalize_ingredient(" ".join(words[start:start + size])))
+                    if row is not None:
+                        break
+                if row is not None:
+                    break
+            self._lookups[name] = row
+        return self._lookups[name]
+
+    def __len__(self):
+        return len(self.names)
+
+
+@functools.lru_cache(maxsize=None)
+def load_table(path=DEFAULT_TABLE_PATH):
+    """Bundled nutrient table, loaded once per process"""
+    return NutrientTable.from_csv(path)
+
+
+@dataclass
+class NutritionResult:
+    total: Nutrition
+    per_serving: Nutrition
+    servings: int = 1
+    matched: list = field(default_factory=list)
+    unmatched: list = field(default_factory=list)
+
+    @property
+    def coverage(self):
+        """Share of measured ingredients that could be counted"""
+        measured = len(self.matched) + len(self.unmatched)
+        return len(self.matched) / measured if measured else 0.0
+
+
+def parse_servings(recipe, default=1):
+    """Servings of a structured ``Recipe`` or from the "Servings: N" line of markdown"""
+    if hasattr(recipe, "servings"):
+        return recipe.servings or default
+    match = _SERVINGS_RE.search(recipe)
+    return int(match.group(1)) if match and int(match.group(1)) > 0 else default
+
+
+def _nutrition(values):
+    return Nutrition(**{nutrient: round(float(value), 1) for nutrient, value in zip(NUTRIENTS, values)})
+
+
+def analyze_recipes(recipes, servings=None, table=None):
+    """Nutrition of many recipes (markdown or structured) in one vectorized pass.
+
+    ``servings`` optionally overrides the servings of each recipe. Returns
+    one ``NutritionResult`` per recipe, in order. Ingredients without a
+    quantity ("salt to taste") are skipped.
+    """
+    table = table or load_table()
+    recipe_idx, rows, amounts, kinds, names = [], [], [], [], []
+    servings_list = []
+    for idx, recipe in enumerate(recipes):
+        servings_list.append(servings[idx] if servings else parse_servings(recipe))
+        for ingredient in parse_recipe_ingredients(recipe):
+            if ingredient.quantity is None:
+                continue
+            row = table.lookup(ingredient.item)
+            unit = ingredient.unit
+            if unit in UNITS and unit:
+                amount, dim = to_base(ingredient.quantity, unit)
+                kind = _MASS if dim == "mass" else _VOLUME
+            elif unit in _PACKAGE_GRAMS:
+                amount, kind = ingredient.quantity * _PACKAGE_GRAMS[unit], _FIXED
+            elif unit in _PIECE_UNITS:
+                amount, kind = ingredient.quantity, _PIECE
+            else:
+                row = None
+                amount, kind = 0.0, _FIXED
+            recipe_idx.append(idx)
+            rows.append(-1 if row is None else row)
+            amounts.append(amount)
+            kinds.append(kind)
+            names.append(ingredient.item)
+
+    count = len(servings_list)
+    totals = np.zeros((count, len(NUTRIENTS)))
+    known = np.zeros(0, dtype=bool)
+    if rows:
+        recipe_idx = np.asarray(recipe_idx)
+        rows = np.asarray(rows)
+        amounts = np.asarray(amounts, dtype=np.float64)
+        kinds = np.asarray(kinds)
+        safe_rows = np.where(rows >= 0, rows, 0)
+        grams = np.select(
+            [kinds == _MASS, kinds == _VOLUME, kinds == _PIECE],
+            [amounts, amounts * table.grams_per_ml[safe_rows], amounts * table.grams_per_piece[safe_rows]],
+            default=amounts,
+        )
+        known = (rows >= 0) & ~np.isnan(grams)
+        np.add.at(
+            totals,
+            recipe_idx[known],
+            grams[known, None] * table.per_gram[safe_rows[known]],
+        )
+
+    results = []
+    for idx in range(count):
+        serving_count = max(int(servings_list[idx] or 1), 1)
+        result = NutritionResult(
+            total=_nutrition(totals[idx]),
+            per_serving=_nutrition(totals[idx] / serving_count),
+            servings=serving_count,
+        )
+        results.append(result)
+    for position, name in enumerate(names):
+        result = results[recipe_idx[position]]
+        (result.matched if known[position] else result.unmatched).append(name)
+    return results
+
+
+def analyze_recipe(recipe, servings=None, table=None):
+    """Nutrition of one recipe; see ``analyze_recipes``"""
+    return analyze_recipes([recipe], [servings] if servings else None, table)[0]
+
+
+def combine(results, days=1):
+    """Per-person nutrition of eating one serving of every recipe, averaged per day
+
+    Use for a meal plan or any collection of recipes.
+    """
+    totals = np.sum([[getattr(r.per_serving, n) for n in NUTRIENTS] for r in results], axis=0) \
+        if results else np.zeros(len(NUTRIENTS))
+    return _nutrition(totals / max(days, 1))
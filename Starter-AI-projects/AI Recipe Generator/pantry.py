@@ -0,0 +1,206 @@
+"""
+Virtual pantry with normalized keys and a fuzzy-match index
+
+Items are stored under their canonical ingredient name (see ingredients.py),
+so membership checks, removal and updates are dictionary operations. A
+trigram index supports fuzzy lookups ("tomatoe" -> "tomato") and a sorted
+word index supports prefix autocomplete, so pantry-aware matching stays fast
+with hundreds of items.
+"""
+
+import bisect
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, timedelta
+
+from ingredients import normalize_ingredient
+from units import dimension, to_base
+
+FUZZY_THRESHOLD = 0.6
+
+# Words that describe an ingredient without making it a different one, so
+# "salt" covers "kosher salt" but "butter" does not cover "peanut butter"
+DESCRIPTORS = {
+    "fresh", "large", "small", "medium", "big", "whole", "raw", "ripe", "organic", "frozen",
+    "chopped", "diced", "minced", "sliced", "grated", "shredded", "crushed", "peeled", "cubed",
+    "kosher", "sea", "table", "fine", "coarse", "boneless", "skinless", "plain", "good", "quality",
+}
+
+
+@dataclass
+class PantryItem:
+    name: str
+    quantity: float = None
+    unit: str = ""
+    expires: date = None
+
+    def to_dict(self):
+        data = asdict(self)
+        data["expires"] = self.expires.isoformat() if self.expires else None
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        if data.get("expires"):
+            data["expires"] = date.fromisoformat(data["expires"])
+        return cls(**data)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class Pantry:
+    """Pantry items keyed by canonical name, with trigram and prefix indexes"""
+
+    def __init__(self, items=()):
+        self._items = {}
+        self._trigrams = defaultdict(set)
+        self._words = []  # sorted (word, key) pairs for prefix lookups
+        for item in items:
+            if isinstance(item, PantryItem):
+                self.add(item.name, item.quantity, item.unit, item.expires)
+            else:
+                self.add(item)
+
+    @staticmethod
+    def key(name):
+        return normalize_ingredient(name)
+
+    def add(self, name, quantity=None, unit="", expires=None):
+        """Add an item or top up an existing one; returns True if it was new.
+
+        Quantities in convertible units are summed and the earliest expiry
+        date is kept.
+        """
+        key = self.key(name)
+        if not key:
+            return False
+        existing = self._items.get(key)
+        if existing is None:
+            self._items[key] = PantryItem(name.strip(), quantity, unit, expires)
+            for gram in trigrams(key):
+                self._trigrams[gram].add(key)
+            for word in key.split():
+                bisect.insort(self._words, (word, key))
+            return True
+
+        if quantity is not None:
+            if existing.quantity is None:
+                existing.quantity, existing.unit = quantity, unit
+            elif dimension(existing.unit) == dimension(unit):
+                added, _ = to_base(quantity, unit)
+                existing.quantity += added / to_base(1, existing.unit)[0]
+        if expires and (existing.expires is None or expires < existing.expires):
+            existing.expires = expires
+        return False
+
+    def remove(self, name):
+        """Remove an item by any spelling of its name; returns True if it was present"""
+        key = self.key(name)
+        item = self._items.pop(key, None)
+        if item is None:
+            return False
+        for gram in trigrams(key):
+            self._trigrams[gram].discard(key)
+            if not self._trigrams[gram]:
+                del self._trigrams[gram]
+        for word in key.split():
+            idx = bisect.bisect_left(self._words, (word, key))
+            del self._words[idx]
+        return True
+
+    def clear(self):
+        self._items.clear()
+        self._trigrams.clear()
+        self._words.clear()
+
+    def get(self, name):
+        """Return the matching ``PantryItem`` (exact or fuzzy) or None"""
+        key = self.match(name)
+        return self._items[key] if key else None
+
+    def match(self, name, threshold=FUZZY_THRESHOLD):
+        """Return the key of the pantry item covering ``name``, or None.
+
+        Tries the exact canonical name, then a pantry item naming the same
+        thing with fewer descriptors ("salt" covers "kosher salt", "chicken
+        breast" covers "fresh chicken breast", but "butter" does not cover
+        "peanut butter"), then the most similar item by trigram overlap with
+        as many words, which catches misspellings ("tomatoe").
+        """
+        key = self.key(name)
+        if not key:
+            return None
+        if key in self._items:
+            return key
+
+        words = key.split()
+        for _, candidate in self._with_word(words[-1]):
+            named = set(candidate.split())
+            if named <= set(words) and set(words) - named <= DESCRIPTORS:
+                return candidate
+
+        grams = trigrams(key)
+        overlap = defaultdict(int)
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                overlap[candidate] += 1
+        best, best_score = None, threshold
+        for candidate, shared in overlap.items():
+            if len(candidate.split()) != len(words):
+                continue
+            score = shared / (len(grams) + len(trigrams(candidate)) - shared)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
+
+    def _with_word(self, word):
+        idx = bisect.bisect_left(self._words, (word, ""))
+        while idx < len(self._words) and self._words[idx][0] == word:
+            yield self._words[idx]
+            idx += 1
+
+    def complete(self, prefix, limit=8):
+        """Return display names of items with a word starting with ``prefix``"""
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        found = []
+        idx = bisect.bisect_left(self._words, (prefix, ""))
+        while idx < len(self._words) and self._words[idx][0].startswith(prefix) and len(found) < limit:
+            key = self._words[idx][1]
+            if self._items[key].name not in found:
+                found.append(self._items[key].name)
+            idx += 1
+        return found
+
+    def expiring(self, within_days=3, today=None):
+        """Items expiring within ``within_days`` days (including expired ones), soonest first"""
+        cutoff = (today or date.today()) + timedelta(days=within_days)
+        soon = [item for item in self._items.values() if item.expires and item.expires <= cutoff]
+        return sorted(soon, key=lambda item: item.expires)
+
+    def items(self):
+        return list(self._items.values())
+
+    def to_list(self):
+        return [item.to_dict() for item in self._items.values()]
+
+    @classmethod
+    def from_list(cls, data):
+        return cls(PantryItem.from_dict(item) for item in data)
+
+    def __contains__(self, name):
+        return self.match(name) is not None
+
+    def __iter__(self):
+        return (item.name for item in self._items.values())
+
+    def __len__(self):
+        return len(self._items)
+
+    def __bool__(self):
+        return bool(self._items)
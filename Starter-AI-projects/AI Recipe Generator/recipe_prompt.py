@@ -0,0 +1,126 @@
+"""
+Prompt for the Pro app's recipe generation
+
+Shared by ``app_advanced.py`` and the batch CLI (``batch_generate.py``) so
+both send byte-for-byte the same request - and therefore hit the same
+response cache entries - for the same inputs.
+
+The prompts are ``PromptTemplate``s (see ai_core/prompts.py): the role,
+output format and requirements form a static system message that is
+identical on every call, so the provider can cache it, and the request's
+fields come last in the user message, most variable (the ingredients) at
+the very end. ``python batch_generate.py --prompts`` prints the measured
+prefix sizes.
+"""
+
+from ai_core.prompts import PromptRegistry, PromptTemplate
+from ingredients import canonical_ingredients
+from recipe_schema import RECIPE_MAX_TOKENS, RESPONSE_FORMAT, STRUCTURED_SYSTEM_PROMPT
+
+RECIPE_MODEL = "gpt-4o-mini"
+RECIPE_TEMPERATURE = 0.8
+MARKDOWN_MAX_TOKENS = 2500
+# Markdown recipes cut off by max_tokens are continued (see ai_core.chat)
+MAX_CONTINUATIONS = 2
+
+RECIPE_REQUIREMENTS = """Requirements:
+1. Make the best use of the available ingredients
+2. Strictly follow the dietary restrictions
+3. Match the cuisine style
+4. Be appropriate for the skill level
+5. Complete within the maximum cooking time
+6. Provide accurate nutritional estimates
+7. Include professional cooking techniques
+8. Suggest complementary ingredients if needed"""
+
+RECIPE_SYSTEM_PROMPT = """You are an expert chef and nutritionist with 20 years of experience.
+You create delicious, balanced recipes that are both tasty and nutritious.
+
+Provide recipes in the following structured format:
+
+# [Recipe Name]
+
+## Description
+[A compelling 2-3 sentence description]
+
+## Info
+- **Prep Time:** X minutes
+- **Cook Time:** X minutes
+- **Total Time:** X minutes
+- **Difficulty:** [Beginner/Intermediate/Advanced]
+- **Servings:** X
+- **Meal Type:** [Breakfast/Lunch/Dinner/Snack/Dessert]
+
+## Ingredients
+[List with exact measurements]
+
+## Instructions
+[Detailed numbered steps]
+
+## Cooking Tips
+[Professional tips and tricks]
+
+## Nutritional Information (per serving)
+- Calories: X kcal
+- Protein: X g
+- Carbohydrates: X g
+- Fat: X g
+- Fiber: X g
+- Sugar: X g
+
+## Variations
+[Possible substitutions and variations]
+
+## Wine/Beverage Pairing
+[Suggested drink pairing]
+
+""" + RECIPE_REQUIREMENTS
+
+# Least variable fields first, ingredients last
+RECIPE_USER_PROMPT = """Create an exceptional {meal_type} recipe with these specifications:
+
+**Cuisine:** {cuisine}
+**Skill Level:** {skill}
+**Max Cooking Time:** {time} minutes
+**Servings:** {servings}
+**Dietary Restrictions:** {restrictions}
+**Available Ingredients:** {ingredients}"""
+
+PROMPTS = PromptRegistry()
+MARKDOWN_PROMPT = PROMPTS.register(PromptTemplate(
+    "recipe", 1, RECIPE_SYSTEM_PROMPT, RECIPE_USER_PROMPT, RECIPE_MODEL
+))
+STRUCTURED_PROMPT = PROMPTS.register(PromptTemplate(
+    "recipe_structured", 1, STRUCTURED_SYSTEM_PROMPT + "\n" + RECIPE_REQUIREMENTS, RECIPE_USER_PROMPT, RECIPE_MODEL
+))
+
+
+def recipe_request(params, structured=False, max_tokens=None):
+    """Chat completion request (messages, model, temperature, max_tokens) for a recipe.
+
+    ``params`` uses the history keys: ingredients, restrictions, cuisine,
+    skill, time, servings and meal_type, plus an optional model. Missing keys
+    get the app's defaults. ``max_tokens`` overrides the markdown budget;
+    since markdown answers are continued when cut off, it does not change
+    the cache key. Structured (JSON) answers use a fixed budget.
+    """
+    template = STRUCTURED_PROMPT if structured else MARKDOWN_PROMPT
+    request = {
+        "messages": template.messages(
+            meal_type=params.get("meal_type") or "Any",
+            cuisine=params.get("cuisine") or "Any",
+            skill=params.get("skill") or "Beginner",
+            time=params.get("time") or 45,
+            servings=params.get("servings") or 4,
+            restrictions=params.get("restrictions") or "None",
+            ingredients=canonical_ingredients(params["ingredients"]),
+        ),
+        "model": params.get("model") or RECIPE_MODEL,
+        "temperature": RECIPE_TEMPERATURE,
+        "max_tokens": RECIPE_MAX_TOKENS if structured else max_tokens or MARKDOWN_MAX_TOKENS,
+    }
+    if structured:
+        request["response_format"] = RESPONSE_FORMAT
+    else:
+        request["max_continuations"] = MAX_CONTINUATIONS
+    return request
@@ -0,0 +1,193 @@
+"""
+Structured recipe model for the AI Recipe Generator Pro
+
+In structured mode the model returns JSON matching ``RECIPE_JSON_SCHEMA``
+instead of free markdown. The JSON is loaded into a ``Recipe`` and rendered to
+the same markdown layout locally, while the typed fields (ingredient
+quantities, nutrition) are kept for local features such as shopping lists.
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from fractions import Fraction
+
+STRUCTURED_SYSTEM_PROMPT = """You are an expert chef and nutritionist with 20 years of experience. 
+You create delicious, balanced recipes that are both tasty and nutritious.
+
+Return the recipe as JSON matching the provided schema:
+- ingredients: one entry per ingredient with a numeric quantity (null if unmeasured, e.g. "salt to taste"),
+  a short unit ("g", "cup", "tbsp", "" for whole items) and the ingredient name without the amount
+- instructions: detailed steps in order, without numbering
+- nutrition: per-serving estimates in kcal and grams
+"""
+
+RECIPE_MAX_TOKENS = 2500
+
+_STRING_LIST = {"type": "array", "items": {"type": "string"}}
+
+RECIPE_JSON_SCHEMA = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": [
+        "name", "description", "prep_time", "cook_time", "difficulty", "servings", "meal_type",
+        "ingredients", "instructions", "tips", "nutrition", "variations", "pairing",
+    ],
+    "properties": {
+        "name": {"type": "string"},
+        "description": {"type": "string"},
+        "prep_time": {"type": "integer", "description": "minutes"},
+        "cook_time": {"type": "integer", "description": "minutes"},
+        "difficulty": {"type": "string", "enum": ["Beginner", "Intermediate", "Advanced"]},
+        "servings": {"type": "integer", "description": "1-50"},
+        "meal_type": {"type": "string"},
+        "ingredients": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "additionalProperties": False,
+                "required": ["quantity", "unit", "item", "note"],
+                "properties": {
+                    "quantity": {"type": ["number", "null"]},
+                    "unit": {"type": "string"},
+                    "item": {"type": "string"},
+                    "note": {"type": "string"},
+                },
+            },
+        },
+        "instructions": _STRING_LIST,
+        "tips": _STRING_LIST,
+        "nutrition": {
+            "type": "object",
+            "additionalProperties": False,
+            "required": ["calories", "protein", "carbohydrates", "fat", "fiber", "sugar"],
+            "properties": {
+                name: {"type": "number"}
+                for name in ("calories", "protein", "carbohydrates", "fat", "fiber", "sugar")
+            },
+        },
+        "variations": _STRING_LIST,
+        "pairing": {"type": "string"},
+    },
+}
+
+RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "recipe", "strict": True, "schema": RECIPE_JSON_SCHEMA},
+}
+
+
+@dataclass
+class Ingredient:
+    item: str
+    quantity: float = None
+    unit: str = ""
+    note: str = ""
+
+
+@dataclass
+class Nutrition:
+    """Per-serving nutrition in kcal and grams"""
+    calories: float = 0
+    protein: float = 0
+    carbohydrates: float = 0
+    fat: float = 0
+    fiber: float = 0
+    sugar: float = 0
+
+
+@dataclass
+class Recipe:
+    name: str
+    description: str = ""
+    prep_time: int = 0
+    cook_time: int = 0
+    difficulty: str = ""
+    servings: int = 1
+    meal_type: str = ""
+    ingredients: list = field(default_factory=list)
+    instructions: list = field(default_factory=list)
+    tips: list = field(default_factory=list)
+    nutrition: Nutrition = field(default_factory=Nutrition)
+    variations: list = field(default_factory=list)
+    pairing: str = ""
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data["ingredients"] = [Ingredient(**item) for item in data.get("ingredients", [])]
+        data["nutrition"] = Nutrition(**data.get("nutrition", {}))
+        return cls(**data)
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def recipe_from_json(text):
+    """Parse the model's JSON answer into a ``Recipe``; raises ValueError if it does not fit"""
+    try:
+        return Recipe.from_dict(json.loads(text))
+    except (TypeError, KeyError, json.JSONDecodeError) as e:
+        raise ValueError(f"Invalid structured recipe: {e}") from e
+
+
+def format_quantity(quantity):
+    """Format a quantity as a kitchen-friendly number, e.g. 1.5 -> "1 1/2" """
+    if quantity is None:
+        return ""
+    fraction = Fraction(quantity).limit_denominator(8)
+    if abs(float(fraction) - quantity) > 0.01:
+        return f"{quantity:g}"
+    if fraction.denominator == 1:
+        return str(fraction.numerator)
+    whole, rest = divmod(fraction.numerator, fraction.denominator)
+    rest = f"{rest}/{fraction.denominator}"
+    return f"{whole} {rest}" if whole else rest
+
+
+def format_ingredient(ingredient):
+    parts = [format_quantity(ingredient.quantity), ingredient.unit, ingredient.item]
+    text = " ".join(part for part in parts if part)
+    return f"{text}, {ingredient.note}" if ingredient.note else text
+
+
+def render_markdown(recipe):
+    """Render a ``Recipe`` in the same layout as the markdown-mode template"""
+    n = recipe.nutrition
+    lines = [
+        f"# {recipe.name}",
+        "",
+        "## Description",
+        recipe.description,
+        "",
+        "## Info",
+        f"- **Prep Time:** {recipe.prep_time} minutes",
+        f"- **Cook Time:** {recipe.cook_time} minutes",
+        f"- **Total Time:** {recipe.prep_time + recipe.cook_time} minutes",
+        f"- **Difficulty:** {recipe.difficulty}",
+        f"- **Servings:** {recipe.servings}",
+        f"- **Meal Type:** {recipe.meal_type}",
+        "",
+        "## Ingredients",
+        *[f"- {format_ingredient(ingredient)}" for ingredient in recipe.ingredients],
+        "",
+        "## Instructions",
+        *[f"{idx}. {step}" for idx, step in enumerate(recipe.instructions, 1)],
+        "",
+        "## Cooking Tips",
+        *[f"- {tip}" for tip in recipe.tips],
+        "",
+        "## Nutritional Information (per serving)",
+        f"- Calories: {n.calories:g} kcal",
+        f"- Protein: {n.protein:g} g",
+        f"- Carbohydrates: {n.carbohydrates:g} g",
+        f"- Fat: {n.fat:g} g",
+        f"- Fiber: {n.fiber:g} g",
+        f"- Sugar: {n.sugar:g} g",
+        "",
+        "## Variations",
+        *[f"- {variation}" for variation in recipe.variations],
+        "",
+        "## Wine/Beverage Pairing",
+        recipe.pairing,
+    ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,83 @@
+"""
+Local recipe scaling by servings
+
+Rescales ingredient quantities by new servings / old servings and re-expresses
+them in the most readable unit of the same measuring system (units.best_unit),
+so doubling 1 1/2 tsp gives 1 tbsp and halving 3/4 cup gives 6 tbsp. Works
+on structured ``Recipe`` objects and on markdown recipes (ingredient lines are
+re-parsed and rewritten). Per-serving nutrition does not change, so it is
+kept as is.
+"""
+
+import re
+from dataclasses import replace
+
+from nutrition import parse_servings
+from recipe_schema import Ingredient, format_quantity
+from shopping import parse_ingredient_line
+from units import best_unit, canonical_unit, unit_label
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+")
+_HEADING_RE = re.compile(r"^\s*(#{1,6})\s+(.*)$")
+_SERVINGS_LINE_RE = re.compile(r"(servings?\W*)(\d+)", re.IGNORECASE)
+
+
+def scale_quantity(quantity, unit, factor):
+    """Scale a quantity and pick a readable unit; returns (quantity, canonical unit)
+
+    Units are kept canonical ("cup", "clove") so nutrition and shopping lists
+    can parse them again; they are only pluralized when a line is written out.
+    """
+    if quantity is None:
+        return None, unit
+    canonical = canonical_unit(unit) if unit else ""
+    if canonical is None:
+        return quantity * factor, unit
+    return best_unit(quantity * factor, canonical)
+
+
+def scale_recipe(recipe, servings):
+    """Copy of a structured ``Recipe`` rescaled to ``servings``"""
+    factor = servings / (recipe.servings or 1)
+    ingredients = []
+    for ingredient in recipe.ingredients:
+        quantity, unit = scale_quantity(ingredient.quantity, ingredient.unit, factor)
+        ingredients.append(Ingredient(ingredient.item, quantity, unit, ingredient.note))
+    return replace(recipe, servings=servings, ingredients=ingredients)
+
+
+def _format_line(ingredient):
+    unit = ingredient.unit
+    if unit and canonical_unit(unit):
+        unit = unit_label(ingredient.quantity, canonical_unit(unit))
+    parts = [format_quantity(ingredient.quantity), unit, ingredient.item]
+    text = " ".join(part for part in parts if part)
+    return f"{text}, {ingredient.note}" if ingredient.note else text
+
+
+def scale_markdown(markdown, servings):
+    """Rescale a markdown recipe to ``servings``.
+
+    Ingredient lines with a quantity are rewritten in a normalized form;
+    other lines (and everything outside the Ingredients section apart from
+    the servings count) are left untouched.
+    """
+    factor = servings / parse_servings(markdown)
+    lines = []
+    level = None  # Heading level of the Ingredients section while inside it
+    for line in markdown.splitlines():
+        heading = _HEADING_RE.match(line)
+        if heading:
+            depth = len(heading.group(1))
+            if level is None or depth <= level:
+                level = depth if "ingredient" in heading.group(2).lower() else None
+        elif level is not None and _BULLET_RE.match(line):
+            parsed = parse_ingredient_line(line)
+            if parsed and parsed.quantity is not None:
+                quantity, unit = scale_quantity(parsed.quantity, parsed.unit, factor)
+                bullet = _BULLET_RE.match(line).group(0)
+                line = bullet + _format_line(Ingredient(parsed.item, quantity, unit, parsed.note))
+        elif level is None and _SERVINGS_LINE_RE.search(line):
+            line = _SERVINGS_LINE_RE.sub(lambda m: f"{m.group(1)}{servings}", line, count=1)
+        lines.append(line)
+    return "\n".join(lines) + ("\n" if markdown.endswith("\n") else "")
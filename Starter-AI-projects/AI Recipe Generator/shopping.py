@@ -0,0 +1,204 @@
+"""
+Local shopping list engine
+
+Parses recipe ingredient lines into (quantity, unit, item), drops what is
+already in the pantry and adds up quantities of the same ingredient across
+recipes - all without an API call. Pantry lookups use the indexed ``Pantry``
+from pantry.py, and pantry quantities are subtracted when units allow. ``build_shopping_list`` returns None when
+nothing could be parsed so callers can fall back to the LLM.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+from ingredients import normalize_ingredient
+from pantry import Pantry
+from recipe_schema import format_quantity
+from units import best_unit, canonical_unit, dimension, to_base, unit_label
+
+UNICODE_FRACTIONS = {
+    "½": 0.5, "⅓": 1 / 3, "⅔": 2 / 3, "¼": 0.25, "¾": 0.75,
+    "⅕": 0.2, "⅖": 0.4, "⅗": 0.6, "⅘": 0.8, "⅙": 1 / 6, "⅚": 5 / 6,
+    "⅛": 0.125, "⅜": 0.375, "⅝": 0.625, "⅞": 0.875,
+}
+
+# Phrases that describe the amount rather than the ingredient
+_VAGUE_AMOUNTS = ("to taste", "as needed", "for garnish", "for serving", "optional")
+
+_BULLET_RE = re.compile(r"^\s*(?:[-*•+]|\d+[.)])\s+")
+_NUMBER = r"(?:\d+\s+\d+/\d+|\d+/\d+|\d*\.\d+|\d+)"
+_QUANTITY_RE = re.compile(rf"^({_NUMBER})(?:\s*(?:-|–|to)\s*({_NUMBER}))?\s*")
+_PAREN_RE = re.compile(r"\([^)]*\)")
+_HEADING_RE = re.compile(r"^\s*(#{1,6})\s+(.*)$")
+
+
+@dataclass
+class ParsedIngredient:
+    item: str
+    quantity: float = None
+    unit: str = ""
+    note: str = ""
+
+
+@dataclass
+class ShoppingItem:
+    item: str
+    quantity: float = None
+    unit: str = ""
+    recipes: set = field(default_factory=set)
+
+
+def parse_number(text):
+    """Parse "2", "1.5", "1/2" or "1 1/2" into a float"""
+    total = 0.0
+    for part in text.split():
+        if "/" in part:
+            numerator, denominator = part.split("/")
+            total += float(numerator) / float(denominator)
+        else:
+            total += float(part)
+    return total
+
+
+def parse_ingredient_line(line):
+    """Parse one ingredient line such as "- 1 1/2 cups rice, rinsed".
+
+    Returns a ``ParsedIngredient`` or None for blank lines. Ranges ("2-3")
+    use the upper bound so the list never comes up short.
+    """
+    text = _BULLET_RE.sub("", line.strip()).replace("**", "").strip()
+    for symbol, value in UNICODE_FRACTIONS.items():
+        text = re.sub(rf"(\d)\s*{symbol}", lambda m: f"{m.group(1)} {value}", text)
+        text = text.replace(symbol, f" {value} ")
+    text = re.sub(r"(\d+) (0?\.\d+)", lambda m: str(float(m.group(1)) + float(m.group(2))), text.strip())
+    if not text:
+        return None
+
+    quantity = None
+    match = _QUANTITY_RE.match(text)
+    if match:
+        quantity = parse_number(match.group(2) or match.group(1))
+        text = text[match.end():]
+    elif re.match(r"^an?\s", text, re.IGNORECASE):
+        # "a pinch of salt", "an onion"
+        quantity = 1.0
+        text = text.split(None, 1)[1] if len(text.split()) > 1 else ""
+
+    text = _PAREN_RE.sub(" ", text).strip()
+    unit = ""
+    words = text.split()
+    for size in (2, 1):
+        candidate = canonical_unit(" ".join(words[:size])) if len(words) > size else None
+        if candidate:
+            unit = candidate
+            words = words[size:]
+            break
+    if words and words[0].lower() == "of":
+        words = words[1:]
+    text = " ".join(words)
+
+    item, _, note = text.partition(",")
+    for phrase in _VAGUE_AMOUNTS:
+        if phrase in item.lower():
+            item = re.sub(re.escape(phrase), "", item, flags=re.IGNORECASE)
+            note = ", ".join(part for part in (phrase, note.strip()) if part)
+    item = " ".join(item.split())
+    if not item:
+        return None
+    return ParsedIngredient(item=item, quantity=quantity, unit=unit, note=note.strip())
+
+
+def extract_ingredient_lines(markdown):
+    """Return the list lines under the recipe's "Ingredients" heading
+
+    Deeper headings ("### For the sauce") are subsections of the list; the
+    section ends at the next heading of the same or a higher level.
+    """
+    lines = []
+    level = None
+    for line in markdown.splitlines():
+        heading = _HEADING_RE.match(line)
+        if heading:
+            depth = len(heading.group(1))
+            if level is not None:
+                if depth <= level:
+                    break
+            elif "ingredient" in heading.group(2).lower():
+                level = depth
+            continue
+        if level is not None and _BULLET_RE.match(line):
+            lines.append(line)
+    return lines
+
+
+def parse_recipe_ingredients(recipe):
+    """Return parsed ingredients from markdown text or a structured ``Recipe``"""
+    if hasattr(recipe, "ingredients"):
+        return [ParsedIngredient(i.item, i.quantity, canonical_unit(i.unit) or i.unit if i.unit else "", i.note)
+                for i in recipe.ingredients]
+    parsed = (parse_ingredient_line(line) for line in extract_ingredient_lines(recipe))
+    return [ingredient for ingredient in parsed if ingredient]
+
+
+def build_shopping_list(recipes, pantry_items=()):
+    """Aggregate the ingredients of ``recipes`` that are not in the pantry.
+
+    ``recipes`` maps a recipe label to its markdown text or structured
+    ``Recipe`` (a single recipe may be passed directly). ``pantry_items`` is
+    a ``Pantry`` or an iterable of names. Quantities of the same ingredient
+    are summed when their units are convertible, and a pantry item with a
+    known quantity only covers that much. Returns a list of ``ShoppingItem``
+    or None if no ingredients could be parsed.
+    """
+    if not isinstance(recipes, dict):
+        recipes = {"Recipe": recipes}
+    pantry = pantry_items if isinstance(pantry_items, Pantry) else Pantry(pantry_items)
+
+    totals = {}
+    parsed_any = False
+    for label, recipe in recipes.items():
+        for ingredient in parse_recipe_ingredients(recipe):
+            parsed_any = True
+            name = normalize_ingredient(ingredient.item)
+            if not name:
+                continue
+            unit = ingredient.unit if ingredient.quantity is not None else ""
+            key = (name, dimension(unit) if ingredient.quantity is not None else None)
+            entry = totals.setdefault(key, {"item": ingredient.item, "base": None, "recipes": set()})
+            entry["recipes"].add(label)
+            if ingredient.quantity is not None:
+                base, _ = to_base(ingredient.quantity, unit)
+                entry["base"] = (entry["base"] or 0) + base
+                entry["unit"] = unit
+
+    if not parsed_any:
+        return None
+
+    items = []
+    for (name, dim), entry in sorted(totals.items(), key=lambda kv: kv[0][0]):
+        stocked = pantry.get(name)
+        if stocked is not None:
+            if stocked.quantity is None or entry["base"] is None or dimension(stocked.unit) != dim:
+                continue
+            entry["base"] -= to_base(stocked.quantity, stocked.unit)[0]
+            if entry["base"] <= 1e-9:
+                continue
+        quantity, unit = None, ""
+        if entry["base"] is not None:
+            unit = entry["unit"]
+            quantity, unit = best_unit(entry["base"] / (to_base(1, unit)[0] or 1), unit)
+        items.append(ShoppingItem(item=entry["item"], quantity=quantity, unit=unit, recipes=entry["recipes"]))
+    return items
+
+
+def format_shopping_list(items):
+    """Render shopping items as a markdown bullet list"""
+    if not items:
+        return "Everything is already in your pantry! 🎉"
+    lines = []
+    for item in items:
+        unit = unit_label(item.quantity, item.unit)
+        amount = " ".join(part for part in (format_quantity(item.quantity), unit) if part)
+        sources = f" _({', '.join(sorted(item.recipes))})_" if len(item.recipes) > 1 else ""
+        lines.append(f"- {amount + ' ' if amount else ''}{item.item}{sources}")
+    return "\n".join(lines)
@@ -0,0 +1,69 @@
+"""
+Find previously generated recipes that already answer a new request
+
+Requests are compared on what they ask the model to cook (ingredients, cuisine,
+skill level) with ai_core.similarity. Constraints a recipe must not violate are
+checked exactly instead: the same dietary restrictions and meal type, and a
+cooking time no longer than the new limit.
+"""
+
+import os
+
+from ai_core.similarity import SimilarityIndex
+from ingredients import normalize_ingredients
+
+DEFAULT_THRESHOLD = 0.85
+
+
+def threshold_from_env():
+    """Minimum cosine similarity for a hit (SIMILAR_RECIPE_THRESHOLD, default 0.85)"""
+    return float(os.getenv("SIMILAR_RECIPE_THRESHOLD", DEFAULT_THRESHOLD))
+
+
+def request_text(params):
+    """Text a history entry or request is embedded as"""
+    return " ".join(
+        normalize_ingredients(params.get("ingredients") or "")
+        + [params.get("cuisine") or "", params.get("skill") or ""]
+    )
+
+
+def _normalized(value):
+    return " ".join(str(value or "").lower().split())
+
+
+def satisfies(entry, params):
+    """Whether a stored recipe respects the hard constraints of a new request"""
+    try:
+        fits_time = int(entry.get("time") or 0) <= int(params.get("time") or 0)
+    except (TypeError, ValueError):
+        fits_time = False
+    return (
+        fits_time
+        and _normalized(entry.get("restrictions")) == _normalized(params.get("restrictions"))
+        and _normalized(entry.get("meal_type")) == _normalized(params.get("meal_type"))
+    )
+
+
+class SimilarRecipes:
+    """Index of generated recipes keyed by their request parameters"""
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self._index = SimilarityIndex()
+
+    def add(self, entry):
+        """Index a history entry (request params plus ``content``)"""
+        self._index.add(request_text(entry), entry)
+
+    def find(self, params, k=1):
+        """Best (score, entry) matches for request params above the threshold"""
+        return self._index.query(
+            request_text(params),
+            k=k,
+            threshold=self.threshold,
+            where=lambda entry: satisfies(entry, params),
+        )
+
+    def __len__(self):
+        return len(self._index)
@@ -0,0 +1,66 @@
+"""
+Unit tests for ingredient canonicalization
+Run with: pytest test_ingredients.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from ingredients import canonical_ingredients, normalize_ingredient, normalize_ingredients, singularize
+
+
+class TestSingularize:
+    """Test suite for plural handling"""
+
+    @pytest.mark.parametrize("plural,singular", [
+        ("tomatoes", "tomato"),
+        ("berries", "berry"),
+        ("cherries", "cherry"),
+        ("pies", "pie"),
+        ("cookies", "cookie"),
+        ("brownies", "brownie"),
+        ("smoothies", "smoothie"),
+        ("onions", "onion"),
+        ("peaches", "peach"),
+        ("leaves", "leaf"),
+        ("grapes", "grape"),
+        ("asparagus", "asparagus"),
+        ("molasses", "molasses"),
+        ("rice", "rice"),
+    ])
+    def test_singularize(self, plural, singular):
+        assert singularize(plural) == singular
+
+
+class TestNormalization:
+    """Test suite for ingredient normalization"""
+
+    def test_equivalent_inputs_match(self):
+        assert canonical_ingredients("Chicken, tomato ,garlic") == \
+            canonical_ingredients("garlic, chicken, tomatoes")
+
+    def test_sorted_and_deduplicated(self):
+        assert normalize_ingredients("Onions; onion\nGarlic,,  ") == ["garlic", "onion"]
+
+    def test_aliases(self):
+        assert normalize_ingredient("Spring Onions") == "scallion"
+        assert normalize_ingredient("garbanzo beans") == "chickpea"
+        assert normalize_ingredient("Extra-Virgin Olive Oil!") == "olive oil"
+
+    def test_punctuation_and_bullets(self):
+        assert normalize_ingredient("- Bay leaves.") == "bay leaf"
+        assert normalize_ingredient("  ") == ""
+
+    def test_quantities_are_kept(self):
+        assert normalize_ingredient("1/2 cup milk") == "1/2 cup milk"
+        assert normalize_ingredient("2.5 lbs chicken breasts.") == "2.5 lbs chicken breast"
+
+    def test_ampersand_dishes_are_one_item(self):
+        assert normalize_ingredients("mac & cheese, salt & pepper") == ["mac & cheese", "salt & pepper"]
+
+    def test_accepts_iterables(self):
+        assert canonical_ingredients(["Rice", "rice", "Beans"]) == "bean, rice"
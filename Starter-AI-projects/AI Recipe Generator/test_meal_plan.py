@@ -0,0 +1,44 @@
+"""
+Unit tests for per-day meal plan splitting and merging
+Run with: pytest test_meal_plan.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from meal_plan import build_day_prompt, merge_day_plans, plan_days
+
+
+class TestPlanDays:
+    """Test suite for the shared variety constraint"""
+
+    def test_every_ingredient_featured_and_styles_distinct(self):
+        ingredients = ["beef", "chicken", "pasta", "rice", "tofu"]
+        plan = plan_days(ingredients, 3)
+        assert len(plan) == 3
+        assert sorted(i for day in plan for i in day["featured"]) == ingredients
+        assert len({day["style"] for day in plan}) == 3
+
+    def test_more_days_than_ingredients(self):
+        plan = plan_days(["rice"], 4)
+        assert all(day["featured"] for day in plan)
+
+    def test_prompt_mentions_other_days(self):
+        plan = plan_days(["beef", "chicken"], 2)
+        prompt = build_day_prompt(1, plan, ["beef", "chicken"], "Keto")
+        assert "Day 1 of a 2-day" in prompt
+        assert "- Day 2:" in prompt
+        assert "Keto" in prompt
+
+
+class TestMerge:
+    """Test suite for merging day sections"""
+
+    def test_merge_orders_days_and_strips_model_headings(self):
+        merged = merge_day_plans(["## Day 1: Monday\n- Breakfast: Oats", "- Breakfast: Eggs"])
+        assert merged.startswith("# 2-Day Meal Plan")
+        assert merged.index("## Day 1") < merged.index("## Day 2")
+        assert "Monday" not in merged
+        assert "Eggs" in merged
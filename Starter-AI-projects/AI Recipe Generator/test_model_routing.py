@@ -0,0 +1,65 @@
+"""
+Unit tests for model routing
+Run with: pytest test_model_routing.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from model_routing import AUTO, FAST_MODEL, Budget, estimate_cost, route, route_request
+from recipe_prompt import recipe_request
+
+
+class TestRoute:
+    """Test per-task defaults, the sidebar choice and budgets"""
+
+    def test_auto_uses_bigger_model_only_for_recipes(self):
+        assert route("recipe", AUTO) == "gpt-4o"
+        assert route("meal_plan", AUTO) == FAST_MODEL
+        assert route("suggestions", AUTO) == FAST_MODEL
+
+    def test_selection_applies_to_heavy_tasks(self):
+        assert route("recipe", "gpt-4 (Best Quality)") == "gpt-4"
+        assert route("meal_plan", "gpt-4o (Balanced)") == "gpt-4o"
+        assert route("shopping_list", "gpt-4 (Best Quality)") == FAST_MODEL
+
+    def test_latency_budget_steps_down(self):
+        budget = Budget(max_seconds=30)
+        assert route("recipe", "gpt-4 (Best Quality)", budget, max_tokens=2500) == FAST_MODEL
+        assert route("recipe", "gpt-4 (Best Quality)", budget, max_tokens=1000) == "gpt-4o"
+        assert route("recipe", "gpt-4 (Best Quality)", budget, max_tokens=500) == "gpt-4"
+
+    def test_cost_budget_steps_down(self):
+        budget = Budget(max_cost=estimate_cost("gpt-4o", 500, 2500))
+        assert route("recipe", "gpt-4 (Best Quality)", budget, 500, 2500) == "gpt-4o"
+
+    def test_nothing_fits_falls_back_to_fast_model(self):
+        assert route("recipe", AUTO, Budget(max_seconds=0.1)) == FAST_MODEL
+
+    def test_budget_from_env(self, monkeypatch):
+        monkeypatch.setenv("MODEL_LATENCY_BUDGET", "12.5")
+        assert Budget.from_env() == Budget(max_seconds=12.5, max_cost=0.0)
+
+
+class TestRouteRequest:
+    """Test routing a full request"""
+
+    def test_only_model_changes(self):
+        request = recipe_request({"ingredients": "rice"})
+        routed = route_request("recipe", request, AUTO)
+        assert routed["model"] == "gpt-4o"
+        assert routed["messages"] == request["messages"]
+        assert request["model"] == "gpt-4o-mini"
+
+    def test_structured_requests_avoid_models_without_structured_outputs(self):
+        request = recipe_request({"ingredients": "rice"}, structured=True)
+        assert "response_format" in request
+        assert route_request("recipe", request, "gpt-4 (Best Quality)")["model"] == "gpt-4o"
+        assert route_request("recipe", request, "gpt-4 (Best Quality)", Budget(max_cost=1.0))["model"] == "gpt-4o"
+        markdown = recipe_request({"ingredients": "rice"})
+        assert route_request("recipe", markdown, "gpt-4 (Best Quality)")["model"] == "gpt-4"
+
+    def test_recipe_request_model_param(self):
+        assert recipe_request({"ingredients": "rice", "model": "gpt-4o"})["model"] == "gpt-4o"
@@ -0,0 +1,88 @@
+"""
+Unit tests for the local nutrition calculator
+Run with: pytest test_nutrition.py
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from nutrition import analyze_recipe, analyze_recipes, combine, load_table, parse_servings
+from recipe_schema import Ingredient, Recipe
+
+
+MARKDOWN_RECIPE = """# Garlic Rice
+
+## Info
+- **Servings:** 2
+
+## Ingredients
+- 100 g rice
+- 1 tbsp olive oil
+- 2 cloves garlic, minced
+- Salt to taste
+
+## Instructions
+1. Cook everything.
+"""
+
+
+class TestNutrientTable:
+    """Test the bundled table and name lookup"""
+
+    def test_table_loads(self):
+        table = load_table()
+        assert len(table) > 50
+        assert table.per_gram.shape == (len(table), 6)
+
+    def test_lookup_falls_back_to_known_words(self):
+        table = load_table()
+        assert table.names[table.lookup("Boneless skinless chicken breasts")] == "chicken breast"
+        assert table.names[table.lookup("fresh basil leaves")] == "basil"
+        assert table.lookup("unobtainium") is None
+
+
+class TestAnalyze:
+    """Test per-recipe and batch nutrition"""
+
+    def test_markdown_recipe(self):
+        result = analyze_recipe(MARKDOWN_RECIPE)
+        assert result.servings == 2
+        # 100 g rice + 1 tbsp (~13.5 g) olive oil + 2 cloves (6 g) garlic
+        assert result.total.calories == pytest.approx(365 + 13.5 * 8.84 + 6 * 1.49, rel=0.02)
+        assert result.per_serving.calories == pytest.approx(result.total.calories / 2, abs=0.1)
+        assert result.unmatched == []
+        assert result.coverage == 1.0
+
+    def test_structured_recipe_and_unknown_items(self):
+        recipe = Recipe(name="Eggs", servings=1, ingredients=[
+            Ingredient("eggs", 2, ""),
+            Ingredient("moon dust", 1, "cup"),
+        ])
+        result = analyze_recipe(recipe)
+        assert result.total.protein == pytest.approx(12.6, abs=0.1)
+        assert result.unmatched == ["moon dust"]
+        assert result.coverage == 0.5
+
+    def test_batch_matches_single(self):
+        recipes = [MARKDOWN_RECIPE, Recipe(name="Milk", servings=1, ingredients=[Ingredient("milk", 1, "cup")])]
+        batch = analyze_recipes(recipes)
+        assert [r.total for r in batch] == [analyze_recipe(r).total for r in recipes]
+
+    def test_servings_override(self):
+        assert analyze_recipe(MARKDOWN_RECIPE, servings=4).servings == 4
+
+    def test_combine_per_day(self):
+        result = analyze_recipe(MARKDOWN_RECIPE)
+        plan = combine([result, result], days=2)
+        assert plan.calories == pytest.approx(result.per_serving.calories, abs=0.1)
+
+
+def test_parse_servings():
+    assert parse_servings("- **Servings:** 6") == 6
+    assert parse_servings("no info here") == 1
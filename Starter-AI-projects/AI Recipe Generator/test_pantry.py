@@ -0,0 +1,75 @@
+"""
+Unit tests for the indexed virtual pantry
+Run with: pytest test_pantry.py
+"""
+
+import os
+import sys
+from datetime import date
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pantry import Pantry
+
+
+@pytest.fixture
+def pantry():
+    return Pantry(["Salt", "Olive Oil", "tomatoes", "chicken breast"])
+
+
+class TestPantry:
+    """Test suite for pantry storage and lookups"""
+
+    def test_add_is_normalized(self, pantry):
+        assert pantry.add("Tomato") is False
+        assert pantry.add("basil") is True
+        assert len(pantry) == 5
+
+    def test_remove_any_spelling(self, pantry):
+        assert pantry.remove("TOMATO")
+        assert "tomatoes" not in list(pantry)
+        assert not pantry.remove("tomato")
+        assert pantry.complete("to") == []
+
+    @pytest.mark.parametrize("query,expected", [
+        ("kosher salt", "salt"),
+        ("tomatoe", "tomato"),
+        ("Olive oils", "olive oil"),
+        ("salted butter", None),
+        ("fresh chicken breasts", "chicken breast"),
+        ("chickpeas", None),
+    ])
+    def test_match(self, pantry, query, expected):
+        assert pantry.match(query) == expected
+
+    @pytest.mark.parametrize("item,query", [
+        ("butter", "peanut butter"),
+        ("milk", "coconut milk"),
+        ("oil", "sesame oil"),
+        ("pepper", "bell pepper"),
+        ("sauce", "soy sauce"),
+        ("cream", "sour cream"),
+        ("cream", "ice cream"),
+    ])
+    def test_head_noun_does_not_cover_other_ingredients(self, item, query):
+        assert Pantry([item]).match(query) is None
+
+    def test_autocomplete(self, pantry):
+        assert pantry.complete("oil") == ["Olive Oil"]
+        assert pantry.complete("ch") == ["chicken breast"]
+
+    def test_quantities_are_combined(self):
+        pantry = Pantry()
+        pantry.add("rice", 1, "cup")
+        pantry.add("Rice", 8, "tbsp")
+        assert pantry.get("rice").quantity == pytest.approx(1.5)
+
+    def test_expiring_and_round_trip(self):
+        pantry = Pantry()
+        pantry.add("milk", expires=date(2024, 1, 3))
+        pantry.add("eggs", expires=date(2024, 2, 1))
+        assert [item.name for item in pantry.expiring(3, today=date(2024, 1, 1))] == ["milk"]
+        restored = Pantry.from_list(pantry.to_list())
+        assert restored.get("milk").expires == date(2024, 1, 3)
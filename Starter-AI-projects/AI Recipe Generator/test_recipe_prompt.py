@@ -0,0 +1,47 @@
+"""
+Unit tests for the shared recipe prompt
+Run with: pytest test_recipe_prompt.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from recipe_prompt import MARKDOWN_MAX_TOKENS, RECIPE_SYSTEM_PROMPT, recipe_request
+from recipe_schema import RECIPE_MAX_TOKENS, RESPONSE_FORMAT
+
+
+class TestRecipeRequest:
+    """Test building recipe requests from history-style params"""
+
+    def test_markdown_request(self):
+        request = recipe_request({"ingredients": "Tomatoes, chicken", "cuisine": "Thai", "servings": 2})
+        assert request["messages"][0]["content"] == RECIPE_SYSTEM_PROMPT
+        assert "**Available Ingredients:** chicken, tomato" in request["messages"][1]["content"]
+        assert "**Servings:** 2" in request["messages"][1]["content"]
+        assert request["max_tokens"] == MARKDOWN_MAX_TOKENS
+        assert request["max_continuations"] > 0
+        assert "response_format" not in request
+
+    def test_markdown_budget_override(self):
+        assert recipe_request({"ingredients": "rice"}, max_tokens=1280)["max_tokens"] == 1280
+
+    def test_static_prefix_and_fields_last(self):
+        first = recipe_request({"ingredients": "rice", "cuisine": "Thai"})["messages"]
+        second = recipe_request({"ingredients": "eggs", "cuisine": "Greek", "servings": 8})["messages"]
+        assert first[0] == second[0]
+        assert "Requirements:" in first[0]["content"]
+        assert "rice" not in first[0]["content"]
+        assert first[1]["content"].endswith("**Available Ingredients:** rice")
+
+    def test_same_inputs_same_request(self):
+        assert recipe_request({"ingredients": "rice, eggs", "servings": 4}) == \
+            recipe_request({"ingredients": "eggs,rice", "servings": "4"})
+
+    def test_structured_request(self):
+        request = recipe_request({"ingredients": "rice"}, structured=True)
+        assert request["response_format"] == RESPONSE_FORMAT
+        assert request["max_tokens"] == RECIPE_MAX_TOKENS
+        assert "max_continuations" not in request
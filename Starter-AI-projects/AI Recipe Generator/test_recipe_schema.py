@@ -0,0 +1,69 @@
+"""
+Unit tests for the structured recipe model
+Run with: pytest test_recipe_schema.py
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from recipe_schema import RECIPE_JSON_SCHEMA, Recipe, format_quantity, recipe_from_json, render_markdown
+
+
+@pytest.fixture
+def recipe_json():
+    return json.dumps({
+        "name": "Chicken Stir Fry",
+        "description": "Quick and colorful.",
+        "prep_time": 10,
+        "cook_time": 15,
+        "difficulty": "Beginner",
+        "servings": 2,
+        "meal_type": "Dinner",
+        "ingredients": [
+            {"quantity": 2, "unit": "", "item": "chicken breasts", "note": "sliced"},
+            {"quantity": 1.5, "unit": "cup", "item": "rice", "note": ""},
+            {"quantity": None, "unit": "", "item": "salt", "note": "to taste"},
+        ],
+        "instructions": ["Cook rice", "Stir fry chicken"],
+        "tips": ["Use a hot pan"],
+        "nutrition": {"calories": 450, "protein": 35, "carbohydrates": 50, "fat": 9, "fiber": 3, "sugar": 4},
+        "variations": ["Use tofu"],
+        "pairing": "Iced tea",
+    })
+
+
+class TestStructuredRecipe:
+    """Test suite for JSON parsing and markdown rendering"""
+
+    def test_schema_requires_every_property(self):
+        assert set(RECIPE_JSON_SCHEMA["required"]) == set(RECIPE_JSON_SCHEMA["properties"])
+
+    def test_parse_and_round_trip(self, recipe_json):
+        recipe = recipe_from_json(recipe_json)
+        assert recipe.ingredients[1].quantity == 1.5
+        assert recipe.nutrition.protein == 35
+        assert Recipe.from_dict(recipe.to_dict()) == recipe
+
+    def test_render_markdown(self, recipe_json):
+        markdown = render_markdown(recipe_from_json(recipe_json))
+        assert markdown.startswith("# Chicken Stir Fry")
+        assert "- 2 chicken breasts, sliced" in markdown
+        assert "- 1 1/2 cup rice" in markdown
+        assert "- salt, to taste" in markdown
+        assert "**Total Time:** 25 minutes" in markdown
+        assert "2. Stir fry chicken" in markdown
+
+    def test_invalid_json_raises_value_error(self):
+        with pytest.raises(ValueError):
+            recipe_from_json("# Not JSON")
+        with pytest.raises(ValueError):
+            recipe_from_json('{"name": "x", "unknown": 1}')
+
+    @pytest.mark.parametrize("quantity,text", [(1, "1"), (0.5, "1/2"), (2.25, "2 1/4"), (0.1, "0.1"), (None, "")])
+    def test_format_quantity(self, quantity, text):
+        assert format_quantity(quantity) == text
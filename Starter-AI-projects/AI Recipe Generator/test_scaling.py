@@ -0,0 +1,104 @@
+"""
+Unit tests for local recipe scaling
+Run with: pytest test_scaling.py
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from recipe_schema import Ingredient, Nutrition, Recipe
+from nutrition import analyze_recipe
+from scaling import scale_markdown, scale_quantity, scale_recipe
+from shopping import build_shopping_list, format_shopping_list
+
+
+MARKDOWN_RECIPE = """# Pancakes
+
+## Info
+- **Servings:** 2
+
+## Ingredients
+- 1 1/2 tsp sugar
+- 3/4 cup milk
+- 2 eggs
+- Salt to taste
+
+## Instructions
+1. Whisk 1 cup of batter at a time.
+"""
+
+
+class TestScaleQuantity:
+    """Test scaling with unit promotion"""
+
+    def test_promotes_to_larger_unit(self):
+        assert scale_quantity(1.5, "tsp", 2) == (pytest.approx(1.0), "tbsp")
+
+    def test_demotes_to_smaller_unit(self):
+        quantity, unit = scale_quantity(0.75, "cups", 0.5)
+        assert (round(quantity, 6), unit) == (6, "tbsp")
+
+    def test_keeps_canonical_units(self):
+        assert scale_quantity(1, "cloves", 3) == (3, "clove")
+
+    def test_unknown_unit_and_missing_quantity(self):
+        assert scale_quantity(2, "smidgen", 2) == (4, "smidgen")
+        assert scale_quantity(None, "", 2) == (None, "")
+
+
+class TestScaleRecipe:
+    """Test scaling whole recipes"""
+
+    def test_structured_recipe(self):
+        recipe = Recipe(
+            name="Soup", servings=4,
+            ingredients=[Ingredient("stock", 1, "l"), Ingredient("onion", 2, "", "diced")],
+            nutrition=Nutrition(calories=200),
+        )
+        scaled = scale_recipe(recipe, 2)
+        assert scaled.servings == 2
+        assert scaled.ingredients == [Ingredient("stock", 500, "ml"), Ingredient("onion", 1, "", "diced")]
+        assert scaled.nutrition.calories == 200
+        assert recipe.servings == 4
+
+    def test_markdown_recipe(self):
+        scaled = scale_markdown(MARKDOWN_RECIPE, 4)
+        assert "- **Servings:** 4" in scaled
+        assert "- 1 tbsp sugar" in scaled
+        assert "- 1 1/2 cups milk" in scaled
+        assert "- 4 eggs" in scaled
+        assert "- Salt to taste" in scaled
+        assert "1. Whisk 1 cup of batter at a time." in scaled
+
+    def test_scaled_recipe_stays_parseable(self):
+        recipe = Recipe(
+            name="Garlic Rice", servings=2,
+            ingredients=[Ingredient("garlic", 2, "cloves"), Ingredient("rice", 1, "cup")],
+        )
+        scaled = scale_recipe(recipe, 4)
+        assert [(i.quantity, i.unit) for i in scaled.ingredients] == [(4, "clove"), (2, "cup")]
+
+        result = analyze_recipe(scaled)
+        assert result.unmatched == [] and result.per_serving.calories > 0
+
+        shopping = format_shopping_list(build_shopping_list({"scaled": scaled, "original": recipe}))
+        assert "- 6 cloves garlic" in shopping
+        assert "- 3 cups rice" in shopping
+
+    def test_scaled_markdown_stays_parseable(self):
+        scaled = scale_markdown("## Info\n- **Servings:** 2\n\n## Ingredients\n- 2 cloves garlic\n- 1 cup rice\n", 4)
+        assert "- 4 cloves garlic" in scaled and "- 2 cups rice" in scaled
+        assert analyze_recipe(scaled).unmatched == []
+        assert "- 4 cloves garlic" in format_shopping_list(build_shopping_list({"scaled": scaled}))
+
+    def test_markdown_ingredient_subsections(self):
+        recipe = "## Ingredients\n- 1 cup pasta\n\n### For the sauce\n- 1 cup cream\n\n## Instructions\n- Serves 2\n"
+        scaled = scale_markdown(recipe, 2)
+        assert "- 2 cups cream" in scaled
+        assert "- Serves 2" in scaled
@@ -0,0 +1,108 @@
+"""
+Unit tests for the local shopping list engine
+Run with: pytest test_shopping.py
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from pantry import Pantry
+from recipe_schema import Ingredient, Recipe
+from shopping import build_shopping_list, extract_ingredient_lines, format_shopping_list, parse_ingredient_line
+from units import best_unit, canonical_unit
+
+
+@pytest.fixture
+def sample_recipe():
+    return """
+    # Chicken Stir Fry
+
+    ## Ingredients
+    - 2 chicken breasts, sliced
+    - 1 1/2 cups rice
+    - ½ tsp salt
+    - 2 tbsp olive oil
+
+    ## Instructions
+    1. Cook rice
+    2. Stir fry chicken
+    """
+
+
+class TestParsing:
+    """Test suite for ingredient line parsing"""
+
+    @pytest.mark.parametrize("line,expected", [
+        ("- 1 1/2 cups rice, rinsed", (1.5, "cup", "rice", "rinsed")),
+        ("* ½ tsp salt", (0.5, "tsp", "salt", "")),
+        ("- 1½ tbsp olive oil", (1.5, "tbsp", "olive oil", "")),
+        ("3. 2-3 cloves garlic, minced", (3.0, "clove", "garlic", "minced")),
+        ("- 400g canned tomatoes", (400.0, "g", "canned tomatoes", "")),
+        ("- 1 (14 oz) can coconut milk", (1.0, "can", "coconut milk", "")),
+        ("- Salt and pepper to taste", (None, "", "Salt and pepper", "to taste")),
+        ("- a pinch of nutmeg", (1.0, "pinch", "nutmeg", "")),
+    ])
+    def test_parse_line(self, line, expected):
+        parsed = parse_ingredient_line(line)
+        assert (parsed.quantity, parsed.unit, parsed.item, parsed.note) == expected
+
+    def test_units(self):
+        assert canonical_unit("Tablespoons") == "tbsp"
+        assert canonical_unit("T") == "tbsp"
+        assert canonical_unit("chicken") is None
+        assert best_unit(6, "tsp")[1] == "tbsp"
+        assert best_unit(1500, "g") == (1.5, "kg")
+
+
+class TestShoppingList:
+    """Test suite for pantry subtraction and aggregation"""
+
+    def test_pantry_items_removed(self, sample_recipe):
+        items = build_shopping_list(sample_recipe, ["Rice", "kosher salt", "salt"])
+        names = [item.item for item in items]
+        assert "rice" not in names
+        assert "salt" not in names
+        assert "chicken breasts" in names
+
+    def test_fuzzy_pantry_match(self, sample_recipe):
+        items = build_shopping_list(sample_recipe, ["olive oill"])
+        assert "olive oil" not in [item.item for item in items]
+
+    def test_aggregates_across_recipes(self, sample_recipe):
+        other = Recipe(name="Rice Bowl", ingredients=[Ingredient("rice", 0.5, "cup"), Ingredient("olive oil", 1, "tsp")])
+        items = {item.item: item for item in build_shopping_list({"Stir Fry": sample_recipe, "Bowl": other})}
+        assert items["rice"].quantity == pytest.approx(2.0)
+        assert items["rice"].unit == "cup"
+        assert items["olive oil"].recipes == {"Stir Fry", "Bowl"}
+        assert "- 2 cups rice _(Bowl, Stir Fry)_" in format_shopping_list(list(items.values()))
+
+    def test_ingredient_subsections(self):
+        recipe = """# Creamy Pasta
+
+## Ingredients
+- 200 g pasta
+
+### For the sauce
+- 1 cup cream
+- 2 cloves garlic
+
+## Instructions
+- Boil the pasta
+"""
+        assert extract_ingredient_lines(recipe) == ["- 200 g pasta", "- 1 cup cream", "- 2 cloves garlic"]
+        assert [item.item for item in build_shopping_list(recipe)] == ["cream", "garlic", "pasta"]
+
+    def test_unparseable_recipe_returns_none(self):
+        assert build_shopping_list("Just cook something nice.") is None
+
+    def test_pantry_quantities_are_subtracted(self, sample_recipe):
+        pantry = Pantry()
+        pantry.add("rice", 1, "cup")
+        pantry.add("olive oil", 1, "cup")
+        items = {item.item: item for item in build_shopping_list(sample_recipe, pantry)}
+        assert items["rice"].quantity == pytest.approx(0.5)
+        assert "olive oil" not in items
@@ -0,0 +1,57 @@
+"""
+Unit tests for near-duplicate recipe lookup
+Run with: pytest test_similar_recipes.py
+"""
+
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("numpy")
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from similar_recipes import SimilarRecipes, request_text
+
+
+def make_request(**overrides):
+    request = {
+        "ingredients": "chicken, garlic, rice",
+        "restrictions": "",
+        "cuisine": "Italian",
+        "skill": "Intermediate",
+        "time": 60,
+        "servings": 4,
+        "meal_type": "Dinner",
+    }
+    request.update(overrides)
+    return request
+
+
+@pytest.fixture
+def similar():
+    similar = SimilarRecipes(threshold=0.8)
+    similar.add({**make_request(time=45), "content": "Chicken risotto"})
+    return similar
+
+
+class TestSimilarRecipes:
+    """Test matching requests against generated recipes"""
+
+    def test_request_text_is_canonical(self):
+        assert request_text(make_request(ingredients="Rice, chicken breasts, garlic")) == \
+            request_text(make_request(ingredients="garlic, chicken breast, rice"))
+
+    def test_near_duplicate_request_matches(self, similar):
+        matches = similar.find(make_request(ingredients="chicken, rice, garlic, onion"))
+        assert [entry["content"] for _, entry in matches] == ["Chicken risotto"]
+
+    def test_different_request_does_not_match(self, similar):
+        assert similar.find(make_request(ingredients="chocolate, flour", cuisine="French")) == []
+
+    def test_hard_constraints(self, similar):
+        assert similar.find(make_request(time=30)) == []
+        assert similar.find(make_request(restrictions="Vegetarian")) == []
+        assert similar.find(make_request(meal_type="Lunch")) == []
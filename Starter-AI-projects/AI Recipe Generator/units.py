@@ -0,0 +1,145 @@
+"""
+Kitchen units for local shopping lists, scaling and nutrition
+
+Every unit belongs to a dimension ("volume" in ml, "mass" in g, or a
+countable unit such as "clove" that only adds up with itself) and has a
+factor to that dimension's base unit.
+"""
+
+_CUP_ML = 236.588
+
+# canonical unit -> (dimension, factor to base unit)
+UNITS = {
+    "ml": ("volume", 1.0),
+    "l": ("volume", 1000.0),
+    "tsp": ("volume", _CUP_ML / 48),
+    "tbsp": ("volume", _CUP_ML / 16),
+    "fl oz": ("volume", _CUP_ML / 8),
+    "cup": ("volume", _CUP_ML),
+    "pint": ("volume", _CUP_ML * 2),
+    "quart": ("volume", _CUP_ML * 4),
+    "gallon": ("volume", _CUP_ML * 16),
+    "pinch": ("volume", 0.31),
+    "dash": ("volume", 0.62),
+    "mg": ("mass", 0.001),
+    "g": ("mass", 1.0),
+    "kg": ("mass", 1000.0),
+    "oz": ("mass", 28.3495),
+    "lb": ("mass", 453.592),
+    "": ("count", 1.0),
+}
+
+# Units that are counted rather than measured; each is its own dimension
+COUNT_UNITS = {
+    "bunch", "can", "clove", "head", "jar", "package", "piece", "slice",
+    "sprig", "stalk", "stick", "handful", "fillet", "bottle", "bag", "sheet",
+}
+
+UNIT_ALIASES = {
+    "milliliter": "ml", "millilitre": "ml", "mls": "ml",
+    "liter": "l", "litre": "l",
+    "teaspoon": "tsp", "t": "tsp",
+    "tablespoon": "tbsp", "tbs": "tbsp", "tbl": "tbsp", "T": "tbsp",
+    "fluid ounce": "fl oz", "fl. oz": "fl oz", "floz": "fl oz",
+    "c": "cup",
+    "pt": "pint",
+    "qt": "quart",
+    "gal": "gallon",
+    "milligram": "mg",
+    "gram": "g", "gr": "g",
+    "kilogram": "kg", "kilo": "kg",
+    "ounce": "oz",
+    "pound": "lb", "lbs": "lb",
+    "pkg": "package", "packet": "package",
+    "pc": "piece", "pcs": "piece",
+}
+
+# Units written as abbreviations, which are never pluralized
+_ABBREVIATIONS = {"ml", "l", "tsp", "tbsp", "fl oz", "mg", "g", "kg", "oz", "lb"}
+
+# Display units per family, largest first: (unit, smallest amount shown in it,
+# fraction step that reads naturally below 1 - None if any amount is fine)
+_PROMOTIONS = {
+    "volume": [("cup", 0.25, 0.25), ("tbsp", 1.0, 0.5), ("tsp", 0.0, None)],
+    "metric_volume": [("l", 1.0, None), ("ml", 0.0, None)],
+    "mass": [("kg", 1.0, None), ("g", 0.0, None)],
+    "imperial_mass": [("lb", 1.0, None), ("oz", 0.0, None)],
+}
+
+
+def canonical_unit(text):
+    """Return the canonical unit for ``text`` or None if it is not a unit"""
+    text = text.strip().rstrip(".")
+    if text in UNIT_ALIASES:  # case-sensitive aliases such as "T"
+        return UNIT_ALIASES[text]
+    text = text.lower()
+    if text in UNITS or text in COUNT_UNITS:
+        return text
+    if text in UNIT_ALIASES:
+        return UNIT_ALIASES[text]
+    if text.endswith("es") and (text[:-2] in UNITS or text[:-2] in COUNT_UNITS):
+        return text[:-2]
+    if text.endswith("s"):
+        singular = text[:-1]
+        if singular in UNITS or singular in COUNT_UNITS:
+            return singular
+        if singular in UNIT_ALIASES:
+            return UNIT_ALIASES[singular]
+    return None
+
+
+def dimension(unit):
+    """Return the dimension of a canonical unit"""
+    if unit in UNITS:
+        return UNITS[unit][0]
+    return f"count:{unit}"
+
+
+def to_base(quantity, unit):
+    """Convert to the base unit of the unit's dimension; returns (quantity, dimension)"""
+    if unit in UNITS:
+        dim, factor = UNITS[unit]
+        return quantity * factor, dim
+    return quantity, dimension(unit)
+
+
+def convert(quantity, from_unit, to_unit):
+    """Convert between two units of the same dimension"""
+    base, dim = to_base(quantity, from_unit)
+    if dim != dimension(to_unit):
+        raise ValueError(f"Cannot convert {from_unit!r} to {to_unit!r}")
+    return base / UNITS[to_unit][1] if to_unit in UNITS else base
+
+
+def best_unit(quantity, unit):
+    """Re-express a quantity in the most readable unit of the same family.
+
+    Keeps the measuring system of ``unit`` (US volume, metric volume, metric
+    or imperial mass), so 6 tsp becomes 2 tbsp and 1500 g becomes 1.5 kg.
+    Count units are returned unchanged.
+    """
+    if unit in ("ml", "l"):
+        family = "metric_volume"
+    elif unit in ("oz", "lb"):
+        family = "imperial_mass"
+    elif unit in ("g", "kg", "mg"):
+        family = "mass"
+    elif dimension(unit) == "volume" and unit not in ("pinch", "dash", "fl oz", "pint", "quart", "gallon"):
+        family = "volume"
+    else:
+        return quantity, unit
+    base, _ = to_base(quantity, unit)
+    for candidate, minimum, step in _PROMOTIONS[family]:
+        amount = base / UNITS[candidate][1]
+        if amount < minimum:
+            continue
+        if amount >= 1 or step is None or abs(amount / step - round(amount / step)) < 0.05:
+            return amount, candidate
+    return quantity, unit
+
+
+def unit_label(quantity, unit):
+    """Unit name for display, pluralizing spelled-out units ("2 cups", "3 cloves")"""
+    if not unit or quantity is None or quantity <= 1 or unit in _ABBREVIATIONS:
+        return unit
+    return unit + "es" if unit.endswith(("ch", "sh")) else unit + "s"
@@ -1,8 +1,17 @@
 import streamlit as st
 import os
-from openai import OpenAI
+import sys
 from datetime import datetime
 
+# Make the shared ai_core package importable when launched via `streamlit run app.py`
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core import metrics
+from ai_core.cache import shared_cache
+from ai_core.client import shared_client
+from ai_core.storage import shared_store
+from ai_core.ui import get_user_id, pager, profile_panel, reported, rerun_profiler
+from generation import generate_workout_plan, get_exercise_tips
+
 # Page configuration
 st.set_page_config(
     page_title="AI Workout Planner Agent",
@@ -10,8 +19,12 @@ st.set_page_config(
     layout="wide"
 )
 
+# Rerun timing per section, shown in the sidebar with PROFILE_RERUNS=1 or ?profile=1 (see ai_core/profiling.py)
+profile = rerun_profiler()
+
 # Custom CSS for better styling
-st.markdown("""
+with profile.section("css"):
+    st.markdown("""
 <style>
     .main-header {
         text-align: center;
@@ -50,134 +63,28 @@ st.markdown("""
         margin: 10px 0;
     }
 </style>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
+
+# OpenAI client (one async connection pool shared by all sessions, see ai_core/client.py)
+if not os.getenv("OPENAI_API_KEY"):
+    st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
+    st.stop()
+client = shared_client()
+
+# Per-call latency and token metrics, exported when METRICS_JSONL or METRICS_PORT is set (see ai_core/metrics.py)
+metrics.install_from_env()
 
-# Initialize OpenAI client
-@st.cache_resource
-def get_openai_client():
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        st.error("⚠️ OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
-        st.stop()
-    return OpenAI(api_key=api_key)
+# Response cache shared by all sessions (SQLite-backed by default, see ai_core/cache.py)
+response_cache = shared_cache()
 
-client = get_openai_client()
+# Persistent workout history (SQLite, see ai_core/storage.py)
+store = shared_store()
+user_id = get_user_id()
 
 # Initialize session state
-if "workout_history" not in st.session_state:
-    st.session_state.workout_history = []
 if "current_workout" not in st.session_state:
     st.session_state.current_workout = None
 
-def generate_workout_plan(fitness_goal, experience_level, workout_days, duration, 
-                         equipment, target_areas, limitations):
-    """Generate a personalized workout plan using OpenAI GPT-4"""
-    
-    system_prompt = """You are a certified personal trainer and fitness expert with 15+ years of experience. 
-    You create safe, effective, and personalized workout plans tailored to individual goals and limitations.
-    
-    Provide workout plans in the following structured format:
-    
-    # [Workout Plan Title]
-    
-    ## Overview
-    [Brief description of the workout program and its benefits]
-    
-    ## Weekly Schedule
-    [Outline of the weekly workout structure]
-    
-    ## Detailed Workout Routine
-    
-    ### Day 1: [Focus Area]
-    
-    **Warm-up (5-10 minutes)**
-    - [Exercise 1]: [Duration/Reps]
-    - [Exercise 2]: [Duration/Reps]
-    
-    **Main Workout**
-    
-    1. **[Exercise Name]**
-       - Sets: X
-       - Reps: X (or Duration)
-       - Rest: X seconds
-       - Notes: [Proper form tips]
-    
-    [Continue for all exercises]
-    
-    **Cool-down (5-10 minutes)**
-    - [Stretching exercises]
-    
-    [Repeat structure for each workout day]
-    
-    ## Exercise Modifications
-    [Easier and harder variations for key exercises]
-    
-    ## Nutrition Tips
-    [Brief dietary recommendations to support the fitness goal]
-    
-    ## Progress Tracking
-    [How to measure progress and when to increase intensity]
-    
-    ## Safety Tips
-    [Important safety considerations and injury prevention]
-    """
-    
-    user_prompt = f"""Create a personalized workout plan with the following specifications:
-
-**Fitness Goal:** {fitness_goal}
-**Experience Level:** {experience_level}
-**Workout Days per Week:** {workout_days}
-**Session Duration:** {duration} minutes
-**Available Equipment:** {equipment}
-**Target Areas:** {target_areas}
-**Limitations/Injuries:** {limitations if limitations else 'None'}
-
-Requirements:
-1. Design a progressive workout plan suitable for {experience_level} level
-2. Focus on exercises that support the goal: {fitness_goal}
-3. Include proper warm-up and cool-down routines
-4. Provide clear instructions for each exercise
-5. Include sets, reps, rest periods, and form cues
-6. Suggest modifications for different fitness levels
-7. Ensure the plan respects any mentioned limitations
-8. Include recovery and rest day recommendations
-9. Provide tips for tracking progress
-10. Keep workouts within the {duration}-minute timeframe"""
-
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=3000
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        st.error(f"Error generating workout plan: {str(e)}")
-        return None
-
-def get_exercise_tips(exercise_name):
-    """Get detailed tips for a specific exercise"""
-    
-    try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a fitness expert. Provide concise, practical tips for proper exercise form and technique."},
-                {"role": "user", "content": f"Provide 5 key tips for proper form when doing: {exercise_name}"}
-            ],
-            temperature=0.5,
-            max_tokens=300
-        )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        return None
-
 # App Header
 st.markdown("""
 <div class="main-header">
@@ -187,7 +94,7 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Sidebar for inputs
-with st.sidebar:
+with st.sidebar, profile.section("sidebar"):
     st.header("🎯 Your Fitness Profile")
     
     # Fitness Goal
@@ -278,23 +185,34 @@ with st.sidebar:
     
     st.markdown("---")
     
+    plan_in_parallel = st.toggle(
+        "⚡ Plan days in parallel",
+        value=True,
+        help="Write each workout day separately at the same time - faster and never cut off for long plans"
+    )
+    
     # Generate button
     generate_button = st.button("🔥 Generate Workout Plan", type="primary", use_container_width=True)
 
 # Main content area
 col1, col2 = st.columns([3, 1])
 
-with col1:
+with col1, profile.section("plan"):
     if generate_button:
         with st.spinner("💪 Creating your personalized workout plan..."):
-            workout_plan = generate_workout_plan(
+            workout_plan = reported(
+                "generating workout plan",
+                generate_workout_plan,
                 fitness_goal,
                 experience_level,
                 workout_days,
                 duration,
                 equipment,
                 target_areas,
-                limitations
+                limitations,
+                parallel=plan_in_parallel,
+                client=client,
+                cache=response_cache
             )
             
             if workout_plan:
@@ -305,10 +223,9 @@ with col1:
                     "level": experience_level,
                     "days": workout_days,
                     "duration": duration,
-                    "equipment": equipment,
-                    "plan": workout_plan
+                    "equipment": equipment
                 }
-                st.session_state.workout_history.append(workout_data)
+                store.add_history(user_id, "workout", workout_data, workout_plan)
     
     # Display workout plan
     if st.session_state.current_workout:
@@ -405,13 +322,14 @@ with col1:
             </div>
             """, unsafe_allow_html=True)
 
-with col2:
+with col2, profile.section("history"):
     st.markdown("### 📈 Your Progress")
     
     # Display stats
+    total_plans = store.count_history(user_id, "workout")
     st.markdown(f"""
     <div class="metric-card">
-        <h3>{len(st.session_state.workout_history)}</h3>
+        <h3>{total_plans}</h3>
         <p>Plans Generated</p>
     </div>
     """, unsafe_allow_html=True)
@@ -421,19 +339,30 @@ with col2:
     # Recent Plans
     st.markdown("### 🕐 Recent Plans")
     
-    if st.session_state.workout_history:
-        for idx, workout in enumerate(reversed(st.session_state.workout_history[-3:])):
-            with st.expander(f"Plan {len(st.session_state.workout_history) - idx}", expanded=False):
-                st.write(f"**Date:** {workout['timestamp']}")
-                st.write(f"**Goal:** {workout['goal']}")
-                st.write(f"**Level:** {workout['level']}")
-                st.write(f"**Days/Week:** {workout['days']}")
-                if st.button(f"View", key=f"view_{idx}", use_container_width=True):
-                    st.session_state.current_workout = workout['plan']
-                    st.rerun()
+    search_text = st.text_input("🔍 Search plans", placeholder="e.g., dumbbells strength", key="plans_search")
+    entries, titles = [], []
+    if search_text:
+        entries = store.search(user_id, "workout", search_text, limit=10)
+        titles = [f"Match {idx + 1} - {workout['timestamp']}" for idx, workout in enumerate(entries)]
+        if not entries:
+            st.info("No matching plans.")
+    elif total_plans:
+        offset = pager("Plans", total_plans, 3, key="plans_page")
+        entries = store.history(user_id, "workout", limit=3, offset=offset)
+        titles = [f"Plan {total_plans - offset - idx}" for idx in range(len(entries))]
     else:
         st.info("No workout plans yet. Generate your first one!")
     
+    for workout, title in zip(entries, titles):
+        with st.expander(title, expanded=False):
+            st.write(f"**Date:** {workout['timestamp']}")
+            st.write(f"**Goal:** {workout['goal']}")
+            st.write(f"**Level:** {workout['level']}")
+            st.write(f"**Days/Week:** {workout['days']}")
+            if st.button(f"View", key=f"view_{workout['id']}", use_container_width=True):
+                st.session_state.current_workout = workout['content']
+                st.rerun()
+    
     st.markdown("---")
     
     # Quick Tips
@@ -470,3 +399,6 @@ st.markdown(
     """,
     unsafe_allow_html=True
 )
+
+# Debug panel with the slowest sections (only when profiling is enabled)
+profile_panel(profile)
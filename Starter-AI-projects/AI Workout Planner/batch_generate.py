@@ -0,0 +1,42 @@
+"""
+Pre-generate workout plans offline to warm the shared response cache
+
+Reads one parameter set per JSONL line or CSV row with the keys goal, level,
+days, duration, equipment, target_areas and limitations (equipment and
+target_areas may be lists in JSONL), and generates the requests the app
+sends with "Plan days in parallel" on - the overview and every day:
+
+    python batch_generate.py top_plans.csv                 # bounded worker pool
+    python batch_generate.py top_plans.jsonl --batch-api   # OpenAI Batch API
+    python batch_generate.py --collect batch_abc123        # store a finished batch
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core.batch import main
+from workout_plan import PROMPTS, plan_requests
+
+
+def _joined(value, default):
+    if isinstance(value, (list, tuple)):
+        value = ", ".join(value)
+    return value or default
+
+
+def build_requests(params):
+    profile = (
+        params["goal"],
+        params.get("level") or "Beginner",
+        int(params.get("days") or 4),
+        int(params.get("duration") or 45),
+        _joined(params.get("equipment"), "No Equipment"),
+        _joined(params.get("target_areas"), "Full Body"),
+        params.get("limitations") or "",
+    )
+    return [request for _, request in plan_requests(profile)]
+
+
+if __name__ == "__main__":
+    sys.exit(main(build_requests, description="Pre-generate workout plans into the response cache", prompts=PROMPTS))
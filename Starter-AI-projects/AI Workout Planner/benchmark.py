@@ -0,0 +1,36 @@
+"""
+Benchmark workout plan generation against a local mock OpenAI server
+
+Drives parallel plan generation (overview plus one request per day, see
+generation.py) through the shared client pool, cache and scheduler under
+concurrent load, without API calls (see ai_core/bench.py):
+
+    python benchmark.py --requests 200 --concurrency 16
+    python benchmark.py --rate-limit 0.05 --max-p95 3
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from ai_core.bench import Scenario, main
+from generation import generate_workout_plan
+
+GOALS = ["Build Muscle", "Lose Weight", "Improve Endurance", "Increase Flexibility", "General Fitness"]
+LEVELS = ["Beginner", "Intermediate", "Advanced"]
+
+
+def make_params(i):
+    return (GOALS[i % len(GOALS)], LEVELS[i % len(LEVELS)], 2 + i % 5, 30 + 15 * (i % 3),
+            "Dumbbells", "Full Body", "")
+
+
+def workout_plan(client, cache, profile):
+    return generate_workout_plan(*profile, parallel=True, client=client, cache=cache)
+
+
+SCENARIOS = [Scenario("workout_plan", workout_plan, make_params)]
+
+
+if __name__ == "__main__":
+    sys.exit(main(SCENARIOS, description="Benchmark the workout planner against a mock OpenAI server"))
@@ -0,0 +1,94 @@
+"""
+Workout plan generation, without Streamlit
+
+Used by the app, ``benchmark.py`` and workers. Importing this module creates
+nothing: the OpenAI client pool, response cache and token budgets are
+process-wide and built on first use (see ai_core/lazy.py), and every function
+also takes an explicit ``client`` and ``cache``.
+
+Plans raise on API errors; the app shows them with ``reported``
+(ai_core/ui.py). Exercise tips are optional and return None instead.
+"""
+
+from ai_core import chat
+from ai_core.budgets import BudgetRule, TokenBudgets
+from ai_core.cache import shared_cache
+from ai_core.client import shared_client
+from ai_core.fanout import FanOut
+from ai_core.lazy import once
+from workout_plan import DAY_MAX_TOKENS, OVERVIEW_MAX_TOKENS, assemble_plan, budget_kind, plan_requests, weekly_split
+
+
+@once
+def get_token_budgets():
+    """max_tokens per request type, sized from workout days and refined from finished plans (see ai_core/budgets.py)"""
+    return TokenBudgets({
+        "plan": BudgetRule(base=1200, per_unit=450),
+        "overview": BudgetRule(base=OVERVIEW_MAX_TOKENS),
+        "day": BudgetRule(base=DAY_MAX_TOKENS),
+    })
+
+
+def _client(client):
+    return client if client is not None else shared_client()
+
+
+def _cache(cache):
+    return cache if cache is not None else shared_cache()
+
+
+def generate_workout_plan(fitness_goal, experience_level, workout_days, duration,
+                          equipment, target_areas, limitations, parallel=False, client=None, cache=None):
+    """Generate a personalized workout plan
+
+    With parallel=True the overview and each day are requested concurrently (see workout_plan.py).
+    """
+
+    if parallel:
+        return generate_workout_plan_by_day(
+            fitness_goal, experience_level, workout_days, duration,
+            equipment, target_areas, limitations, client=client, cache=cache
+        )
+
+    profile = (fitness_goal, experience_level, workout_days, duration, equipment, target_areas, limitations)
+    token_budgets = get_token_budgets()
+    name, request = plan_requests(profile, parallel=False, budgets=token_budgets)[0]
+    return chat.complete(_client(client), **request, cache=_cache(cache),
+                         record_usage=token_budgets.recorder(*budget_kind(name, workout_days)), site="workout")
+
+
+def generate_workout_plan_by_day(fitness_goal, experience_level, workout_days, duration,
+                                 equipment, target_areas, limitations, client=None, cache=None):
+    """Generate the plan overview and every workout day concurrently, then assemble them"""
+
+    profile = (fitness_goal, experience_level, workout_days, duration, equipment, target_areas, limitations)
+    client, cache = _client(client), _cache(cache)
+    token_budgets = get_token_budgets()
+    split = weekly_split(workout_days)
+    requests = plan_requests(profile, budgets=token_budgets)
+    with FanOut(max_workers=len(requests)) as fan:
+        for name, request in requests:
+            fan.submit(name, chat.complete, client, **request, cache=cache,
+                       record_usage=token_budgets.recorder(*budget_kind(name, workout_days)), site="workout")
+        parts = dict(fan.wait())
+    return assemble_plan(parts["overview"], [parts[day] for day in range(1, len(split) + 1)], split)
+
+
+def get_exercise_tips(exercise_name, client=None, cache=None):
+    """Get detailed tips for a specific exercise; None if the request fails"""
+
+    try:
+        return chat.complete(
+            _client(client),
+            [
+                {"role": "system", "content": "You are a fitness expert. Provide concise, practical tips for proper exercise form and technique."},
+                {"role": "user", "content": f"Provide 5 key tips for proper form when doing: {exercise_name}"}
+            ],
+            model="gpt-4o-mini",
+            temperature=0.5,
+            max_tokens=300,
+            cache=_cache(cache),
+            site="exercise_tips"
+        )
+    except Exception:
+        return None
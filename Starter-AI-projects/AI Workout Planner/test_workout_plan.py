@@ -0,0 +1,165 @@
+"""
+Unit tests for weekly splits, plan requests and plan assembly
+Run with: pytest test_workout_plan.py
+"""
+
+import importlib.util
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+APP_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, APP_DIR)
+sys.path.insert(0, os.path.abspath(os.path.join(APP_DIR, "..")))
+
+from ai_core.batch import request_key
+from ai_core.budgets import BudgetRule, TokenBudgets
+from ai_core.cache import MemoryCache
+from workout_plan import (
+    DAY_MAX_TOKENS, MAX_CONTINUATIONS, OVERVIEW_MAX_TOKENS, PLAN_MAX_TOKENS, WEEKLY_SPLITS, assemble_plan,
+    budget_kind, day_messages, overview_messages, plan_requests, weekly_split,
+)
+
+PROFILE = ("Build Muscle", "Intermediate", 3, 45, "Dumbbells, Bench", "Chest, Back", "")
+
+OVERVIEW = """# Strength Builder
+
+## Overview
+Three full body sessions.
+
+## Weekly Schedule
+- Day 1: Full Body A
+
+## Exercise Modifications
+Use lighter dumbbells.
+
+## Safety Tips
+Warm up first."""
+
+
+def load(name):
+    """Import one of this app's modules under a unique name (the Recipe app has modules with the same names)"""
+    spec = importlib.util.spec_from_file_location(f"workout_{name}", os.path.join(APP_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestWeeklySplit:
+    """Test suite for the local weekly split"""
+
+    @pytest.mark.parametrize("days", range(1, 8))
+    def test_one_focus_per_day(self, days):
+        split = weekly_split(days)
+        assert len(split) == days
+        assert split == WEEKLY_SPLITS[days]
+
+    @pytest.mark.parametrize("days,expected", [(0, 1), (-2, 1), (8, 7), (12, 7)])
+    def test_out_of_range_is_clamped(self, days, expected):
+        assert len(weekly_split(days)) == expected
+
+    def test_returns_a_copy(self):
+        weekly_split(3).append("Extra")
+        assert len(weekly_split(3)) == 3
+
+
+class TestAssemblePlan:
+    """Test suite for stitching the overview and days together"""
+
+    def test_days_go_before_closing_sections(self):
+        plan = assemble_plan(OVERVIEW, ["### Day 1: Full Body A\n- Squats", "### Day 2: Full Body B\n- Rows"],
+                             ["Full Body A", "Full Body B"])
+        assert plan.index("## Weekly Schedule") < plan.index("## Detailed Workout Routine")
+        assert plan.index("### Day 2: Full Body B") < plan.index("## Exercise Modifications")
+        assert plan.index("## Exercise Modifications") < plan.index("## Safety Tips")
+        assert plan.count("### Day 1") == 1
+
+    def test_missing_headings_are_added(self):
+        plan = assemble_plan(OVERVIEW, ["- Squats", None], ["Full Body A", "Full Body B"])
+        assert "### Day 1: Full Body A\n\n- Squats" in plan
+        assert "### Day 2: Full Body B" in plan
+
+    def test_odd_headings_are_kept(self):
+        plan = assemble_plan(OVERVIEW, ["## day 1 - Legs\n- Lunges", "**Day 2**\n- Rows"], ["Legs", "Pull"])
+        assert "## day 1 - Legs" in plan and "### Day 1: Legs" not in plan
+        assert "### Day 2: Pull\n\n**Day 2**" in plan
+
+    def test_overview_without_closing_sections(self):
+        plan = assemble_plan("# Plan\n\n## Overview\nShort.", ["### Day 1: Full Body\n- Squats"], ["Full Body"])
+        assert plan.endswith("## Detailed Workout Routine\n\n### Day 1: Full Body\n- Squats\n")
+        assert assemble_plan(None, [None], ["Full Body"]).startswith("## Detailed Workout Routine")
+
+
+class TestPrompts:
+    """Test suite for the overview and day messages"""
+
+    def test_overview_lists_the_split(self):
+        prompt = overview_messages(weekly_split(3), PROFILE)[1]["content"]
+        assert "- Day 2: Full Body B" in prompt
+        assert "**Workout Days per Week:** 3" in prompt
+
+    def test_day_prompt_names_its_focus_and_the_others(self):
+        prompt = day_messages(2, weekly_split(3), PROFILE)[1]["content"]
+        assert 'heading "### Day 2: Full Body B"' in prompt
+        assert "Day 1: Full Body A, Day 3: Full Body C" in prompt
+        assert "**Limitations/Injuries:** None" in prompt
+
+    def test_system_prompts_are_static(self):
+        other = ("Lose Weight", "Beginner", 5, 30, "No Equipment", "Full Body", "Bad knee")
+        assert day_messages(1, weekly_split(3), PROFILE)[0] == day_messages(2, weekly_split(5), other)[0]
+        assert overview_messages(weekly_split(3), PROFILE)[0] == overview_messages(weekly_split(5), other)[0]
+
+
+class TestPlanRequests:
+    """Test suite for the requests that make up one plan"""
+
+    def test_single_call(self):
+        [(name, request)] = plan_requests(PROFILE, parallel=False)
+        assert name == "plan"
+        assert request["max_tokens"] == PLAN_MAX_TOKENS
+        assert request["max_continuations"] == MAX_CONTINUATIONS
+        assert "**Workout Days per Week:** 3" in request["messages"][1]["content"]
+        assert budget_kind(name, 3) == ("plan", 3)
+
+    def test_parallel_overview_and_days(self):
+        requests = plan_requests(PROFILE)
+        assert [name for name, _ in requests] == ["overview", 1, 2, 3]
+        assert requests[0][1]["max_tokens"] == OVERVIEW_MAX_TOKENS
+        assert all(request["max_tokens"] == DAY_MAX_TOKENS for _, request in requests[1:])
+        assert 'heading "### Day 2: Full Body B"' in requests[2][1]["messages"][1]["content"]
+        assert [budget_kind(name, 3) for name, _ in requests] == [("overview", 1), ("day", 1), ("day", 1), ("day", 1)]
+
+    def test_budgets_size_max_tokens(self):
+        budgets = TokenBudgets({"plan": BudgetRule(base=1200, per_unit=450)})
+        [(_, request)] = plan_requests(PROFILE, parallel=False, budgets=budgets)
+        assert request["max_tokens"] == budgets.estimate("plan", 3)
+
+    def test_app_and_batch_cli_share_cache_keys(self):
+        budgets = TokenBudgets({"overview": BudgetRule(base=900), "day": BudgetRule(base=600)})
+        app = [request for _, request in plan_requests(PROFILE, budgets=budgets)]
+        batch = load("batch_generate").build_requests({
+            "goal": "Build Muscle", "level": "Intermediate", "days": "3", "duration": "45",
+            "equipment": ["Dumbbells", "Bench"], "target_areas": ["Chest", "Back"],
+        })
+        assert [request["messages"] for request in batch] == [request["messages"] for request in app]
+        assert [request_key(request) for request in batch] == [request_key(request) for request in app]
+
+    def test_app_generation_fills_the_batch_cache_entries(self):
+        generation = load("generation")
+        cache = MemoryCache()
+        client = Mock()
+        client.chat.completions.create.return_value = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="### Day 1: Full Body A"), finish_reason="stop")],
+            usage=None,
+        )
+        generation.generate_workout_plan(*PROFILE, parallel=True, client=client, cache=cache)
+
+        batch = load("batch_generate").build_requests({
+            "goal": "Build Muscle", "level": "Intermediate", "days": "3", "duration": "45",
+            "equipment": ["Dumbbells", "Bench"], "target_areas": ["Chest", "Back"],
+        })
+        assert len(batch) == 4
+        assert all(cache.get(request_key(request)) is not None for request in batch)
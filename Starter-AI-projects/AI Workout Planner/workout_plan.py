@@ -0,0 +1,264 @@
+"""
+Split a weekly workout plan into concurrent requests
+
+The weekly split (which focus each training day gets) is decided locally, so
+the overview request and every "Day N" request can be sent at the same time.
+Each day request uses the same day-section template as the single-call
+prompt, and ``assemble_plan`` stitches the answers back into one document.
+
+``plan_requests`` builds the exact requests for either mode, so the app and
+the batch CLI (``batch_generate.py``) share response cache entries. Answers
+cut off by max_tokens are continued (``max_continuations``), so max_tokens
+can be sized per request without truncating long plans or changing cache
+keys.
+
+The prompts are versioned ``PromptTemplate``s (see ai_core/prompts.py):
+role, output format and requirements are a static system message sent
+byte-identical on every call, so the provider can cache it, and the
+profile and day fields come last in the user message.
+"""
+
+import re
+
+from ai_core.prompts import PromptRegistry, PromptTemplate
+
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.7
+
+TRAINER_INTRO = """You are a certified personal trainer and fitness expert with 15+ years of experience.
+You create safe, effective, and personalized workout plans tailored to individual goals and limitations."""
+
+DAY_TEMPLATE = """### Day {day}: [Focus Area]
+
+**Warm-up (5-10 minutes)**
+- [Exercise 1]: [Duration/Reps]
+- [Exercise 2]: [Duration/Reps]
+
+**Main Workout**
+
+1. **[Exercise Name]**
+   - Sets: X
+   - Reps: X (or Duration)
+   - Rest: X seconds
+   - Notes: [Proper form tips]
+
+[Continue for all exercises]
+
+**Cool-down (5-10 minutes)**
+- [Stretching exercises]"""
+
+OVERVIEW_SYSTEM_PROMPT = TRAINER_INTRO + """
+
+You write the overview part of a workout plan; the daily routines are written separately.
+Use exactly this structured format:
+
+# [Workout Plan Title]
+
+## Overview
+[Brief description of the workout program and its benefits]
+
+## Weekly Schedule
+[Outline of the weekly workout structure, using the given day focuses]
+
+## Exercise Modifications
+[Easier and harder variations for key exercises]
+
+## Nutrition Tips
+[Brief dietary recommendations to support the fitness goal]
+
+## Progress Tracking
+[How to measure progress and when to increase intensity]
+
+## Safety Tips
+[Important safety considerations and injury prevention]
+
+Include recovery and rest day recommendations in the weekly schedule, and make sure the
+modifications and safety tips respect any mentioned limitations.
+"""
+
+DAY_SYSTEM_PROMPT = TRAINER_INTRO + """
+
+You write one day of a weekly workout plan. Use exactly this structured format and nothing else:
+
+""" + DAY_TEMPLATE.format(day="N") + """
+
+Requirements:
+1. Start with the heading "### Day N: [Focus Area]" using the day number and focus you are given
+2. Only use the available equipment and respect any limitations
+3. Include sets, reps, rest periods and form cues suitable for the experience level
+4. Keep the session within the session duration including warm-up and cool-down"""
+
+# Single-call prompt used when days are not planned in parallel
+PLAN_SYSTEM_PROMPT = TRAINER_INTRO + """
+
+Provide workout plans in the following structured format:
+
+# [Workout Plan Title]
+
+## Overview
+[Brief description of the workout program and its benefits]
+
+## Weekly Schedule
+[Outline of the weekly workout structure]
+
+## Detailed Workout Routine
+
+""" + DAY_TEMPLATE.format(day=1) + """
+
+[Repeat structure for each workout day]
+
+## Exercise Modifications
+[Easier and harder variations for key exercises]
+
+## Nutrition Tips
+[Brief dietary recommendations to support the fitness goal]
+
+## Progress Tracking
+[How to measure progress and when to increase intensity]
+
+## Safety Tips
+[Important safety considerations and injury prevention]
+
+Requirements:
+1. Design a progressive workout plan suitable for the experience level
+2. Focus on exercises that support the fitness goal
+3. Include proper warm-up and cool-down routines
+4. Provide clear instructions for each exercise
+5. Include sets, reps, rest periods, and form cues
+6. Suggest modifications for different fitness levels
+7. Ensure the plan respects any mentioned limitations
+8. Include recovery and rest day recommendations
+9. Provide tips for tracking progress
+10. Keep workouts within the session duration"""
+
+# User prompts hold only the variable fields and come after the static system prompts
+PLAN_USER_PROMPT = """Create a personalized workout plan with the following specifications:
+
+{profile}"""
+
+OVERVIEW_USER_PROMPT = """Write the overview for a personalized workout plan with the following specifications:
+
+{profile}
+
+The training days are already fixed as:
+{schedule}"""
+
+DAY_USER_PROMPT = """{profile}
+
+Other training days this week: {others}
+
+Write Day {day} ({focus}) of a {days}-day weekly workout plan, starting with the heading "### Day {day}: {focus}"."""
+
+PROMPTS = PromptRegistry()
+PLAN_PROMPT = PROMPTS.register(PromptTemplate("plan", 1, PLAN_SYSTEM_PROMPT, PLAN_USER_PROMPT, MODEL))
+OVERVIEW_PROMPT = PROMPTS.register(PromptTemplate("overview", 1, OVERVIEW_SYSTEM_PROMPT, OVERVIEW_USER_PROMPT, MODEL))
+DAY_PROMPT = PROMPTS.register(PromptTemplate("day", 1, DAY_SYSTEM_PROMPT, DAY_USER_PROMPT, MODEL))
+
+PLAN_MAX_TOKENS = 3000
+OVERVIEW_MAX_TOKENS = 1200
+DAY_MAX_TOKENS = 800
+MAX_CONTINUATIONS = 2
+
+# Day focuses by number of training days per week
+WEEKLY_SPLITS = {
+    1: ["Full Body"],
+    2: ["Full Body A", "Full Body B"],
+    3: ["Full Body A", "Full Body B", "Full Body C"],
+    4: ["Upper Body", "Lower Body", "Upper Body (Volume)", "Lower Body (Volume)"],
+    5: ["Push", "Pull", "Legs", "Upper Body", "Lower Body"],
+    6: ["Push", "Pull", "Legs", "Push (Volume)", "Pull (Volume)", "Legs (Volume)"],
+    7: ["Push", "Pull", "Legs", "Active Recovery & Mobility", "Upper Body", "Lower Body", "Conditioning & Core"],
+}
+
+_TAIL_HEADINGS = ("## Exercise Modifications", "## Nutrition Tips", "## Progress Tracking", "## Safety Tips")
+_DAY_HEADING_RE = re.compile(r"^\s*#{1,4}\s*day\s*\d+\s*:?", re.IGNORECASE)
+
+
+def weekly_split(workout_days):
+    """Return the focus for each training day"""
+    return list(WEEKLY_SPLITS[max(1, min(7, workout_days))])
+
+
+def _profile(fitness_goal, experience_level, workout_days, duration, equipment, target_areas, limitations):
+    return f"""**Fitness Goal:** {fitness_goal}
+**Experience Level:** {experience_level}
+**Workout Days per Week:** {workout_days}
+**Session Duration:** {duration} minutes
+**Available Equipment:** {equipment}
+**Target Areas:** {target_areas}
+**Limitations/Injuries:** {limitations if limitations else 'None'}"""
+
+
+def plan_messages(profile):
+    """Messages of the single-call plan request"""
+    return PLAN_PROMPT.messages(profile=_profile(*profile))
+
+
+def overview_messages(split, profile):
+    schedule = "\n".join(f"- Day {day}: {focus}" for day, focus in enumerate(split, 1))
+    return OVERVIEW_PROMPT.messages(profile=_profile(*profile), schedule=schedule)
+
+
+def day_messages(day, split, profile):
+    others = ", ".join(f"Day {idx}: {focus}" for idx, focus in enumerate(split, 1) if idx != day)
+    return DAY_PROMPT.messages(
+        profile=_profile(*profile), others=others or "None", day=day, focus=split[day - 1], days=len(split)
+    )
+
+
+def budget_kind(name, workout_days):
+    """Budget kind and units (see ai_core.budgets) of a ``plan_requests`` entry"""
+    if name == "plan":
+        return "plan", workout_days
+    return ("overview", 1) if name == "overview" else ("day", 1)
+
+
+def _request(messages, max_tokens):
+    return {
+        "messages": messages,
+        "model": MODEL,
+        "temperature": TEMPERATURE,
+        "max_tokens": max_tokens,
+        "max_continuations": MAX_CONTINUATIONS,
+    }
+
+
+def plan_requests(profile, parallel=True, budgets=None):
+    """Named chat completion requests that make up one plan.
+
+    ``profile`` is (fitness_goal, experience_level, workout_days, duration,
+    equipment, target_areas, limitations). Returns ``[("plan", request)]``
+    for a single call, or the overview and one request per day (named by
+    day number) for parallel planning. ``budgets`` (a ``TokenBudgets``)
+    sizes max_tokens per request; without it the fixed defaults are used.
+    """
+    workout_days = int(profile[2])
+
+    def max_tokens(name, default):
+        return budgets.estimate(*budget_kind(name, workout_days)) if budgets is not None else default
+
+    if not parallel:
+        return [("plan", _request(plan_messages(profile), max_tokens("plan", PLAN_MAX_TOKENS)))]
+    split = weekly_split(workout_days)
+    requests = [("overview", _request(overview_messages(split, profile), max_tokens("overview", OVERVIEW_MAX_TOKENS)))]
+    for day in range(1, len(split) + 1):
+        requests.append((day, _request(day_messages(day, split, profile), max_tokens(day, DAY_MAX_TOKENS))))
+    return requests
+
+
+def assemble_plan(overview, day_texts, split):
+    """Insert the day routines into the overview, before its closing sections"""
+    days = []
+    for day, (focus, text) in enumerate(zip(split, day_texts), 1):
+        text = (text or "").strip()
+        if not _DAY_HEADING_RE.match(text):
+            text = f"### Day {day}: {focus}\n\n{text}".rstrip()
+        days.append(text)
+    routine = "## Detailed Workout Routine\n\n" + "\n\n".join(days)
+
+    overview = (overview or "").strip()
+    positions = [overview.find(heading) for heading in _TAIL_HEADINGS if heading in overview]
+    if not positions:
+        return "\n\n".join(part for part in (overview, routine) if part) + "\n"
+    cut = min(positions)
+    return f"{overview[:cut].rstrip()}\n\n{routine}\n\n{overview[cut:]}\n"
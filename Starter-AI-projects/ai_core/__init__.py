@@ -0,0 +1,7 @@
+"""
+Shared building blocks for the Starter AI projects.
+
+The Streamlit apps add the ``Starter-AI-projects`` folder to ``sys.path`` and
+import from here, so caching and OpenAI plumbing live in one place instead of
+being copied into every app.
+"""
@@ -0,0 +1,238 @@
+"""
+Offline bulk generation to warm the response cache.
+
+Reads parameter sets from a JSONL or CSV file, turns each into chat completion
+requests with an app-supplied builder (the same prompt code the app uses, so
+cache keys match), drops duplicates and requests that are already cached, and
+runs the rest either through a bounded worker pool or the OpenAI Batch API.
+Every answer is written to the shared response cache under the request's
+cache key, so daytime traffic for the same inputs is served without an API
+call.
+
+Each app ships a small ``batch_generate.py`` that calls ``main`` with its
+request builder.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+from . import chat, metrics
+from .cache import cache_from_env
+from .client import ClientConfig, ClientPool
+from .fanout import FanOut
+from .scheduler import BATCH
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_DONE_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def read_param_sets(path):
+    """Parameter dicts from a ``.jsonl`` file (one object per line) or a ``.csv`` file with a header"""
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.lower().endswith(".csv"):
+            return [dict(row) for row in csv.DictReader(f)]
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def request_key(request):
+    """Cache key of a request dict (messages, model, temperature, max_tokens[, response_format, max_continuations])"""
+    extra = {"response_format": request["response_format"]} if request.get("response_format") else {}
+    return chat.cache_key(request["model"], request["messages"], request["temperature"], request["max_tokens"],
+                          request.get("max_continuations", 0), **extra)
+
+
+def collect_requests(param_sets, build_requests):
+    """Unique requests for all parameter sets, keyed by cache key, in first-seen order"""
+    requests = {}
+    for params in param_sets:
+        for request in build_requests(params):
+            requests.setdefault(request_key(request), request)
+    return requests
+
+
+def uncached(requests, cache):
+    """The requests whose answers are not in ``cache`` yet"""
+    if cache is None:
+        return dict(requests)
+    return {key: request for key, request in requests.items() if cache.get(key) is None}
+
+
+def _request_body(request):
+    body = {key: request[key] for key in ("model", "messages", "temperature", "max_tokens")}
+    if request.get("response_format"):
+        body["response_format"] = request["response_format"]
+    return body
+
+
+def _warm_one(client, key, request, cache, ttl):
+    # complete() writes the answer under the same key, unless it is still cut off by max_tokens
+    try:
+        chat.complete(client, **_request_body(request), cache=cache, ttl=ttl, priority=BATCH, flight=None,
+                      max_continuations=request.get("max_continuations", 0), site="batch")
+    except Exception as e:
+        return str(e)
+    if cache is not None and cache.get(key) is None:
+        return "Answer cut off by max_tokens"
+    return None
+
+
+def run_pool(client, requests, cache, max_workers=4, ttl=None, progress=None):
+    """Generate ``requests`` with at most ``max_workers`` in flight; returns {key: error} for failures.
+
+    ``client`` is a ``ClientPool``: its scheduler paces requests to the
+    configured RPM/TPM and retries 429s (honoring Retry-After), so a bounded
+    pool slows down instead of failing under rate limits.
+    """
+    failures = {}
+    with FanOut(max_workers=max_workers) as fan:
+        for key, request in requests.items():
+            fan.submit(key, _warm_one, client, key, request, cache, ttl)
+        for done, (key, error) in enumerate(fan.wait(), 1):
+            if error:
+                failures[key] = error
+            if progress:
+                progress(done, len(requests), key, error)
+    return failures
+
+
+def write_batch_file(requests, path):
+    """Write requests in the Batch API input format, using cache keys as custom ids"""
+    with open(path, "w", encoding="utf-8") as f:
+        for key, request in requests.items():
+            f.write(json.dumps({
+                "custom_id": key,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": _request_body(request),
+            }) + "\n")
+
+
+def submit_batch(client, path):
+    """Upload a batch input file and start the batch; returns the batch id"""
+    with open(path, "rb") as f:
+        uploaded = client.files.create(file=f, purpose="batch")
+    batch = client.batches.create(input_file_id=uploaded.id, endpoint=BATCH_ENDPOINT, completion_window="24h")
+    return batch.id
+
+
+def store_batch_output(text, cache, ttl=None):
+    """Write the answers in Batch API output JSONL into the cache; returns (stored, failed)
+
+    Answers cut off by max_tokens count as failed: the Batch API cannot
+    continue them, so they are left for the app to generate.
+    """
+    stored = failed = 0
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if result.get("error") or response.get("status_code") != 200:
+            failed += 1
+            continue
+        choice = response["body"]["choices"][0]
+        if choice.get("finish_reason") == "length":
+            failed += 1
+            continue
+        content = choice["message"]["content"]
+        if content and cache is not None:
+            cache.set(result["custom_id"], content, ttl)
+        stored += 1
+    return stored, failed
+
+
+def collect_batch(client, batch_id, cache, ttl=None, wait=False, poll_interval=60):
+    """Store a finished batch's answers in the cache; returns the batch status.
+
+    With ``wait=True`` the batch is polled until it reaches a final status.
+    """
+    batch = client.batches.retrieve(batch_id)
+    while wait and batch.status not in BATCH_DONE_STATUSES:
+        time.sleep(poll_interval)
+        batch = client.batches.retrieve(batch_id)
+    if batch.output_file_id:
+        stored, failed = store_batch_output(client.files.content(batch.output_file_id).text, cache, ttl)
+        print(f"Stored {stored} answers in the cache ({failed} failed)")
+    return batch.status
+
+
+def _openai_client(api_key):
+    from openai import OpenAI
+
+    return OpenAI(api_key=api_key)
+
+
+def main(build_requests, description, argv=None, prompts=None):
+    """Command line entry point shared by the apps' ``batch_generate.py`` scripts
+
+    ``prompts`` is the app's ``PromptRegistry``, reported with ``--prompts``.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("params", nargs="?", help="JSONL or CSV file with one parameter set per line/row")
+    parser.add_argument("--batch-api", action="store_true",
+                        help="submit through the OpenAI Batch API (cheaper, finishes within 24h)")
+    parser.add_argument("--collect", metavar="BATCH_ID", help="store the answers of a submitted batch")
+    parser.add_argument("--wait", action="store_true", help="with --batch-api/--collect, poll until the batch is done")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent requests in pool mode (default 4)")
+    parser.add_argument("--retries", type=int, default=6, help="retries per request on rate limits and errors")
+    parser.add_argument("--ttl", type=float, help="cache lifetime of warmed answers in seconds")
+    parser.add_argument("--batch-file", default="batch_input.jsonl", help="where to write the Batch API input")
+    parser.add_argument("--dry-run", action="store_true", help="only report what would be generated")
+    parser.add_argument("--prompts", action="store_true", help="print the token count of each prompt's static prefix")
+    args = parser.parse_args(argv)
+
+    if args.prompts:
+        print(prompts.report() if prompts is not None else "No prompt registry")
+        return 0
+
+    cache = cache_from_env()
+    if cache is None:
+        parser.error("RESPONSE_CACHE=off - there is no cache to warm")
+    api_key = os.getenv("OPENAI_API_KEY")
+
+    if args.collect:
+        status = collect_batch(_openai_client(api_key), args.collect, cache, args.ttl, wait=args.wait)
+        print(f"Batch {args.collect}: {status}")
+        return 0 if status == "completed" else 1
+    if not args.params:
+        parser.error("a parameter file is required unless --collect is given")
+
+    param_sets = read_param_sets(args.params)
+    requests = collect_requests(param_sets, build_requests)
+    pending = uncached(requests, cache)
+    print(f"{len(param_sets)} parameter sets -> {len(requests)} unique requests, {len(pending)} not cached")
+    if args.dry_run or not pending:
+        return 0
+    if not api_key:
+        parser.error("OPENAI_API_KEY is not set")
+
+    if args.batch_api:
+        write_batch_file(pending, args.batch_file)
+        client = _openai_client(api_key)
+        batch_id = submit_batch(client, args.batch_file)
+        print(f"Submitted batch {batch_id}; collect it later with --collect {batch_id}")
+        if not args.wait:
+            return 0
+        status = collect_batch(client, batch_id, cache, args.ttl, wait=True)
+        print(f"Batch {batch_id}: {status}")
+        return 0 if status == "completed" else 1
+
+    config = ClientConfig.from_env()
+    config.max_retries = args.retries
+    config.max_concurrency = max(config.max_concurrency, args.workers)
+    client = ClientPool(api_key=api_key, config=config)
+    metrics.install_from_env()
+
+    def progress(done, total, key, error):
+        print(f"[{done}/{total}] {key[:12]} {'FAILED: ' + error if error else 'ok'}", file=sys.stderr)
+
+    try:
+        failures = run_pool(client, pending, cache, max_workers=args.workers, ttl=args.ttl, progress=progress)
+    finally:
+        client.close()
+    print(f"Generated {len(pending) - len(failures)} answers ({len(failures)} failed)")
+    return 1 if failures else 0
@@ -0,0 +1,187 @@
+"""
+Offline load benchmark for the apps' generation paths.
+
+Starts a ``MockOpenAIServer`` and drives app scenarios through the real
+request path - ``ClientPool`` with its scheduler, the response cache,
+single-flight and streaming - from many threads at once, the way concurrent
+Streamlit sessions do. Reports latency percentiles (and time to first chunk
+for streams), throughput, errors, cache hit rate and what the server saw, so
+regressions show up before deploy without spending API quota.
+
+A scenario is ``fn(client, cache, params)`` returning the generated text (or
+an iterator of chunks, which is consumed) plus ``make_params(i)`` giving the
+i-th distinct parameter set; requests draw from ``--distinct`` of them, so
+repeats exercise the cache. Each app ships a ``benchmark.py`` that calls
+``main`` with scenarios wrapping its ``generation`` functions.
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from . import chat, metrics
+from .cache import MemoryCache
+from .client import ClientConfig, ClientPool
+from .mock_openai import MockOpenAIServer
+
+
+@dataclass
+class Scenario:
+    name: str
+    fn: object
+    make_params: object
+
+
+@dataclass
+class Sample:
+    scenario: str
+    seconds: float
+    first_chunk: float = None
+    error: str = None
+
+
+def percentile(values, q):
+    """Nearest-rank percentile (``q`` in 0-100) of ``values``; None when empty"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(1, math.ceil(q / 100 * len(ordered))) - 1]
+
+
+def _run_one(scenario, client, cache, params):
+    start = time.perf_counter()
+    first_chunk = None
+    try:
+        result = scenario.fn(client, cache, params)
+        if result is None:
+            raise RuntimeError("no result")
+        if not isinstance(result, str):
+            for _ in result:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - start
+    except Exception as e:
+        return Sample(scenario.name, time.perf_counter() - start, first_chunk, f"{type(e).__name__}: {e}")
+    return Sample(scenario.name, time.perf_counter() - start, first_chunk)
+
+
+def run_load(scenarios, client, cache, requests=100, concurrency=8, distinct=20, seed=0):
+    """Run ``requests`` scenario calls, round-robin over ``scenarios``; returns (samples, elapsed seconds)"""
+    rng = random.Random(seed)
+    jobs = [
+        (scenario, scenario.make_params(rng.randrange(distinct)))
+        for scenario in (scenarios[i % len(scenarios)] for i in range(requests))
+    ]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+        samples = list(pool.map(lambda job: _run_one(job[0], client, cache, job[1]), jobs))
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, elapsed):
+    """Per-scenario and overall latency percentiles, throughput and errors"""
+    summary = {}
+    for name in sorted({s.scenario for s in samples}) + ["all"]:
+        group = [s for s in samples if name in ("all", s.scenario)]
+        ok = [s.seconds for s in group if s.error is None]
+        first = [s.first_chunk for s in group if s.first_chunk is not None]
+        summary[name] = {
+            "requests": len(group),
+            "errors": len(group) - len(ok),
+            "p50": percentile(ok, 50),
+            "p95": percentile(ok, 95),
+            "p99": percentile(ok, 99),
+            "first_chunk_p50": percentile(first, 50),
+            "throughput": len(ok) / elapsed if elapsed else 0.0,
+        }
+    return summary
+
+
+def _seconds(value):
+    return f"{value:.3f}s" if value is not None else "-"
+
+
+def format_report(summary, extra):
+    lines = [f"{'scenario':<14} {'n':>5} {'err':>4} {'p50':>8} {'p95':>8} {'p99':>8} {'ttfc p50':>9} {'req/s':>7}"]
+    for name, row in summary.items():
+        lines.append(
+            f"{name:<14} {row['requests']:>5} {row['errors']:>4} {_seconds(row['p50']):>8} {_seconds(row['p95']):>8} "
+            f"{_seconds(row['p99']):>8} {_seconds(row['first_chunk_p50']):>9} {row['throughput']:>7.1f}"
+        )
+    lines.append("")
+    lines.extend(f"{key}: {value}" for key, value in extra.items())
+    return "\n".join(lines)
+
+
+def main(scenarios, description, argv=None):
+    """Command line entry point shared by the apps' ``benchmark.py`` scripts"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--scenario", action="append", choices=[s.name for s in scenarios],
+                        help="only run this scenario (repeatable)")
+    parser.add_argument("--requests", type=int, default=200, help="total scenario calls (default 200)")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent callers (default 16)")
+    parser.add_argument("--distinct", type=int, default=20, help="distinct parameter sets per scenario (default 20)")
+    parser.add_argument("--latency", type=float, default=0.2, help="mock time to first token in seconds")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="mock seconds per output token")
+    parser.add_argument("--answer-tokens", type=int, default=400, help="mock answer length in tokens")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="share of requests rejected with 429 (0-1)")
+    parser.add_argument("--rpm", type=int, default=0, help="scheduler requests per minute (default 0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=0, help="scheduler tokens per minute (default 0 = unlimited)")
+    parser.add_argument("--no-cache", action="store_true", help="run without the response cache")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--max-p95", type=float, metavar="SECONDS",
+                        help="exit with status 1 if any scenario's p95 latency exceeds this")
+    args = parser.parse_args(argv)
+    metrics.install_from_env()
+
+    selected = [s for s in scenarios if not args.scenario or s.name in args.scenario]
+    # A cache that keeps nothing rather than None, which app functions read as "the shared cache"
+    cache = MemoryCache(max_entries=0 if args.no_cache else 100000)
+    server = MockOpenAIServer(latency=args.latency, token_delay=args.token_delay, answer_tokens=args.answer_tokens,
+                              rate_limit=args.rate_limit, seed=args.seed)
+    shared_before = chat.IN_FLIGHT.shared
+    with server:
+        config = ClientConfig.from_env()
+        config.base_url = server.url
+        config.max_concurrency = max(config.max_concurrency, args.concurrency)
+        # The mock has no quota; pace only when asked to, to see the scheduler's effect
+        config.requests_per_minute = args.rpm
+        config.tokens_per_minute = args.tpm
+        client = ClientPool(api_key="mock", config=config)
+        try:
+            samples, elapsed = run_load(selected, client, cache, args.requests, args.concurrency,
+                                        args.distinct, args.seed)
+        finally:
+            client.close()
+
+    summary = summarize(samples, elapsed)
+    stats = cache.stats()
+    lookups = stats["hits"] + stats["misses"]
+    extra = {
+        "elapsed": f"{elapsed:.2f}s",
+        "cache hit rate": f"{stats['hits'] / lookups:.1%}" if lookups else "-",
+        "shared in flight": chat.IN_FLIGHT.shared - shared_before,
+        "server requests": server.requests,
+        "rate limited (429)": server.rejected,
+        "client retries": client.scheduler.retries,
+    }
+    print(format_report(summary, extra))
+    errors = sorted({s.error for s in samples if s.error})
+    for error in errors[:5]:
+        print(f"error: {error}", file=sys.stderr)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "extra": extra, "args": vars(args),
+                       "samples": [asdict(s) for s in samples]}, f, indent=2, default=str)
+    if args.max_p95 is not None:
+        slow = [name for name, row in summary.items() if row["p95"] is not None and row["p95"] > args.max_p95]
+        if slow:
+            print(f"p95 above {args.max_p95}s: {', '.join(slow)}", file=sys.stderr)
+            return 1
+    return 1 if errors else 0
@@ -0,0 +1,72 @@
+"""
+Adaptive max_tokens budgets.
+
+Each request type ("kind") has a ``BudgetRule``: a starting estimate of
+``base + per_unit * units`` output tokens, where units is whatever drives the
+answer's length (days of a meal plan, workout days per week). Once enough
+completions of a kind have been recorded, the estimate follows the observed
+tokens per unit instead (a high percentile, plus headroom), so small
+requests stop reserving the budget of large ones. Budgets are rounded up to
+a step and clamped to the rule's floor and ceiling.
+
+An estimate can still be too small; requests sent with ``max_continuations``
+are resumed by ``ai_core.chat`` when the answer is cut off, so a budget only
+trades latency, never completeness.
+"""
+
+import math
+import threading
+from collections import defaultdict, deque
+from dataclasses import dataclass
+
+
+@dataclass
+class BudgetRule:
+    """Starting estimate and limits of one request type, in output tokens"""
+
+    base: int
+    per_unit: int = 0
+    floor: int = 128
+    ceiling: int = 4096
+
+
+class TokenBudgets:
+    """max_tokens per request type from its rule and recent completion sizes; thread-safe"""
+
+    def __init__(self, rules, history=200, min_samples=5, percentile=0.9, headroom=1.25, step=128):
+        self.rules = dict(rules)
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.headroom = headroom
+        self.step = step
+        self._samples = defaultdict(lambda: deque(maxlen=history))
+        self._lock = threading.Lock()
+
+    def _observed_per_unit(self, kind):
+        with self._lock:
+            samples = sorted(self._samples[kind])
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * self.percentile))]
+
+    def estimate(self, kind, units=1):
+        """max_tokens for a ``kind`` request of ``units`` units"""
+        rule = self.rules[kind]
+        units = max(1, units)
+        per_unit = self._observed_per_unit(kind)
+        if per_unit is None:
+            tokens = rule.base + rule.per_unit * units
+        else:
+            tokens = per_unit * units * self.headroom
+        tokens = int(math.ceil(tokens / self.step) * self.step)
+        return max(rule.floor, min(rule.ceiling, tokens))
+
+    def record(self, kind, units, completion_tokens):
+        """Remember how long a complete answer (including continuations) was"""
+        if kind in self.rules and completion_tokens:
+            with self._lock:
+                self._samples[kind].append(completion_tokens / max(1, units))
+
+    def recorder(self, kind, units=1):
+        """Callback for ``chat.complete(record_usage=...)``"""
+        return lambda completion_tokens: self.record(kind, units, completion_tokens)
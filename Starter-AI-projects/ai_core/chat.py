@@ -0,0 +1,201 @@
+"""
+Thin wrappers around ``client.chat.completions.create``.
+
+Every generation function in the apps goes through ``complete`` or ``stream``
+so cross-cutting behaviour is applied uniformly: response caching,
+single-flight deduplication through the process-wide ``IN_FLIGHT`` registry,
+so identical requests submitted by several sessions at once share one API
+call (see ``ai_core.singleflight``), continuation of answers cut off by
+``max_tokens``, and per-call latency/token metrics labelled by ``site``
+(see ``ai_core.metrics``).
+
+With ``max_continuations`` an answer that stops with ``finish_reason ==
+"length"`` is resumed by sending it back as the assistant turn and asking
+the model to continue, up to that many times. The answer then no longer
+depends on ``max_tokens``, so it is left out of the cache key and budgets
+(see ``ai_core.budgets``) can change without invalidating cached answers.
+An answer still cut off after the last continuation is returned but neither
+cached nor recorded, so the next identical request tries again.
+"""
+
+from . import metrics
+from .cache import make_cache_key
+from .scheduler import Scheduler
+from .singleflight import SingleFlight
+
+# Shared by every Streamlit session in the process
+IN_FLIGHT = SingleFlight()
+
+
+CONTINUE_PROMPT = "Continue exactly where you stopped. Do not repeat anything you already wrote."
+
+
+def cache_key(model, messages, temperature, max_tokens, max_continuations=0, **extra):
+    """Cache key of a request; ``max_tokens`` only counts when answers are not continued"""
+    return make_cache_key(model, messages, temperature, 0 if max_continuations else max_tokens, **extra)
+
+
+def iter_stream_text(response, finish_reasons=None):
+    """Yield the text deltas of a streamed chat completion
+
+    Finish reasons seen in the stream are appended to ``finish_reasons``.
+    """
+    for chunk in response:
+        if not chunk.choices:
+            continue
+        choice = chunk.choices[0]
+        if finish_reasons is not None and getattr(choice, "finish_reason", None):
+            finish_reasons.append(choice.finish_reason)
+        if choice.delta.content:
+            yield choice.delta.content
+
+
+def continuation_messages(messages, text):
+    """``messages`` followed by the partial answer and a request to continue it"""
+    return list(messages) + [
+        {"role": "assistant", "content": text},
+        {"role": "user", "content": CONTINUE_PROMPT},
+    ]
+
+
+def _scheduling(client, priority, record=None):
+    # Only a ClientPool understands priority and retry callbacks; plain OpenAI clients get nothing extra
+    extra = {"priority": priority} if priority is not None else {}
+    if record is not None and isinstance(getattr(client, "scheduler", None), Scheduler):
+        extra["on_retry"] = record.on_retry
+    return extra
+
+
+def _cached(cache, key):
+    return cache.get(key) if cache is not None else None
+
+
+def _completion_tokens(response, text):
+    usage = getattr(response, "usage", None)
+    return getattr(usage, "completion_tokens", None) or len(text) // 4
+
+
+def complete(client, messages, model, temperature, max_tokens, cache=None, response_format=None,
+             priority=None, flight=IN_FLIGHT, max_continuations=0, record_usage=None, site=None, ttl=None):
+    """Return the completion text for ``messages``, consulting ``cache`` first
+
+    ``response_format`` is passed through to the API (e.g. a JSON schema for
+    structured output) and is part of the cache key. ``priority`` selects the
+    ``ClientPool`` scheduler lane (see ``ai_core.scheduler``). Concurrent
+    identical calls share one request through ``flight``; pass ``None`` to
+    opt out. ``record_usage`` is called with the answer's completion tokens
+    after an API call (e.g. ``TokenBudgets.recorder``). ``site`` names the
+    caller in metrics (e.g. "recipe"); ``ttl`` overrides the cache's TTL.
+    """
+    extra = {"response_format": response_format} if response_format else {}
+    key = cache_key(model, messages, temperature, max_tokens, max_continuations, **extra)
+    record = metrics.begin(site, model)
+
+    def call():
+        # Looked up inside the flight, so callers arriving just after a flight
+        # ended find the answer it cached
+        cached = _cached(cache, key)
+        if cached is not None:
+            if record is not None:
+                record.cached = True
+            return cached
+        parts = []
+        used = 0
+        request_messages = messages
+        for attempt in range(max_continuations + 1):
+            response = client.chat.completions.create(
+                model=model,
+                messages=request_messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **extra,
+                **_scheduling(client, priority, record)
+            )
+            choice = response.choices[0]
+            parts.append(choice.message.content or "")
+            if record is not None:
+                record.add_request(request_messages, response, parts[-1])
+            used += _completion_tokens(response, parts[-1])
+            finish_reason = getattr(choice, "finish_reason", None)
+            if finish_reason != "length":
+                break
+            request_messages = continuation_messages(messages, "".join(parts))
+        text = "".join(parts)
+        if finish_reason == "length":
+            return text
+        if record_usage is not None:
+            record_usage(used)
+        if cache is not None and text:
+            cache.set(key, text, ttl)
+        return text
+
+    try:
+        text = flight.do(key, call) if flight is not None else call()
+    except Exception as e:
+        metrics.finish(record, e)
+        raise
+    metrics.finish(record)
+    return text
+
+
+def stream(client, messages, model, temperature, max_tokens, cache=None, priority=None, flight=IN_FLIGHT,
+           max_continuations=0, record_usage=None, site=None):
+    """Return an iterator of completion text chunks.
+
+    The request is sent before this function returns, so connection and API
+    errors surface here rather than on first iteration. A cache hit is replayed
+    as a single chunk; a fully consumed stream is written back to the cache.
+    Callers of an identical stream already in flight get the same chunks,
+    from the start, instead of a request of their own. A cut-off answer is
+    continued in the same stream (see ``complete``). Metrics are reported
+    once the stream is consumed.
+    """
+    key = cache_key(model, messages, temperature, max_tokens, max_continuations)
+    record = metrics.begin(site, model, stream=True)
+
+    def open_stream(request_messages=messages):
+        response = client.chat.completions.create(
+            model=model,
+            messages=request_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **_scheduling(client, priority, record)
+        )
+        if record is not None:
+            record.add_request(request_messages)
+        return response
+
+    def start():
+        cached = _cached(cache, key)
+        if cached is not None:
+            if record is not None:
+                record.cached = True
+            return iter([cached])
+        return _stream_and_store(open_stream(), open_stream, messages, max_continuations, cache, key, record_usage)
+
+    try:
+        chunks = flight.stream("stream:" + key, start) if flight is not None else start()
+    except Exception as e:
+        metrics.finish(record, e)
+        raise
+    return metrics.observe_stream(record, chunks) if record is not None else chunks
+
+
+def _stream_and_store(response, open_stream, messages, max_continuations, cache, key, record_usage):
+    parts = []
+    for attempt in range(max_continuations + 1):
+        finish_reasons = []
+        for text in iter_stream_text(response, finish_reasons):
+            parts.append(text)
+            yield text
+        if finish_reasons[-1:] != ["length"] or attempt == max_continuations:
+            break
+        response = open_stream(continuation_messages(messages, "".join(parts)))
+    if finish_reasons[-1:] == ["length"]:
+        return
+    if record_usage is not None and parts:
+        # Streams carry no usage; estimate from the text
+        record_usage(len("".join(parts)) // 4)
+    if cache is not None and parts:
+        cache.set(key, "".join(parts))
@@ -0,0 +1,215 @@
+"""
+Shared async OpenAI client pool.
+
+Streamlit runs every session's script on its own thread. Instead of each
+thread blocking on a synchronous ``OpenAI`` client, a single ``AsyncOpenAI``
+client lives on a background event loop with a bounded, keep-alive HTTP
+connection pool. Script threads submit requests to that loop, so many
+concurrent requests are multiplexed over a few connections and a concurrency
+limit protects the API quota.
+
+Requests are admitted by a ``Scheduler`` (see ``ai_core.scheduler``) that
+paces them to the configured requests/tokens per minute, retries rate limits
+and transient errors with backoff, and serves interactive requests before
+batch ones. Identical non-streaming requests that are in flight at the same
+time are coalesced into one API call.
+
+``ClientPool`` exposes ``pool.chat.completions.create(...)`` with the same
+blocking semantics as the synchronous client, so it can be passed anywhere a
+client is expected (see ``ai_core.chat``). ``submit``/``acreate`` give access
+to the async side for fan-out. ``shared_client()`` returns the process-wide
+pool, built from the environment on first use.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+from dataclasses import dataclass
+
+from .lazy import once
+from .scheduler import INTERACTIVE, Scheduler
+
+_DONE = object()
+
+
+@dataclass
+class ClientConfig:
+    """Connection pool, concurrency and timeout settings"""
+
+    max_connections: int = 20
+    max_keepalive_connections: int = 10
+    keepalive_expiry: float = 30.0
+    max_concurrency: int = 8
+    timeout: float = 60.0
+    connect_timeout: float = 10.0
+    max_retries: int = 4
+    requests_per_minute: int = 500
+    tokens_per_minute: int = 200000
+    base_url: str = None
+
+    @classmethod
+    def from_env(cls):
+        """Read overrides from OPENAI_POOL_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_connections=int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", defaults.max_connections)),
+            max_keepalive_connections=int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", defaults.max_keepalive_connections)),
+            keepalive_expiry=float(os.getenv("OPENAI_POOL_KEEPALIVE_EXPIRY", defaults.keepalive_expiry)),
+            max_concurrency=int(os.getenv("OPENAI_POOL_MAX_CONCURRENCY", defaults.max_concurrency)),
+            timeout=float(os.getenv("OPENAI_POOL_TIMEOUT", defaults.timeout)),
+            connect_timeout=float(os.getenv("OPENAI_POOL_CONNECT_TIMEOUT", defaults.connect_timeout)),
+            max_retries=int(os.getenv("OPENAI_POOL_MAX_RETRIES", defaults.max_retries)),
+            requests_per_minute=int(os.getenv("OPENAI_RATE_LIMIT_RPM", defaults.requests_per_minute)),
+            tokens_per_minute=int(os.getenv("OPENAI_RATE_LIMIT_TPM", defaults.tokens_per_minute)),
+            base_url=os.getenv("OPENAI_BASE_URL") or None,
+        )
+
+
+def build_async_client(api_key=None, config=None):
+    """Create an ``AsyncOpenAI`` client backed by a bounded keep-alive pool"""
+    import httpx
+    from openai import AsyncOpenAI
+
+    config = config or ClientConfig()
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive_connections,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(config.timeout, connect=config.connect_timeout),
+    )
+    # Retries are done by the Scheduler, which shares rate-limit state across requests
+    return AsyncOpenAI(api_key=api_key, base_url=config.base_url, http_client=http_client, max_retries=0)
+
+
+class _Completions:
+    def __init__(self, pool):
+        self._pool = pool
+
+    def create(self, priority=INTERACTIVE, on_retry=None, **params):
+        return self._pool.create(priority=priority, on_retry=on_retry, **params)
+
+
+class _Chat:
+    def __init__(self, pool):
+        self.completions = _Completions(pool)
+
+
+class ClientPool:
+    """One async OpenAI client on a background event loop, shared by all threads"""
+
+    def __init__(self, api_key=None, config=None, client=None):
+        self.config = config or ClientConfig()
+        self._client = client if client is not None else build_async_client(api_key, self.config)
+        self._semaphore = asyncio.Semaphore(self.config.max_concurrency)
+        self.scheduler = Scheduler(
+            requests_per_minute=self.config.requests_per_minute,
+            tokens_per_minute=self.config.tokens_per_minute,
+            max_retries=self.config.max_retries,
+        )
+        self._inflight = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="openai-client-pool", daemon=True)
+        self._thread.start()
+        self.chat = _Chat(self)
+
+    async def acreate(self, priority=INTERACTIVE, on_retry=None, **params):
+        """Await a non-streaming chat completion through the scheduler.
+
+        Concurrent identical requests share a single API call (whose retries
+        are reported to the first caller's ``on_retry``).
+        """
+        key = json.dumps(params, sort_keys=True, default=str)
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.scheduler.run(lambda: self._limited(params), params, priority,
+                                                            on_retry))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(task)
+
+    async def _limited(self, params):
+        async with self._semaphore:
+            return await self._client.chat.completions.create(**params)
+
+    async def _open_stream(self, params):
+        # The slot is held until the stream is fully read (released in _pump)
+        await self._semaphore.acquire()
+        try:
+            return await self._client.chat.completions.create(**params)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def submit(self, coro):
+        """Schedule ``coro`` on the pool's loop and return a ``concurrent.futures.Future``"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def create(self, priority=INTERACTIVE, on_retry=None, **params):
+        """Blocking chat completion; with ``stream=True`` returns a chunk iterator
+
+        ``priority`` is ``scheduler.INTERACTIVE`` (default) or ``scheduler.BATCH``.
+        ``on_retry(error)`` is called from the pool's loop before each retry.
+        """
+        if params.get("stream"):
+            return self._stream(params, priority, on_retry)
+        return self.submit(self.acreate(priority=priority, on_retry=on_retry, **params)).result()
+
+    def _stream(self, params, priority, on_retry=None):
+        chunks = queue.Queue()
+        self.submit(self._pump(params, chunks, priority, on_retry))
+        # Wait for the first event so request errors are raised to the caller
+        first = chunks.get()
+        if isinstance(first, BaseException):
+            raise first
+        return self._drain(first, chunks)
+
+    async def _pump(self, params, chunks, priority, on_retry=None):
+        # Always end with the error or _DONE, or the consumer blocks on chunks.get() forever
+        end = _DONE
+        try:
+            response = await self.scheduler.run(lambda: self._open_stream(params), params, priority, on_retry)
+            try:
+                async for chunk in response:
+                    chunks.put(chunk)
+            finally:
+                self._semaphore.release()
+        except Exception as e:
+            end = e
+        except BaseException as e:
+            # Cancelled (e.g. by close()): wake the consumer, then let it propagate
+            end = e
+            raise
+        finally:
+            chunks.put(end)
+
+    @staticmethod
+    def _drain(first, chunks):
+        item = first
+        while item is not _DONE:
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+            item = chunks.get()
+
+    def close(self):
+        """Close the HTTP client and stop the background loop"""
+        close = getattr(self._client, "close", None)
+        if close is not None:
+            self.submit(close()).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+
+def client_from_env():
+    """Build a ``ClientPool`` from OPENAI_API_KEY and the OPENAI_POOL_* settings"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set")
+    return ClientPool(api_key=api_key, config=ClientConfig.from_env())
+
+
+shared_client = once(client_from_env)
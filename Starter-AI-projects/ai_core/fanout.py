@@ -0,0 +1,42 @@
+"""
+Run independent generation calls concurrently.
+
+Streamlit elements can only be created from the script thread, so ``FanOut``
+runs the blocking calls on worker threads and hands finished results back to
+the script thread, which renders them as they arrive.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class FanOut:
+    """Submit named calls to worker threads and collect results as they finish"""
+
+    def __init__(self, max_workers=4):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+        self._pending = {}
+
+    def submit(self, name, fn, *args, **kwargs):
+        self._pending[self._executor.submit(fn, *args, **kwargs)] = name
+
+    def ready(self):
+        """Yield ``(name, result)`` for calls that have already finished, without blocking"""
+        for future in [f for f in self._pending if f.done()]:
+            yield self._pending.pop(future), future.result()
+
+    def wait(self):
+        """Yield ``(name, result)`` for the remaining calls in completion order"""
+        for future in as_completed(list(self._pending)):
+            yield self._pending.pop(future), future.result()
+
+    def __len__(self):
+        return len(self._pending)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
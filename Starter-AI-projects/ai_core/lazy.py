@@ -0,0 +1,37 @@
+"""
+Process-wide resources created on first use.
+
+Importing a generation module must not open connections or files, so that
+workers, CLIs and tests start fast and without credentials. ``once`` turns a
+factory such as ``cache_from_env`` into a getter that builds the resource the
+first time it is needed and returns the same object afterwards, from any
+thread - the same role ``st.cache_resource`` plays inside the Streamlit apps.
+"""
+
+import functools
+import threading
+
+
+def once(factory):
+    """Thread-safe getter for ``factory()``, called on first use only.
+
+    A factory that raises is tried again on the next call. ``getter.reset()``
+    forgets the resource (without closing it), e.g. between tests.
+    """
+    lock = threading.Lock()
+    created = []
+
+    @functools.wraps(factory)
+    def getter():
+        if not created:
+            with lock:
+                if not created:
+                    created.append(factory())
+        return created[0]
+
+    def reset():
+        with lock:
+            created.clear()
+
+    getter.reset = reset
+    return getter
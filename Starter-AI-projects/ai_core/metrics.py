@@ -0,0 +1,274 @@
+"""
+Per-request latency and token instrumentation.
+
+``ai_core.chat`` reports every ``complete``/``stream`` call as a
+``CallMetrics`` record to the hooks registered with ``add_hook``: the call
+site (``site=`` - recipe, suggestions, meal_plan, ...), model, whether the
+answer came from the cache or another caller's identical request in flight,
+total latency, time to first chunk (streams), prompt and completion tokens,
+API requests (continuations included), scheduler retries and the error, if
+any. Without hooks nothing is measured.
+
+Two exporters are included, both enabled from the environment by
+``install_from_env`` (the apps and the batch CLI call it at startup):
+
+    METRICS_JSONL=~/.cache/hands-on-ai/metrics.jsonl   # one JSON record per call
+    METRICS_PORT=9464                                    # Prometheus text format at /metrics
+
+Streams carry no usage, so their token counts are estimated from the text
+(characters / 4).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .lazy import once
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+
+_hooks = []
+_hooks_lock = threading.Lock()
+
+
+@dataclass
+class CallMetrics:
+    site: str
+    model: str
+    stream: bool = False
+    cached: bool = False
+    shared: bool = False
+    latency: float = 0.0
+    first_token: float = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    requests: int = 0
+    retries: int = 0
+    error: str = None
+    timestamp: float = field(default_factory=time.time)
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+
+    def add_request(self, messages, response=None, text=""):
+        """Count one API request; tokens are estimated when the response has no usage"""
+        self.requests += 1
+        usage = getattr(response, "usage", None)
+        self.prompt_tokens += getattr(usage, "prompt_tokens", None) or estimate_tokens(messages)
+        self.completion_tokens += getattr(usage, "completion_tokens", None) or len(text) // 4
+
+    def on_retry(self, error=None):
+        self.retries += 1
+
+    def to_dict(self):
+        data = asdict(self)
+        data.pop("_start")
+        return data
+
+
+def estimate_tokens(messages):
+    return sum(len(str(m.get("content") or "")) for m in messages) // 4
+
+
+def add_hook(hook):
+    """Call ``hook(call_metrics)`` after every chat call; returns ``hook``"""
+    with _hooks_lock:
+        _hooks.append(hook)
+    return hook
+
+
+def remove_hook(hook):
+    with _hooks_lock:
+        if hook in _hooks:
+            _hooks.remove(hook)
+
+
+def begin(site, model, stream=False):
+    """A record for a call that is starting, or None when no hook is registered"""
+    return CallMetrics(site or "other", model, stream=stream) if _hooks else None
+
+
+def finish(record, error=None):
+    """Complete ``record`` and pass it to the hooks; hook errors are ignored"""
+    if record is None:
+        return
+    record.latency = time.perf_counter() - record._start
+    if error is not None:
+        record.error = f"{type(error).__name__}: {error}"
+    elif not record.cached and not record.requests:
+        record.shared = True
+    for hook in list(_hooks):
+        try:
+            hook(record)
+        except Exception:
+            pass
+
+
+def observe_stream(record, chunks):
+    """Pass ``chunks`` through, timing the first one and finishing ``record`` at the end"""
+    error = None
+    text = []
+    try:
+        for chunk in chunks:
+            if record.first_token is None:
+                record.first_token = time.perf_counter() - record._start
+            text.append(chunk)
+            yield chunk
+    except Exception as e:
+        error = e
+        raise
+    finally:
+        if record.requests:
+            record.completion_tokens = len("".join(text)) // 4
+        finish(record, error)
+
+
+class JSONLExporter:
+    """Hook appending one JSON line per call to ``path``"""
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def __call__(self, record):
+        line = json.dumps(record.to_dict(), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class PrometheusExporter:
+    """Hook aggregating calls into Prometheus counters and histograms per site and model"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._calls = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._retries = defaultdict(int)
+        self._requests = defaultdict(int)
+        self._tokens = defaultdict(int)
+        self._latency = {}
+        self._first_token = {}
+        self._server = None
+
+    def __call__(self, record):
+        key = (record.site, record.model)
+        source = "cache" if record.cached else "shared" if record.shared else "api"
+        with self._lock:
+            self._calls[key + (source,)] += 1
+            if record.error:
+                self._errors[key] += 1
+            self._retries[key] += record.retries
+            self._requests[key] += record.requests
+            self._tokens[key + ("prompt",)] += record.prompt_tokens
+            self._tokens[key + ("completion",)] += record.completion_tokens
+            self._latency.setdefault(key, _Histogram(self.buckets)).observe(record.latency)
+            if record.first_token is not None:
+                self._first_token.setdefault(key, _Histogram(self.buckets)).observe(record.first_token)
+
+    def render(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            def counter(name, help_text, values, *extra_labels):
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+                for key, value in sorted(values.items()):
+                    labels = dict(zip(("site", "model") + extra_labels, key))
+                    lines.append(f"{name}{_labels(**labels)} {value}")
+
+            def histogram(name, help_text, values):
+                lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+                for (site, model), hist in sorted(values.items()):
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f"{name}_bucket{_labels(site=site, model=model, le=bound)} {count}")
+                    lines.append(f"{name}_bucket{_labels(site=site, model=model, le='+Inf')} {hist.count}")
+                    lines.append(f"{name}_sum{_labels(site=site, model=model)} {hist.sum}")
+                    lines.append(f"{name}_count{_labels(site=site, model=model)} {hist.count}")
+
+            counter("llm_calls_total", "Chat calls by answer source (api, cache or shared in flight).",
+                    self._calls, "source")
+            counter("llm_errors_total", "Chat calls that raised.", self._errors)
+            counter("llm_api_requests_total", "API requests sent, continuations included.", self._requests)
+            counter("llm_retries_total", "API requests retried by the scheduler.", self._retries)
+            counter("llm_tokens_total", "Prompt and completion tokens (estimated for streams).",
+                    self._tokens, "kind")
+            histogram("llm_call_duration_seconds", "Latency of chat calls.", self._latency)
+            histogram("llm_time_to_first_chunk_seconds", "Time to the first streamed chunk.", self._first_token)
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port, host="127.0.0.1"):
+        """Serve ``render()`` at http://host:port/metrics on a background thread; returns the port"""
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                data = exporter.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        return self._server.server_address[1]
+
+    def close(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+@once
+def install_from_env():
+    """Register the exporters selected by METRICS_JSONL and METRICS_PORT (once per process)"""
+    exporters = []
+    path = os.getenv("METRICS_JSONL")
+    if path:
+        exporters.append(add_hook(JSONLExporter(path)))
+    port = os.getenv("METRICS_PORT")
+    if port:
+        exporter = add_hook(PrometheusExporter())
+        exporter.serve(int(port), os.getenv("METRICS_HOST", "127.0.0.1"))
+        exporters.append(exporter)
+    return exporters
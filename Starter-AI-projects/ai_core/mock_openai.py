@@ -0,0 +1,165 @@
+"""
+Local stand-in for the OpenAI chat completions endpoint.
+
+Serves ``POST /v1/chat/completions`` on localhost so the apps' request path
+(``ClientPool``, scheduler, cache, streaming) can be exercised without
+spending API quota. Answers are deterministic filler text of
+``answer_tokens`` words, truncated at the request's ``max_tokens`` with
+``finish_reason == "length"`` like the real API (continuations get the
+rest). Latency is modeled as a fixed time to first token plus a delay per
+token, and a share of requests can be rejected with 429 and a
+``retry-after-ms`` header.
+
+    with MockOpenAIServer(latency=0.2, rate_limit=0.05) as server:
+        pool = ClientPool(api_key="mock", config=ClientConfig(base_url=server.url))
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = ("chop", "simmer", "season", "stir", "garlic", "onion", "squat", "press", "rest", "plank")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        server = self.server.mock
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+        if server.reject():
+            self._json(429, {"error": {"message": "Rate limit reached", "type": "requests",
+                                       "code": "rate_limit_exceeded"}},
+                       {"retry-after-ms": str(int(server.retry_after * 1000))})
+            return
+        words, finish_reason = server.answer(body.get("messages", []), body.get("max_tokens"))
+        prompt_tokens = sum(len(str(m.get("content") or "")) for m in body.get("messages", [])) // 4
+        if body.get("stream"):
+            self._stream(server, body, words, finish_reason)
+        else:
+            time.sleep(server.latency + server.token_delay * len(words))
+            self._json(200, {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": " ".join(words)},
+                    "finish_reason": finish_reason,
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": len(words),
+                    "total_tokens": prompt_tokens + len(words),
+                },
+            })
+
+    def _json(self, status, payload, headers=None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, server, body, words, finish_reason):
+        # Server-sent events; the body ends when the connection closes
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        def event(delta, finish=None):
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "mock"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        time.sleep(server.latency)
+        event({"role": "assistant", "content": ""})
+        for idx, word in enumerate(words):
+            time.sleep(server.token_delay)
+            event({"content": word if idx == 0 else " " + word})
+        event({}, finish_reason)
+        self.wfile.write(b"data: [DONE]\n\n")
+
+
+class MockOpenAIServer:
+    """Chat completions endpoint on a background thread; use as a context manager"""
+
+    def __init__(self, latency=0.2, token_delay=0.002, answer_tokens=400, rate_limit=0.0,
+                 retry_after=0.05, port=0, seed=None):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.answer_tokens = answer_tokens
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.requests = 0
+        self.rejected = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.mock = self
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL for the OpenAI client"""
+        return f"http://127.0.0.1:{self._httpd.server_address[1]}/v1"
+
+    def reject(self):
+        """Count a request and decide whether it gets a 429"""
+        with self._lock:
+            self.requests += 1
+            if self.rate_limit and self._random.random() < self.rate_limit:
+                self.rejected += 1
+                return True
+        return False
+
+    def answer(self, messages, max_tokens):
+        """Words of the answer and its finish reason
+
+        A continuation (the partial answer sent back as an assistant message)
+        gets the rest of the answer.
+        """
+        written = sum(len(str(m.get("content") or "").split()) for m in messages if m.get("role") == "assistant")
+        count = max(self.answer_tokens - written, 1)
+        if max_tokens and max_tokens < count:
+            return [WORDS[i % len(WORDS)] for i in range(max_tokens)], "length"
+        return [WORDS[i % len(WORDS)] for i in range(count)], "stop"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), name="mock-openai",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,127 @@
+"""
+Rerun profiling for the Streamlit apps.
+
+Every widget interaction reruns the whole app script: the CSS, sidebar, every
+tab and the history and favorites expanders are rendered again.
+``RerunProfiler`` times each rerun and the named sections inside it::
+
+    profile.start()
+    with st.sidebar, profile.section("sidebar"):
+        ...
+    with tab3, profile.section("favorites"):
+        ...
+    profile.finish()
+
+Sections nest, e.g. ``recipe/history`` inside ``recipe``. ``summary()`` ranks
+them by mean time over the last reruns, so it is easy to see which ones grow
+with the history and favorites. The apps show the ranking in a debug panel
+(see ``ai_core/ui.py``) when PROFILE_RERUNS=1 or the URL has ``?profile=1``.
+A disabled profiler measures nothing.
+"""
+
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+
+OTHER = "(other)"
+
+
+@dataclass
+class Rerun:
+    number: int
+    total: float
+    sections: dict = field(default_factory=dict)
+    interrupted: bool = False
+
+    @property
+    def other(self):
+        """Time spent outside every top-level section"""
+        return max(0.0, self.total - sum(t for name, t in self.sections.items() if "/" not in name))
+
+
+class RerunProfiler:
+    """Times script reruns and the named sections within them, keeping the last ``history`` reruns"""
+
+    def __init__(self, enabled=True, history=50, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self.reruns = deque(maxlen=history)
+        self.count = 0
+        self._start = None
+        self._sections = {}
+        self._stack = []
+
+    def start(self):
+        """Begin timing a rerun
+
+        A rerun that never reached ``finish`` (``st.rerun``, ``st.stop``, an
+        exception) is kept as interrupted.
+        """
+        if not self.enabled:
+            return
+        if self._start is not None:
+            self.finish(interrupted=True)
+        self._start = self.clock()
+        self._sections = {}
+        self._stack = []
+
+    @contextmanager
+    def section(self, name):
+        """Add the time spent in the ``with`` block to section ``name`` of the current rerun"""
+        if not self.enabled or self._start is None:
+            yield
+            return
+        self._stack.append(name)
+        path = "/".join(self._stack)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self._sections[path] = self._sections.get(path, 0.0) + self.clock() - start
+            self._stack.pop()
+
+    def finish(self, interrupted=False):
+        """End the current rerun and return it; None if none was started"""
+        if not self.enabled or self._start is None:
+            return None
+        self.count += 1
+        rerun = Rerun(self.count, self.clock() - self._start, self._sections, interrupted)
+        self.reruns.append(rerun)
+        self._start = None
+        return rerun
+
+    def summary(self, limit=None):
+        """Sections ranked by mean seconds per rerun, slowest first
+
+        Each row has the section, the reruns it ran in and its last, mean and
+        max time. Time outside the top-level sections is reported as
+        ``(other)``.
+        """
+        times = defaultdict(list)
+        for rerun in self.reruns:
+            for name, elapsed in rerun.sections.items():
+                times[name].append(elapsed)
+            times[OTHER].append(rerun.other)
+        rows = [
+            {"section": name, "reruns": len(values), "last": values[-1],
+             "mean": sum(values) / len(values), "max": max(values)}
+            for name, values in times.items()
+        ]
+        rows.sort(key=lambda row: row["mean"], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def totals(self):
+        """Last, mean and max seconds per rerun; None before the first finished rerun"""
+        if not self.reruns:
+            return None
+        values = [rerun.total for rerun in self.reruns]
+        return {"reruns": len(values), "last": values[-1], "mean": sum(values) / len(values), "max": max(values),
+                "interrupted": sum(rerun.interrupted for rerun in self.reruns)}
+
+    def reset(self):
+        self.reruns.clear()
+        self.count = 0
+
+
+DISABLED = RerunProfiler(enabled=False)
@@ -0,0 +1,185 @@
+"""
+Rate-limit-aware scheduling for API requests.
+
+Runs on the ``ClientPool`` event loop. Every request is admitted through two
+token buckets - requests per minute and (estimated) tokens per minute - so
+traffic is paced at the quota instead of tripping it. Waiting requests are
+admitted by priority lane (interactive before batch, first come first served
+within a lane). Retryable failures (429, 408, 409, 5xx, connection errors)
+are retried with jittered exponential backoff; a ``Retry-After`` from the
+API is honored and a 429 pauses all admissions for that long, so one rate
+limit does not turn into a storm of them.
+"""
+
+import asyncio
+import email.utils
+import heapq
+import itertools
+import random
+import time
+
+INTERACTIVE = 0
+BATCH = 1
+
+RETRYABLE_STATUS = {408, 409, 429}
+_CONNECTION_ERRORS = ("APIConnectionError", "APITimeoutError")
+
+
+def estimate_tokens(params):
+    """Rough token cost of a request: prompt characters / 4 plus the completion budget"""
+    chars = sum(len(str(m.get("content") or "")) for m in params.get("messages", []))
+    return chars // 4 + int(params.get("max_tokens") or 1000)
+
+
+def is_retryable(error):
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    return type(error).__name__ in _CONNECTION_ERRORS
+
+
+def retry_after(error):
+    """Seconds the API asked us to wait (``retry-after-ms`` / ``retry-after``), or None"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return float(value) / 1000
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        try:
+            return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class TokenBucket:
+    """Refills ``per_minute`` units per minute; holds at most ``burst_seconds`` worth"""
+
+    def __init__(self, per_minute, burst_seconds=10, clock=time.monotonic):
+        self.rate = per_minute / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.level = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount):
+        """Seconds until ``amount`` can be taken (0 for an unlimited bucket)"""
+        if not self.rate:
+            return 0.0
+        self._refill()
+        return max(0.0, (min(amount, self.capacity) - self.level) / self.rate)
+
+    def take(self, amount):
+        if self.rate:
+            self._refill()
+            self.level -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        """Return over-estimated units (or charge more for a negative amount)"""
+        if self.rate:
+            self._refill()
+            self.level = min(self.capacity, self.level + amount)
+
+
+class Scheduler:
+    """Admit requests by priority within RPM/TPM limits and retry failures with backoff"""
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, max_retries=4,
+                 base_delay=0.5, max_delay=30.0, clock=time.monotonic):
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retries = 0
+        self._clock = clock
+        self._paused_until = 0.0
+        self._waiting = []
+        self._order = itertools.count()
+        self._wake = None
+        self._dispatcher = None
+
+    def backoff(self, attempt, error=None):
+        """Delay before retry ``attempt`` (0-based): full jitter, never shorter than Retry-After"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        requested = retry_after(error) if error is not None else None
+        return max(delay, requested) if requested is not None else delay
+
+    async def run(self, call, params, priority=INTERACTIVE, on_retry=None):
+        """Await ``call()`` once admitted, retrying retryable errors.
+
+        ``params`` are the request parameters, used to estimate the token
+        cost; it is reconciled with the response's reported usage.
+        ``on_retry(error)`` is called before each retry.
+        """
+        estimate = estimate_tokens(params)
+        attempt = 0
+        while True:
+            await self._admit(estimate, priority)
+            try:
+                response = await call()
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                delay = self.backoff(attempt, e)
+                if getattr(e, "status_code", None) == 429:
+                    self._paused_until = max(self._paused_until, self._clock() + delay)
+                attempt += 1
+                self.retries += 1
+                if on_retry is not None:
+                    on_retry(e)
+                await asyncio.sleep(delay)
+                continue
+            usage = getattr(response, "usage", None)
+            if usage is not None and getattr(usage, "total_tokens", None):
+                self.tokens.refund(estimate - usage.total_tokens)
+            return response
+
+    async def _admit(self, tokens, priority):
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wake = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        admitted = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._order), tokens, admitted))
+        self._wake.set()
+        await admitted
+
+    def _wait_time(self, tokens):
+        return max(
+            self._paused_until - self._clock(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+        )
+
+    async def _dispatch(self):
+        # Exits once the queue is empty; the next admission starts a new one
+        while self._waiting:
+            _, _, tokens, admitted = self._waiting[0]
+            if admitted.cancelled():
+                heapq.heappop(self._waiting)
+                continue
+            wait = self._wait_time(tokens)
+            if wait > 0:
+                # Wake early if a higher-priority request arrives
+                self._wake.clear()
+                try:
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._waiting)
+            self.requests.take(1)
+            self.tokens.take(tokens)
+            admitted.set_result(None)
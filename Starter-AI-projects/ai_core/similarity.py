@@ -0,0 +1,81 @@
+"""
+Local near-duplicate lookup for generation requests.
+
+Texts are embedded as hashed word and character n-gram counts (no model, no
+network) and kept as rows of one NumPy matrix, so a lookup is a single
+matrix-vector product. Rows are L2-normalized, which makes that product the
+cosine similarity.
+"""
+
+import re
+import threading
+import zlib
+
+import numpy as np
+
+DEFAULT_DIM = 2048
+
+
+def _features(text, n):
+    words = re.findall(r"\w+", text.lower())
+    for word in words:
+        yield "w:" + word
+        padded = f" {word} "
+        for i in range(len(padded) - n + 1):
+            yield "c:" + padded[i:i + n]
+
+
+def embed(text, dim=DEFAULT_DIM, n=3):
+    """Unit-length hashed n-gram vector for text (all zeros for empty text)"""
+    vector = np.zeros(dim, dtype=np.float32)
+    for feature in _features(text, n):
+        # crc32 rather than hash() so vectors are stable across processes
+        vector[zlib.crc32(feature.encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SimilarityIndex:
+    """Thread-safe cosine top-k index over embedded texts with arbitrary payloads"""
+
+    def __init__(self, dim=DEFAULT_DIM, capacity=256):
+        self.dim = dim
+        self._vectors = np.zeros((capacity, dim), dtype=np.float32)
+        self._payloads = []
+        self._lock = threading.Lock()
+
+    def add(self, text, payload):
+        vector = embed(text, self.dim)
+        with self._lock:
+            size = len(self._payloads)
+            if size == len(self._vectors):
+                grown = np.zeros((size * 2, self.dim), dtype=np.float32)
+                grown[:size] = self._vectors
+                self._vectors = grown
+            self._vectors[size] = vector
+            self._payloads.append(payload)
+
+    def query(self, text, k=5, threshold=0.0, where=None):
+        """Up to k (score, payload) pairs with score >= threshold, best first
+
+        ``where`` optionally filters payloads (e.g. hard constraints that
+        similarity alone must not override).
+        """
+        vector = embed(text, self.dim)
+        with self._lock:
+            size = len(self._payloads)
+            if not size:
+                return []
+            scores = self._vectors[:size] @ vector
+            payloads = list(self._payloads)
+        results = []
+        for idx in np.argsort(-scores):
+            score = float(scores[idx])
+            if score < threshold or len(results) == k:
+                break
+            if where is None or where(payloads[idx]):
+                results.append((score, payloads[idx]))
+        return results
+
+    def __len__(self):
+        return len(self._payloads)
@@ -0,0 +1,139 @@
+"""
+Single-flight execution of identical concurrent requests.
+
+Streamlit serves every session from the same process, so when a popular
+request is submitted by several sessions at once, only the first caller (the
+leader) performs it; the others wait for the leader's result or error
+instead of sending their own API call. Streams are shared too: the leader's
+response is read by a background thread into a buffer, and every caller gets
+an iterator that replays the chunks received so far and then follows the
+stream live.
+
+A flight ends when its result is ready (or the stream is exhausted); callers
+arriving later start a new one, which is why ``ai_core.chat`` looks up the
+response cache inside the flight.
+"""
+
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Broadcast:
+    """Chunks of one streamed response, replayed to every subscriber"""
+
+    def __init__(self):
+        self.opened = threading.Event()
+        self.open_error = None
+        self.chunks = []
+        self.finished = False
+        self.error = None
+        self._changed = threading.Condition()
+
+    def append(self, chunk):
+        with self._changed:
+            self.chunks.append(chunk)
+            self._changed.notify_all()
+
+    def finish(self, error=None):
+        with self._changed:
+            self.finished = True
+            self.error = error
+            self._changed.notify_all()
+
+    def __iter__(self):
+        position = 0
+        while True:
+            with self._changed:
+                while position >= len(self.chunks) and not self.finished:
+                    self._changed.wait()
+                if position < len(self.chunks):
+                    chunk = self.chunks[position]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            position += 1
+            yield chunk
+
+
+class SingleFlight:
+    """Registry of in-flight calls keyed by request; thread-safe"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._streams = {}
+        self.shared = 0  # callers that were served by another caller's request
+
+    def _join(self, flights, key, factory):
+        with self._lock:
+            flight = flights.get(key)
+            if flight is None:
+                flight = flights[key] = factory()
+                return flight, True
+            self.shared += 1
+            return flight, False
+
+    def _end(self, flights, key):
+        with self._lock:
+            flights.pop(key, None)
+
+    def do(self, key, fn):
+        """Return ``fn()``, or the result of an identical call already in flight"""
+        call, leader = self._join(self._calls, key, _Call)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            self._end(self._calls, key)
+            call.done.set()
+        return call.result
+
+    def stream(self, key, fn):
+        """Iterator over the chunks of ``fn()``, shared with identical streams in flight.
+
+        ``fn`` opens the stream and returns an iterator; errors raised while
+        opening it are raised here for every caller.
+        """
+        broadcast, leader = self._join(self._streams, key, _Broadcast)
+        if not leader:
+            broadcast.opened.wait()
+            if broadcast.open_error is not None:
+                raise broadcast.open_error
+            return iter(broadcast)
+        try:
+            source = fn()
+        except BaseException as e:
+            broadcast.open_error = e
+            self._end(self._streams, key)
+            raise
+        finally:
+            broadcast.opened.set()
+        threading.Thread(target=self._pump, args=(key, source, broadcast), name="singleflight-stream",
+                         daemon=True).start()
+        return iter(broadcast)
+
+    def _pump(self, key, source, broadcast):
+        # Read the stream to the end even if the leader stops listening
+        error = None
+        try:
+            for chunk in source:
+                broadcast.append(chunk)
+        except Exception as e:
+            error = e
+        finally:
+            self._end(self._streams, key)
+            broadcast.finish(error)
@@ -0,0 +1,265 @@
+"""
+Persistent per-user storage for history, favorites and small app state.
+
+Backed by one SQLite database in WAL mode so every Streamlit session and
+process can read while another writes. Writes are queued and flushed in
+batches (when the batch is full, every ``flush_interval`` seconds from a
+background thread, or before any read), and the apps read paginated slices
+instead of keeping whole histories in session memory.
+
+History entries are also indexed in an FTS5 table (params and generated text)
+so old recipes and plans can be found by ingredient, cuisine, goal, equipment
+or free text instead of being regenerated.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from .lazy import once
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "hands-on-ai", "app.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    app TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    params TEXT NOT NULL,
+    content TEXT NOT NULL,
+    structured TEXT
+);
+CREATE INDEX IF NOT EXISTS history_user ON history (user_id, app, id);
+
+CREATE TABLE IF NOT EXISTS favorites (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL,
+    app TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    content TEXT NOT NULL,
+    structured TEXT
+);
+CREATE INDEX IF NOT EXISTS favorites_user ON favorites (user_id, app, id);
+
+CREATE TABLE IF NOT EXISTS app_state (
+    user_id TEXT NOT NULL,
+    app TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (user_id, app, name)
+);
+"""
+
+# rowid mirrors history.id; porter stemming lets "tomato" match "tomatoes"
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE history_fts USING fts5(params, content, tokenize = 'porter unicode61')
+"""
+
+_INSERT_FTS = "INSERT INTO history_fts (rowid, params, content) VALUES (last_insert_rowid(), ?, ?)"
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _loads(value):
+    return json.loads(value) if value is not None else None
+
+
+def _params_text(params):
+    """Flatten param values (not keys) into searchable text"""
+    parts = []
+    for value in params.values():
+        if isinstance(value, (list, tuple)):
+            parts.extend(str(v) for v in value)
+        elif value is not None:
+            parts.append(str(value))
+    return " ".join(parts)
+
+
+def fts_query(text):
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix"""
+    words = re.findall(r"\w+", text.lower())
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def _history_entry(row):
+    return {"id": row[0], "timestamp": row[1], **json.loads(row[2]), "content": row[3], "structured": _loads(row[4])}
+
+
+class Store:
+    """SQLite-backed history/favorites/state store with batched writes"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH, batch_size=20, flush_interval=2.0):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._lock = threading.RLock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._init_search()
+        self._stop = threading.Event()
+        self._flusher = None
+        if flush_interval:
+            self._flusher = threading.Thread(target=self._flush_periodically, name="store-flusher", daemon=True)
+            self._flusher.start()
+
+    def _init_search(self):
+        """Create the FTS index, backfilling it from existing history on first use"""
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'history_fts'"
+        ).fetchone()
+        if exists:
+            return
+        with self._conn:
+            self._conn.execute(_FTS_SCHEMA)
+            rows = self._conn.execute("SELECT id, params, content FROM history").fetchall()
+            self._conn.executemany(
+                "INSERT INTO history_fts (rowid, params, content) VALUES (?, ?, ?)",
+                [(row[0], _params_text(json.loads(row[1])), row[2]) for row in rows],
+            )
+
+    # -- writes -----------------------------------------------------------------
+
+    def _queue(self, *statements):
+        """Queue (sql, params) pairs; pairs queued together are flushed together"""
+        with self._lock:
+            self._pending.extend(statements)
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+
+    def flush(self):
+        """Write all queued changes in one transaction"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            with self._conn:
+                for sql, params in pending:
+                    self._conn.execute(sql, params)
+
+    def _flush_periodically(self):
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def add_history(self, user_id, app, params, content, structured=None):
+        self._queue(
+            ("INSERT INTO history (user_id, app, created_at, params, content, structured) VALUES (?, ?, ?, ?, ?, ?)",
+             (user_id, app, params.get("timestamp") or _now(), json.dumps(params), content,
+              json.dumps(structured) if structured is not None else None)),
+            # Must directly follow the history insert for last_insert_rowid()
+            (_INSERT_FTS, (_params_text(params), content)),
+        )
+
+    def add_favorite(self, user_id, app, content, structured=None):
+        self._queue((
+            "INSERT INTO favorites (user_id, app, created_at, content, structured) VALUES (?, ?, ?, ?, ?)",
+            (user_id, app, _now(), content, json.dumps(structured) if structured is not None else None),
+        ))
+
+    def remove_favorite(self, user_id, favorite_id):
+        self._queue(("DELETE FROM favorites WHERE user_id = ? AND id = ?", (user_id, favorite_id)))
+
+    def save_value(self, user_id, app, name, value):
+        self._queue((
+            "INSERT OR REPLACE INTO app_state (user_id, app, name, value) VALUES (?, ?, ?, ?)",
+            (user_id, app, name, json.dumps(value)),
+        ))
+
+    # -- reads ------------------------------------------------------------------
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            self.flush()
+            return self._conn.execute(sql, params).fetchall()
+
+    def history(self, user_id, app, limit=5, offset=0):
+        """Newest-first page of history entries as dicts"""
+        rows = self._query(
+            """SELECT id, created_at, params, content, structured FROM history
+               WHERE user_id = ? AND app = ? ORDER BY id DESC LIMIT ? OFFSET ?""",
+            (user_id, app, limit, offset),
+        )
+        return [_history_entry(row) for row in rows]
+
+    def recent_history(self, app, limit=1000):
+        """Newest history entries of an app across all users (to warm shared indexes)"""
+        rows = self._query(
+            """SELECT id, created_at, params, content, structured FROM history
+               WHERE app = ? ORDER BY id DESC LIMIT ?""",
+            (app, limit),
+        )
+        return [_history_entry(row) for row in rows]
+
+    def search(self, user_id, app, text, limit=10):
+        """Best-matching history entries for free text, ranked by BM25"""
+        query = fts_query(text)
+        if query is None:
+            return []
+        # Params (ingredients, cuisine, goal, equipment) weigh more than body text
+        rows = self._query(
+            """SELECT h.id, h.created_at, h.params, h.content, h.structured
+               FROM history_fts JOIN history h ON h.id = history_fts.rowid
+               WHERE history_fts MATCH ? AND h.user_id = ? AND h.app = ?
+               ORDER BY bm25(history_fts, 4.0, 1.0) LIMIT ?""",
+            (query, user_id, app, limit),
+        )
+        return [_history_entry(row) for row in rows]
+
+    def count_history(self, user_id, app):
+        return self._query("SELECT COUNT(*) FROM history WHERE user_id = ? AND app = ?", (user_id, app))[0][0]
+
+    def favorites(self, user_id, app, limit=10, offset=0):
+        """Oldest-first page of favorites as dicts"""
+        rows = self._query(
+            """SELECT id, created_at, content, structured FROM favorites
+               WHERE user_id = ? AND app = ? ORDER BY id LIMIT ? OFFSET ?""",
+            (user_id, app, limit, offset),
+        )
+        return [
+            {"id": row[0], "timestamp": row[1], "content": row[2], "structured": _loads(row[3])}
+            for row in rows
+        ]
+
+    def count_favorites(self, user_id, app):
+        return self._query("SELECT COUNT(*) FROM favorites WHERE user_id = ? AND app = ?", (user_id, app))[0][0]
+
+    def has_favorite(self, user_id, app, content):
+        return bool(self._query(
+            "SELECT 1 FROM favorites WHERE user_id = ? AND app = ? AND content = ? LIMIT 1",
+            (user_id, app, content),
+        ))
+
+    def load_value(self, user_id, app, name, default=None):
+        rows = self._query(
+            "SELECT value FROM app_state WHERE user_id = ? AND app = ? AND name = ?", (user_id, app, name)
+        )
+        return json.loads(rows[0][0]) if rows else default
+
+    def close(self):
+        self._stop.set()
+        if self._flusher is not None:
+            self._flusher.join(timeout=5)
+        self.flush()
+        self._conn.close()
+
+
+def store_from_env():
+    """Open the store at APP_STORE_PATH (default under ~/.cache/hands-on-ai)"""
+    return Store(os.getenv("APP_STORE_PATH", DEFAULT_STORE_PATH))
+
+
+shared_store = once(store_from_env)
@@ -0,0 +1,121 @@
+"""
+Unit tests for offline cache warming
+Run with: pytest ai_core/test_batch.py
+"""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from ai_core import chat
+from ai_core.batch import (
+    collect_requests, read_param_sets, request_key, run_pool, store_batch_output,
+    uncached, write_batch_file,
+)
+from ai_core.cache import MemoryCache
+
+
+def build_requests(params):
+    return [{
+        "messages": [{"role": "user", "content": f"Recipe with {params['ingredients']}"}],
+        "model": "gpt-4o-mini",
+        "temperature": 0.8,
+        "max_tokens": 100,
+    }]
+
+
+def make_client(fail_on=None, finish_reason="stop"):
+    def create(**params):
+        content = params["messages"][-1]["content"]
+        if content == fail_on:
+            raise RuntimeError("API Error")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content.upper()),
+                                                        finish_reason=finish_reason)])
+
+    client = Mock()
+    client.chat.completions.create.side_effect = create
+    return client
+
+
+class TestRequests:
+    """Test reading, de-duplicating and filtering parameter sets"""
+
+    def test_read_jsonl_and_csv(self, tmp_path):
+        jsonl = tmp_path / "params.jsonl"
+        jsonl.write_text('{"ingredients": "rice"}\n\n{"ingredients": "eggs"}\n')
+        csv_file = tmp_path / "params.csv"
+        csv_file.write_text("ingredients,servings\nrice,2\n")
+        assert read_param_sets(str(jsonl)) == [{"ingredients": "rice"}, {"ingredients": "eggs"}]
+        assert read_param_sets(str(csv_file)) == [{"ingredients": "rice", "servings": "2"}]
+
+    def test_duplicates_collapse(self):
+        requests = collect_requests(
+            [{"ingredients": "rice"}, {"ingredients": "eggs"}, {"ingredients": "rice"}], build_requests
+        )
+        assert len(requests) == 2
+
+    def test_key_matches_chat_cache_key(self):
+        request = build_requests({"ingredients": "rice"})[0]
+        cache = MemoryCache()
+        chat.complete(make_client(), cache=cache, **request)
+        assert cache.get(request_key(request)) == "RECIPE WITH RICE"
+
+    def test_key_ignores_budget_of_continued_requests(self):
+        request = dict(build_requests({"ingredients": "rice"})[0], max_continuations=2)
+        assert request_key(request) == request_key(dict(request, max_tokens=500))
+
+    def test_cached_requests_are_skipped(self):
+        requests = collect_requests([{"ingredients": "rice"}, {"ingredients": "eggs"}], build_requests)
+        cache = MemoryCache()
+        cache.set(next(iter(requests)), "cached")
+        assert list(uncached(requests, cache)) == list(requests)[1:]
+
+
+class TestPool:
+    """Test warming through the worker pool"""
+
+    def test_answers_are_cached_and_failures_reported(self):
+        requests = collect_requests([{"ingredients": "rice"}, {"ingredients": "eggs"}], build_requests)
+        cache = MemoryCache()
+        failures = run_pool(make_client(fail_on="Recipe with eggs"), requests, cache, max_workers=2)
+        rice, eggs = list(requests)
+        assert cache.get(rice) == "RECIPE WITH RICE"
+        assert list(failures) == [eggs]
+        assert cache.get(eggs) is None
+
+    def test_cut_off_answers_are_not_cached(self):
+        params = [{"ingredients": "rice"}]
+        requests = collect_requests(params, lambda p: [dict(r, max_continuations=1) for r in build_requests(p)])
+        cache = MemoryCache()
+        failures = run_pool(make_client(finish_reason="length"), requests, cache)
+        key = next(iter(requests))
+        assert cache.get(key) is None
+        assert failures == {key: "Answer cut off by max_tokens"}
+        assert uncached(requests, cache) == requests
+
+
+class TestBatchApi:
+    """Test the Batch API input and output formats"""
+
+    def test_input_file_uses_cache_keys(self, tmp_path):
+        requests = collect_requests([{"ingredients": "rice"}], build_requests)
+        path = tmp_path / "batch.jsonl"
+        write_batch_file(requests, str(path))
+        line = json.loads(path.read_text())
+        assert line["custom_id"] == next(iter(requests))
+        assert line["url"] == "/v1/chat/completions"
+        assert line["body"]["max_tokens"] == 100
+
+    def test_output_is_stored(self):
+        ok = {"custom_id": "a", "error": None, "response": {
+            "status_code": 200, "body": {"choices": [{"message": {"content": "Recipe A"}}]}
+        }}
+        failed = {"custom_id": "b", "error": None, "response": {"status_code": 429, "body": {}}}
+        cut_off = {"custom_id": "c", "error": None, "response": {
+            "status_code": 200, "body": {"choices": [{"message": {"content": "Rec"}, "finish_reason": "length"}]}
+        }}
+        cache = MemoryCache()
+        assert store_batch_output("\n".join(json.dumps(r) for r in (ok, failed, cut_off)), cache) == (1, 2)
+        assert cache.get("a") == "Recipe A"
+        assert cache.get("b") is None
+        assert cache.get("c") is None
@@ -0,0 +1,128 @@
+"""
+Unit tests for adaptive max_tokens budgets and continuation of cut-off answers
+Run with: pytest ai_core/test_budgets.py
+"""
+
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+from ai_core import chat
+from ai_core.budgets import BudgetRule, TokenBudgets
+from ai_core.cache import MemoryCache
+
+MESSAGES = [{"role": "user", "content": "Plan 7 days of meals"}]
+
+
+def response(content, finish_reason="stop", completion_tokens=None):
+    usage = SimpleNamespace(completion_tokens=completion_tokens) if completion_tokens else None
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)],
+        usage=usage,
+    )
+
+
+def stream_chunks(parts, finish_reason="stop"):
+    chunks = [SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p), finish_reason=None)])
+              for p in parts]
+    chunks.append(SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None),
+                                                           finish_reason=finish_reason)]))
+    return iter(chunks)
+
+
+class TestTokenBudgets:
+    """Test estimates from rules and from recorded completions"""
+
+    def test_rule_estimate_is_rounded_and_clamped(self):
+        budgets = TokenBudgets({"plan": BudgetRule(base=200, per_unit=300, ceiling=2048)}, step=128)
+        assert budgets.estimate("plan", 1) == 512
+        assert budgets.estimate("plan", 3) == 1152
+        assert budgets.estimate("plan", 7) == 2048
+
+    def test_history_replaces_rule(self):
+        budgets = TokenBudgets({"plan": BudgetRule(base=2000)}, min_samples=3, headroom=1.0, step=100)
+        for tokens in (300, 400, 500):
+            budgets.record("plan", 1, tokens)
+        assert budgets.estimate("plan", 1) == 500
+        assert budgets.estimate("plan", 2) == 1000
+
+    def test_too_few_samples_use_rule(self):
+        budgets = TokenBudgets({"plan": BudgetRule(base=2000)}, min_samples=5)
+        budgets.recorder("plan")(100)
+        assert budgets.estimate("plan") == 2048
+
+    def test_unknown_kinds_are_not_recorded(self):
+        budgets = TokenBudgets({"plan": BudgetRule(base=2000)})
+        budgets.record("other", 1, 100)
+        assert "other" not in budgets.rules
+
+
+class TestContinuation:
+    """Test resuming answers cut off by max_tokens"""
+
+    def test_complete_continues_cut_off_answers(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [
+            response("Day 1 ... Day 4", "length", 100),
+            response(" Day 5 ... Day 7", "stop", 60),
+        ]
+        used = []
+        text = chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 100, max_continuations=2,
+                             record_usage=used.append)
+        assert text == "Day 1 ... Day 4 Day 5 ... Day 7"
+        assert used == [160]
+        resumed = client.chat.completions.create.call_args.kwargs["messages"]
+        assert resumed[1] == {"role": "assistant", "content": "Day 1 ... Day 4"}
+        assert resumed[2]["content"] == chat.CONTINUE_PROMPT
+
+    def test_continuations_are_limited(self):
+        client = Mock()
+        client.chat.completions.create.return_value = response("more", "length")
+        assert chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 10, max_continuations=1) == "moremore"
+        assert client.chat.completions.create.call_count == 2
+
+    def test_without_continuations_cut_off_answers_are_returned(self):
+        client = Mock()
+        client.chat.completions.create.return_value = response("Day 1", "length")
+        assert chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 10) == "Day 1"
+        assert client.chat.completions.create.call_count == 1
+
+    def test_cut_off_answers_are_not_cached(self):
+        client = Mock()
+        client.chat.completions.create.return_value = response('{"name": "Pasta", "ingr', "length")
+        cache = MemoryCache()
+        used = []
+        for _ in range(2):
+            text = chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 10, cache=cache, record_usage=used.append)
+            assert text == '{"name": "Pasta", "ingr'
+        assert client.chat.completions.create.call_count == 2
+        assert cache.get(chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 10)) is None
+        assert used == []
+
+    def test_cut_off_streams_are_not_cached(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [
+            stream_chunks(["Day 1"], "length"),
+            stream_chunks([" Day 2"], "length"),
+        ]
+        cache = MemoryCache()
+        used = []
+        chunks = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 100, cache=cache, max_continuations=1,
+                             record_usage=used.append)
+        assert "".join(chunks) == "Day 1 Day 2"
+        assert cache.get(chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 100, 1)) is None
+        assert used == []
+
+    def test_stream_continues_cut_off_answers(self):
+        client = Mock()
+        client.chat.completions.create.side_effect = [
+            stream_chunks(["Day 1", " Day 2"], "length"),
+            stream_chunks([" Day 3"]),
+        ]
+        cache = MemoryCache()
+        chunks = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 100, cache=cache, max_continuations=2)
+        assert "".join(chunks) == "Day 1 Day 2 Day 3"
+        assert cache.get(chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 100, 2)) == "Day 1 Day 2 Day 3"
+
+    def test_budget_does_not_change_key_of_continued_requests(self):
+        assert chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 500, 2) == chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 900, 2)
+        assert chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 500) != chat.cache_key("gpt-4o-mini", MESSAGES, 0.7, 900)
@@ -0,0 +1,115 @@
+"""
+Unit tests for the response cache and the cached chat wrappers
+Run with: pytest ai_core/test_cache.py
+"""
+
+import time
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from ai_core import chat
+from ai_core.cache import MemoryCache, SQLiteCache, make_cache_key
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a chef."},
+    {"role": "user", "content": "Ingredients: chicken, rice"},
+]
+
+
+def make_client(content="Recipe: Test Recipe"):
+    client = Mock()
+    client.chat.completions.create.return_value = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content))]
+    )
+    return client
+
+
+def make_stream_client(parts):
+    client = Mock()
+    client.chat.completions.create.return_value = iter([
+        SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+        for part in parts
+    ])
+    return client
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def cache(request, tmp_path):
+    if request.param == "memory":
+        return MemoryCache(max_entries=2, ttl=60)
+    return SQLiteCache(str(tmp_path / "cache.sqlite3"), max_entries=2, ttl=60)
+
+
+class TestCacheKey:
+    """Test suite for cache key normalization"""
+
+    def test_whitespace_does_not_change_key(self):
+        spaced = [
+            {"role": "system", "content": "You are   a chef.\n"},
+            {"role": "user", "content": "Ingredients:  chicken,\trice"},
+        ]
+        assert make_cache_key("gpt-4o-mini", MESSAGES, 0.8, 2000) == \
+            make_cache_key("gpt-4o-mini", spaced, 0.8, 2000)
+
+    def test_parameters_change_key(self):
+        base = make_cache_key("gpt-4o-mini", MESSAGES, 0.8, 2000)
+        assert base != make_cache_key("gpt-4o", MESSAGES, 0.8, 2000)
+        assert base != make_cache_key("gpt-4o-mini", MESSAGES, 0.7, 2000)
+        assert base != make_cache_key("gpt-4o-mini", MESSAGES, 0.8, 2500)
+
+
+class TestBackends:
+    """Test suite shared by the memory and SQLite backends"""
+
+    def test_set_and_get(self, cache):
+        cache.set("a", "recipe")
+        assert cache.get("a") == "recipe"
+        assert cache.get("missing") is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_lru_eviction(self, cache):
+        cache.set("a", "1")
+        time.sleep(0.01)
+        cache.set("b", "2")
+        time.sleep(0.01)
+        cache.get("a")
+        time.sleep(0.01)
+        cache.set("c", "3")
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+
+    def test_ttl_expiry(self, cache):
+        cache.set("a", "1", ttl=-1)
+        assert cache.get("a") is None
+
+    def test_sqlite_shared_between_instances(self, tmp_path):
+        path = str(tmp_path / "shared.sqlite3")
+        SQLiteCache(path).set("a", "recipe")
+        assert SQLiteCache(path).get("a") == "recipe"
+
+
+class TestCachedChat:
+    """Test suite for chat.complete / chat.stream with a cache"""
+
+    def test_complete_uses_cache(self):
+        client = make_client()
+        cache = MemoryCache()
+        first = chat.complete(client, MESSAGES, "gpt-4o-mini", 0.8, 2000, cache=cache)
+        second = chat.complete(client, MESSAGES, "gpt-4o-mini", 0.8, 2000, cache=cache)
+        assert first == second == "Recipe: Test Recipe"
+        assert client.chat.completions.create.call_count == 1
+
+    def test_stream_stores_full_text(self):
+        cache = MemoryCache()
+        client = make_stream_client(["# Pasta", "\n", "Boil water"])
+        chunks = list(chat.stream(client, MESSAGES, "gpt-4o-mini", 0.8, 2000, cache=cache))
+        assert chunks == ["# Pasta", "\n", "Boil water"]
+
+        replay = list(chat.stream(client, MESSAGES, "gpt-4o-mini", 0.8, 2000, cache=cache))
+        assert replay == ["# Pasta\nBoil water"]
+        assert client.chat.completions.create.call_count == 1
@@ -0,0 +1,134 @@
+"""
+Unit tests for the shared async client pool
+Run with: pytest ai_core/test_client.py
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from ai_core import chat
+from ai_core.client import ClientConfig, ClientPool
+from ai_core.fanout import FanOut
+
+
+class FakeAsyncClient:
+    """Stand-in for AsyncOpenAI that records peak concurrency"""
+
+    def __init__(self, delay=0.02, fail=False, cancel_stream=False):
+        self.delay = delay
+        self.fail = fail
+        self.cancel_stream = cancel_stream
+        self.active = 0
+        self.peak = 0
+        self.calls = 0
+        self.threads = set()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **params):
+        self.threads.add(threading.current_thread().name)
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("API Error")
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(self.delay)
+        self.active -= 1
+        content = params["messages"][-1]["content"]
+        if params.get("stream"):
+            return self._stream(content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def _stream(self, content):
+        for word in content.split():
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word))])
+            if self.cancel_stream:
+                raise asyncio.CancelledError
+
+
+@pytest.fixture
+def fake():
+    return FakeAsyncClient()
+
+
+@pytest.fixture
+def pool(fake):
+    pool = ClientPool(config=ClientConfig(max_concurrency=2), client=fake)
+    yield pool
+    pool.close()
+
+
+def request(text):
+    return dict(model="gpt-4o-mini", messages=[{"role": "user", "content": text}], temperature=0, max_tokens=10)
+
+
+class TestClientPool:
+    """Test suite for ClientPool"""
+
+    def test_blocking_create_runs_on_pool_thread(self, pool, fake):
+        response = pool.chat.completions.create(**request("hello"))
+        assert response.choices[0].message.content == "hello"
+        assert fake.threads == {"openai-client-pool"}
+
+    def test_concurrency_limit(self, pool, fake):
+        futures = [pool.submit(pool.acreate(**request(str(i)))) for i in range(6)]
+        results = [f.result().choices[0].message.content for f in futures]
+        assert results == [str(i) for i in range(6)]
+        assert fake.peak == 2
+
+    def test_identical_requests_are_coalesced(self, pool, fake):
+        futures = [pool.submit(pool.acreate(**request("same"))) for _ in range(5)]
+        assert [f.result().choices[0].message.content for f in futures] == ["same"] * 5
+        assert fake.calls == 1
+
+    def test_streaming_through_chat_helper(self, pool):
+        assert list(chat.stream(pool, request("a b c")["messages"], "gpt-4o-mini", 0, 10)) == ["a", "b", "c"]
+
+    def test_errors_are_raised_to_caller(self):
+        pool = ClientPool(client=FakeAsyncClient(fail=True))
+        try:
+            with pytest.raises(RuntimeError):
+                pool.chat.completions.create(**request("x"))
+            with pytest.raises(RuntimeError):
+                pool.chat.completions.create(stream=True, **request("x"))
+        finally:
+            pool.close()
+
+    def test_cancelled_stream_ends_the_iterator(self):
+        pool = ClientPool(client=FakeAsyncClient(cancel_stream=True))
+        try:
+            chunks = pool.chat.completions.create(stream=True, **request("a b"))
+            assert next(chunks).choices[0].delta.content == "a"
+            with pytest.raises(asyncio.CancelledError):
+                next(chunks)
+        finally:
+            pool.close()
+
+
+class TestFanOut:
+    """Test suite for concurrent fan-out"""
+
+    def test_calls_overlap(self):
+        def slow(value):
+            time.sleep(0.1)
+            return value
+
+        start = time.perf_counter()
+        with FanOut(max_workers=3) as fan:
+            for name in ("recipe", "ideas", "shopping"):
+                fan.submit(name, slow, name.upper())
+            results = dict(fan.wait())
+        assert results == {"recipe": "RECIPE", "ideas": "IDEAS", "shopping": "SHOPPING"}
+        assert time.perf_counter() - start < 0.25
+
+    def test_ready_does_not_block(self):
+        gate = threading.Event()
+        with FanOut() as fan:
+            fan.submit("slow", gate.wait)
+            assert list(fan.ready()) == []
+            gate.set()
+            assert list(fan.wait()) == [("slow", True)]
+            assert len(fan) == 0
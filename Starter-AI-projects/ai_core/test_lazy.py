@@ -0,0 +1,55 @@
+"""
+Unit tests for resources created on first use
+Run with: pytest ai_core/test_lazy.py
+"""
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from ai_core.lazy import once
+
+
+class TestOnce:
+    """Test that the factory runs once, on first use"""
+
+    def test_created_on_first_call(self):
+        factory = Mock(return_value=object())
+        getter = once(factory)
+        factory.assert_not_called()
+        assert getter() is getter()
+        assert factory.call_count == 1
+
+    def test_concurrent_first_calls_share_one_resource(self):
+        started = threading.Event()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            started.wait(1)
+            return object()
+
+        getter = once(factory)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(getter())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        started.set()
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1
+        assert len({id(r) for r in results}) == 1
+
+    def test_failed_factory_is_retried(self):
+        factory = Mock(side_effect=[RuntimeError("no key"), "client"])
+        getter = once(factory)
+        with pytest.raises(RuntimeError):
+            getter()
+        assert getter() == "client"
+
+    def test_reset(self):
+        getter = once(object)
+        first = getter()
+        getter.reset()
+        assert getter() is not first
@@ -0,0 +1,192 @@
+"""
+Unit tests for per-call latency and token metrics
+Run with: pytest ai_core/test_metrics.py
+"""
+
+import asyncio
+import json
+import threading
+import urllib.request
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from ai_core import chat, metrics
+from ai_core.cache import MemoryCache
+from ai_core.client import ClientConfig, ClientPool
+from ai_core.singleflight import SingleFlight
+
+MESSAGES = [{"role": "user", "content": "Suggest a recipe with tomatoes"}]
+
+
+def response(content, prompt_tokens=12, completion_tokens=30):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+def stream_chunks(parts):
+    return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=p), finish_reason=None)])
+                 for p in parts])
+
+
+@pytest.fixture
+def records():
+    received = []
+    hook = metrics.add_hook(received.append)
+    yield received
+    metrics.remove_hook(hook)
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class FlakyAsyncClient:
+    """Stand-in for AsyncOpenAI that rate limits the first request"""
+
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **params):
+        self.calls += 1
+        if self.calls == 1:
+            raise RateLimited("Rate limit reached")
+        await asyncio.sleep(0)
+        return response("Tomato soup")
+
+
+class TestRecords:
+    """Test what chat calls report to hooks"""
+
+    def test_no_hooks_no_records(self):
+        assert metrics.begin("recipe", "gpt-4o-mini") is None
+
+    def test_api_call_then_cache_hit(self, records):
+        client = Mock()
+        client.chat.completions.create.return_value = response("Tomato soup")
+        cache = MemoryCache()
+        for _ in range(2):
+            chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 200, cache=cache, site="suggestions")
+
+        first, second = records
+        assert (first.site, first.model, first.cached, first.requests) == ("suggestions", "gpt-4o-mini", False, 1)
+        assert (first.prompt_tokens, first.completion_tokens) == (12, 30)
+        assert first.latency > 0 and first.first_token is None
+        assert second.cached and second.requests == 0 and second.completion_tokens == 0
+
+    def test_error_is_recorded(self, records):
+        client = Mock()
+        client.chat.completions.create.side_effect = RuntimeError("API Error")
+        with pytest.raises(RuntimeError):
+            chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 200, site="recipe")
+        assert records[0].error == "RuntimeError: API Error"
+
+    def test_unlabelled_site(self, records):
+        client = Mock()
+        client.chat.completions.create.return_value = response("Tomato soup")
+        chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 200)
+        assert records[0].site == "other"
+
+    def test_stream_times_first_chunk(self, records):
+        client = Mock()
+        client.chat.completions.create.return_value = stream_chunks(["Tomato ", "soup with basil"])
+        chunks = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 200, site="recipe")
+        assert records == []  # Reported once consumed
+        assert "".join(chunks) == "Tomato soup with basil"
+
+        record = records[0]
+        assert record.stream and record.requests == 1
+        assert 0 <= record.first_token <= record.latency
+        assert record.completion_tokens == len("Tomato soup with basil") // 4
+        assert record.prompt_tokens == len(MESSAGES[0]["content"]) // 4
+
+    def test_shared_in_flight(self, records):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def held_stream():
+            yield from stream_chunks(["Tomato "])
+            release.wait(5)
+            yield from stream_chunks(["soup"])
+
+        client = Mock()
+        client.chat.completions.create.return_value = held_stream()
+        leader = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 200, flight=flight, site="recipe")
+        follower = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 200, flight=flight, site="recipe")
+        release.set()
+        assert list(follower) == list(leader) == ["Tomato ", "soup"]
+        assert sorted((r.shared, r.requests) for r in records) == [(False, 1), (True, 0)]
+
+    def test_retries_from_pool_scheduler(self, records):
+        fake = FlakyAsyncClient()
+        pool = ClientPool(config=ClientConfig(max_retries=2), client=fake)
+        pool.scheduler.base_delay = 0.01
+        try:
+            assert chat.complete(pool, MESSAGES, "gpt-4o-mini", 0.7, 200, site="suggestions") == "Tomato soup"
+        finally:
+            pool.close()
+        assert records[0].retries == 1 and records[0].requests == 1
+
+    def test_failing_hook_does_not_break_calls(self, records):
+        hook = metrics.add_hook(Mock(side_effect=RuntimeError("disk full")))
+        try:
+            client = Mock()
+            client.chat.completions.create.return_value = response("Tomato soup")
+            assert chat.complete(client, MESSAGES, "gpt-4o-mini", 0.7, 200) == "Tomato soup"
+        finally:
+            metrics.remove_hook(hook)
+        assert len(records) == 1
+
+
+class TestExporters:
+    """Test the JSONL and Prometheus exporters"""
+
+    def record(self, **fields):
+        values = {"site": "recipe", "model": "gpt-4o-mini", "latency": 1.5, "requests": 1,
+                  "prompt_tokens": 100, "completion_tokens": 400}
+        values.update(fields)
+        return metrics.CallMetrics(**values)
+
+    def test_jsonl(self, tmp_path):
+        path = tmp_path / "logs" / "metrics.jsonl"
+        exporter = metrics.JSONLExporter(str(path))
+        exporter(self.record())
+        exporter(self.record(site="suggestions", cached=True))
+        exporter.close()
+
+        lines = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [line["site"] for line in lines] == ["recipe", "suggestions"]
+        assert lines[0]["completion_tokens"] == 400 and "_start" not in lines[0]
+
+    def test_prometheus_render(self):
+        exporter = metrics.PrometheusExporter(buckets=(1.0, 2.0))
+        exporter(self.record(retries=2))
+        exporter(self.record(cached=True, requests=0, prompt_tokens=0, completion_tokens=0, latency=0.01))
+        exporter(self.record(stream=True, first_token=0.4, error="RuntimeError: API Error"))
+        text = exporter.render()
+
+        labels = 'site="recipe",model="gpt-4o-mini"'
+        assert f'llm_calls_total{{{labels},source="api"}} 2' in text
+        assert f'llm_calls_total{{{labels},source="cache"}} 1' in text
+        assert f'llm_errors_total{{{labels}}} 1' in text
+        assert f'llm_retries_total{{{labels}}} 2' in text
+        assert f'llm_tokens_total{{{labels},kind="completion"}} 800' in text
+        assert f'llm_call_duration_seconds_bucket{{{labels},le="1.0"}} 1' in text
+        assert f'llm_call_duration_seconds_bucket{{{labels},le="2.0"}} 3' in text
+        assert f'llm_call_duration_seconds_count{{{labels}}} 3' in text
+        assert f'llm_time_to_first_chunk_seconds_count{{{labels}}} 1' in text
+
+    def test_prometheus_endpoint(self):
+        exporter = metrics.PrometheusExporter()
+        exporter(self.record())
+        port = exporter.serve(0)
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+                body = resp.read().decode("utf-8")
+        finally:
+            exporter.close()
+        assert "# TYPE llm_call_duration_seconds histogram" in body
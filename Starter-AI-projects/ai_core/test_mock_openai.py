@@ -0,0 +1,101 @@
+"""
+Unit tests for the mock OpenAI server and the benchmark harness
+Run with: pytest ai_core/test_mock_openai.py
+"""
+
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from ai_core.bench import Sample, Scenario, percentile, run_load, summarize
+from ai_core.cache import MemoryCache
+from ai_core.mock_openai import MockOpenAIServer
+
+
+def post(server, body):
+    request = urllib.request.Request(
+        server.url + "/chat/completions", data=json.dumps(body).encode(), method="POST",
+        headers={"Content-Type": "application/json"},
+    )
+    return urllib.request.urlopen(request, timeout=5)
+
+
+BODY = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "Recipe please"}], "max_tokens": 100}
+
+
+@pytest.fixture
+def server():
+    with MockOpenAIServer(latency=0, token_delay=0, answer_tokens=20) as server:
+        yield server
+
+
+class TestMockServer:
+    """Test completions, streaming, truncation and 429 injection"""
+
+    def test_completion(self, server):
+        payload = json.load(post(server, BODY))
+        assert len(payload["choices"][0]["message"]["content"].split()) == 20
+        assert payload["choices"][0]["finish_reason"] == "stop"
+        assert payload["usage"]["completion_tokens"] == 20
+
+    def test_truncation_and_continuation(self, server):
+        payload = json.load(post(server, dict(BODY, max_tokens=15)))
+        assert payload["choices"][0]["finish_reason"] == "length"
+        partial = payload["choices"][0]["message"]["content"]
+        messages = BODY["messages"] + [{"role": "assistant", "content": partial},
+                                       {"role": "user", "content": "Continue"}]
+        rest = json.load(post(server, dict(BODY, messages=messages)))
+        assert len(rest["choices"][0]["message"]["content"].split()) == 5
+
+    def test_streaming(self, server):
+        events = [line[6:] for line in post(server, dict(BODY, stream=True)).read().decode().splitlines()
+                  if line.startswith("data: ")]
+        assert events[-1] == "[DONE]"
+        chunks = [json.loads(event)["choices"][0] for event in events[:-1]]
+        text = "".join(c["delta"].get("content") or "" for c in chunks)
+        assert len(text.split()) == 20
+        assert chunks[-1]["finish_reason"] == "stop"
+
+    def test_rate_limit_injection(self):
+        with MockOpenAIServer(latency=0, rate_limit=1.0, retry_after=0.25) as server:
+            with pytest.raises(urllib.error.HTTPError) as error:
+                post(server, BODY)
+        assert error.value.code == 429
+        assert error.value.headers["retry-after-ms"] == "250"
+        assert server.rejected == server.requests == 1
+
+
+class TestHarness:
+    """Test load generation and the summary"""
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 99) == 99
+        assert percentile([], 50) is None
+
+    def test_run_load(self):
+        cache = MemoryCache()
+
+        def text(client, cache, params):
+            return f"plan {params}"
+
+        def chunks(client, cache, params):
+            if params == 3:
+                raise RuntimeError("API Error")
+            return iter(["a", "b"])
+
+        scenarios = [Scenario("text", text, lambda i: i), Scenario("stream", chunks, lambda i: i)]
+        samples, elapsed = run_load(scenarios, None, cache, requests=40, concurrency=4, distinct=4)
+        summary = summarize(samples, elapsed)
+        assert summary["all"]["requests"] == 40
+        assert summary["text"]["errors"] == 0
+        assert 0 < summary["stream"]["errors"] < 20
+        assert summary["stream"]["first_chunk_p50"] is not None
+        assert summary["text"]["first_chunk_p50"] is None
+
+    def test_summary_ignores_failed_latencies(self):
+        samples = [Sample("recipe", 1.0), Sample("recipe", 9.0, error="boom")]
+        assert summarize(samples, 1.0)["recipe"]["p99"] == 1.0
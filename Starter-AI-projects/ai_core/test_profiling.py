@@ -0,0 +1,100 @@
+"""
+Unit tests for Streamlit rerun profiling
+Run with: pytest ai_core/test_profiling.py
+"""
+
+import pytest
+
+from ai_core.profiling import DISABLED, OTHER, RerunProfiler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def rerun(profiler, clock, history=0.0, favorites=0.0):
+    """One script run: 0.1 s of setup, a sidebar of 0.2 s and a tab with a history section"""
+    profiler.start()
+    clock.advance(0.1)
+    with profiler.section("sidebar"):
+        clock.advance(0.2)
+    with profiler.section("recipe"):
+        clock.advance(0.05)
+        with profiler.section("history"):
+            clock.advance(history)
+    with profiler.section("favorites"):
+        clock.advance(favorites)
+    return profiler.finish()
+
+
+class TestRerunProfiler:
+    """Test rerun and section timing"""
+
+    def test_sections_and_total(self, clock):
+        profiler = RerunProfiler(clock=clock)
+        result = rerun(profiler, clock, history=0.3)
+
+        assert result.number == 1 and not result.interrupted
+        assert result.total == pytest.approx(0.65)
+        assert result.sections == pytest.approx({"sidebar": 0.2, "recipe": 0.35, "recipe/history": 0.3,
+                                                 "favorites": 0.0})
+        assert result.other == pytest.approx(0.1)
+
+    def test_summary_ranks_slowest_first(self, clock):
+        profiler = RerunProfiler(clock=clock)
+        for favorites in (0.1, 0.5, 0.9):
+            rerun(profiler, clock, history=0.01, favorites=favorites)
+
+        rows = profiler.summary(limit=2)
+        assert [row["section"] for row in rows] == ["favorites", "sidebar"]
+        assert rows[0]["mean"] == pytest.approx(0.5)
+        assert (rows[0]["last"], rows[0]["max"], rows[0]["reruns"]) == pytest.approx((0.9, 0.9, 3))
+        assert OTHER in [row["section"] for row in profiler.summary()]
+
+    def test_section_timed_when_block_raises(self, clock):
+        profiler = RerunProfiler(clock=clock)
+        profiler.start()
+        with pytest.raises(RuntimeError):
+            with profiler.section("recipe"):
+                clock.advance(0.4)
+                raise RuntimeError("st.rerun")
+        assert profiler.finish().sections == pytest.approx({"recipe": 0.4})
+
+    def test_unfinished_rerun_kept_as_interrupted(self, clock):
+        profiler = RerunProfiler(clock=clock)
+        profiler.start()
+        clock.advance(1.0)
+        rerun(profiler, clock)
+
+        first, second = profiler.reruns
+        assert first.interrupted and first.total == pytest.approx(1.0)
+        assert not second.interrupted
+        assert profiler.totals()["interrupted"] == 1
+        assert profiler.totals()["max"] == pytest.approx(1.0)
+
+    def test_history_is_bounded(self, clock):
+        profiler = RerunProfiler(history=3, clock=clock)
+        for _ in range(5):
+            rerun(profiler, clock)
+        assert [r.number for r in profiler.reruns] == [3, 4, 5]
+        profiler.reset()
+        assert profiler.totals() is None
+
+    def test_disabled_measures_nothing(self):
+        DISABLED.start()
+        with DISABLED.section("sidebar"):
+            pass
+        assert DISABLED.finish() is None
+        assert DISABLED.summary() == [] and DISABLED.totals() is None
@@ -0,0 +1,59 @@
+"""
+Unit tests for the prompt registry
+Run with: pytest ai_core/test_prompts.py
+"""
+
+import pytest
+
+from ai_core.prompts import PROMPT_CACHE_MIN_TOKENS, PromptRegistry, PromptTemplate, count_tokens
+
+
+def template(version=1, system="You are a chef."):
+    return PromptTemplate("recipe", version, system, "Ingredients: {ingredients}")
+
+
+class TestPromptTemplate:
+    """Test the static-prefix message layout and token counts"""
+
+    def test_static_prefix_then_fields(self):
+        messages = template().messages(ingredients="rice")
+        assert messages == [
+            {"role": "system", "content": "You are a chef."},
+            {"role": "user", "content": "Ingredients: rice"},
+        ]
+
+    def test_prefix_is_identical_across_calls(self):
+        first = template().messages(ingredients="rice")
+        second = template().messages(ingredients="eggs {with braces}")
+        assert first[0]["content"] is second[0]["content"]
+        assert second[1]["content"] == "Ingredients: eggs {with braces}"
+
+    def test_token_counts(self):
+        assert count_tokens("") == 0
+        assert 0 < count_tokens("You are a chef. " * 10) < 100
+        assert not template().cacheable
+        assert template(system="word " * PROMPT_CACHE_MIN_TOKENS * 2).cacheable
+
+
+class TestPromptRegistry:
+    """Test versioned lookup and the report"""
+
+    def test_latest_version_by_default(self):
+        prompts = PromptRegistry()
+        prompts.register(template(1))
+        latest = prompts.register(template(2))
+        assert prompts.get("recipe") is latest
+        assert prompts.get("recipe", 1).version == 1
+        with pytest.raises(KeyError):
+            prompts.get("plan")
+
+    def test_versions_are_not_replaced(self):
+        prompts = PromptRegistry()
+        prompts.register(template(1))
+        with pytest.raises(ValueError):
+            prompts.register(template(1, system="Changed"))
+
+    def test_report(self):
+        prompts = PromptRegistry()
+        prompts.register(template())
+        assert prompts.report().startswith("recipe v1: ")
@@ -0,0 +1,133 @@
+"""
+Unit tests for the rate-limit-aware scheduler
+Run with: pytest ai_core/test_scheduler.py
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ai_core.scheduler import BATCH, INTERACTIVE, Scheduler, TokenBucket, is_retryable, retry_after
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class APIError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+class TestTokenBucket:
+    """Test refill, burst and refunds"""
+
+    def test_wait_and_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(60, burst_seconds=2, clock=clock)
+        assert bucket.wait_time(2) == 0
+        bucket.take(2)
+        assert bucket.wait_time(1) == pytest.approx(1.0)
+        clock.now = 1.0
+        assert bucket.wait_time(1) == 0
+
+    def test_oversized_requests_are_capped(self):
+        bucket = TokenBucket(60, burst_seconds=1, clock=FakeClock())
+        assert bucket.wait_time(1000) == 0
+
+    def test_refund(self):
+        bucket = TokenBucket(600, burst_seconds=1, clock=FakeClock())
+        bucket.take(10)
+        bucket.refund(4)
+        assert bucket.level == pytest.approx(4)
+
+    def test_unlimited(self):
+        bucket = TokenBucket(0)
+        bucket.take(10 ** 9)
+        assert bucket.wait_time(10 ** 9) == 0
+
+
+class TestErrors:
+    """Test retry classification and Retry-After parsing"""
+
+    def test_retryable(self):
+        assert is_retryable(APIError(429))
+        assert is_retryable(APIError(503))
+        assert not is_retryable(APIError(400))
+        assert not is_retryable(ValueError("bad"))
+
+    def test_retry_after_headers(self):
+        assert retry_after(APIError(429, {"retry-after-ms": "1500"})) == 1.5
+        assert retry_after(APIError(429, {"retry-after": "2"})) == 2.0
+        assert retry_after(APIError(429)) is None
+
+    def test_backoff_honors_retry_after(self):
+        scheduler = Scheduler(base_delay=0.01)
+        assert scheduler.backoff(0, APIError(429, {"retry-after": "3"})) == 3.0
+        assert 0 <= scheduler.backoff(5) <= scheduler.max_delay
+
+
+PARAMS = {"messages": [{"role": "user", "content": "hi"}], "max_tokens": 10}
+
+
+class TestScheduler:
+    """Test retries and priority lanes"""
+
+    def test_retries_rate_limits(self):
+        scheduler = Scheduler(base_delay=0.001)
+        attempts = []
+
+        async def call():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise APIError(429, {"retry-after-ms": "1"})
+            return "ok"
+
+        assert asyncio.run(scheduler.run(call, PARAMS)) == "ok"
+        assert scheduler.retries == 2
+
+    def test_gives_up_after_max_retries(self):
+        scheduler = Scheduler(max_retries=1, base_delay=0.001)
+
+        async def call():
+            raise APIError(500)
+
+        with pytest.raises(APIError):
+            asyncio.run(scheduler.run(call, PARAMS))
+        assert scheduler.retries == 1
+
+    def test_non_retryable_errors_are_raised(self):
+        scheduler = Scheduler()
+
+        async def call():
+            raise APIError(400)
+
+        with pytest.raises(APIError):
+            asyncio.run(scheduler.run(call, PARAMS))
+        assert scheduler.retries == 0
+
+    def test_interactive_lane_goes_first(self):
+        scheduler = Scheduler()
+        order = []
+
+        def call(name):
+            async def run():
+                order.append(name)
+            return run
+
+        async def main():
+            scheduler._paused_until = scheduler._clock() + 0.05
+            batch = asyncio.ensure_future(scheduler.run(call("batch"), PARAMS, BATCH))
+            await asyncio.sleep(0.01)
+            interactive = asyncio.ensure_future(scheduler.run(call("interactive"), PARAMS, INTERACTIVE))
+            await asyncio.gather(batch, interactive)
+
+        asyncio.run(main())
+        assert order == ["interactive", "batch"]
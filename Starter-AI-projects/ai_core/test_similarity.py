@@ -0,0 +1,47 @@
+"""
+Unit tests for the hashed n-gram similarity index
+Run with: pytest ai_core/test_similarity.py
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from ai_core.similarity import SimilarityIndex, embed
+
+
+class TestEmbed:
+    """Test the hashed n-gram vectors"""
+
+    def test_unit_length(self):
+        assert np.linalg.norm(embed("chicken garlic rice")) == pytest.approx(1.0)
+
+    def test_word_order_does_not_matter(self):
+        assert float(embed("chicken rice") @ embed("rice chicken")) == pytest.approx(1.0)
+
+    def test_empty_text(self):
+        assert not embed("").any()
+
+
+class TestSimilarityIndex:
+    """Test cosine top-k queries"""
+
+    def test_ranks_closest_first(self):
+        index = SimilarityIndex(capacity=1)
+        index.add("beef potato stew", "stew")
+        index.add("chicken garlic rice italian", "risotto")
+        index.add("chocolate cake", "cake")
+        results = index.query("chicken rice garlic onion italian", k=2)
+        assert [payload for _, payload in results][0] == "risotto"
+        assert len(index) == 3
+
+    def test_threshold_and_filter(self):
+        index = SimilarityIndex()
+        index.add("chicken garlic rice", {"vegan": False})
+        index.add("tofu garlic rice", {"vegan": True})
+        assert index.query("chocolate cake", threshold=0.5) == []
+        results = index.query("chicken garlic rice", where=lambda p: p["vegan"])
+        assert [payload for _, payload in results] == [{"vegan": True}]
+
+    def test_empty_index(self):
+        assert SimilarityIndex().query("anything") == []
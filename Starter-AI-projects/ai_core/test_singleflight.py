@@ -0,0 +1,130 @@
+"""
+Unit tests for single-flight deduplication
+Run with: pytest ai_core/test_singleflight.py
+"""
+
+import threading
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+
+from ai_core import chat
+from ai_core.cache import MemoryCache
+from ai_core.fanout import FanOut
+from ai_core.singleflight import SingleFlight
+
+MESSAGES = [{"role": "user", "content": "Ingredients: chicken, rice"}]
+CALLERS = 5
+
+
+def wait_for_followers(flight, count):
+    while flight.shared < count:
+        threading.Event().wait(0.001)
+
+
+class TestSingleFlight:
+    """Test sharing results, errors and streams between concurrent callers"""
+
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        calls = []
+
+        def work():
+            calls.append(1)
+            wait_for_followers(flight, CALLERS - 1)
+            return "result"
+
+        with FanOut(max_workers=CALLERS) as fan:
+            for i in range(CALLERS):
+                fan.submit(i, flight.do, "key", work)
+            results = dict(fan.wait())
+        assert len(calls) == 1
+        assert set(results.values()) == {"result"}
+
+    def test_errors_reach_every_caller(self):
+        flight = SingleFlight()
+
+        def work():
+            wait_for_followers(flight, 1)
+            raise RuntimeError("API Error")
+
+        errors = []
+
+        def call():
+            try:
+                flight.do("key", work)
+            except RuntimeError as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=call) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(errors) == 2
+
+    def test_later_calls_start_a_new_flight(self):
+        flight = SingleFlight()
+        assert flight.do("key", lambda: 1) == 1
+        assert flight.do("key", lambda: 2) == 2
+
+    def test_followers_get_every_chunk(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def source():
+            yield "a"
+            release.wait()
+            yield "b"
+
+        leader = flight.stream("key", source)
+        assert next(leader) == "a"
+        follower = flight.stream("key", lambda: pytest.fail("stream opened twice"))
+        release.set()
+        assert list(leader) == ["b"]
+        assert list(follower) == ["a", "b"]
+
+    def test_stream_open_error_is_raised(self):
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("API Error")
+
+        with pytest.raises(RuntimeError):
+            flight.stream("key", fail)
+        assert list(flight.stream("key", lambda: iter(["ok"]))) == ["ok"]
+
+
+class TestChat:
+    """Test deduplication in the chat wrappers"""
+
+    def test_concurrent_completions_share_one_request(self):
+        flight = SingleFlight()
+
+        def create(**params):
+            wait_for_followers(flight, CALLERS - 1)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Recipe"))])
+
+        client = Mock()
+        client.chat.completions.create.side_effect = create
+        cache = MemoryCache()
+        with FanOut(max_workers=CALLERS) as fan:
+            for i in range(CALLERS):
+                fan.submit(i, chat.complete, client, MESSAGES, "gpt-4o-mini", 0.7, 100, cache=cache, flight=flight)
+            results = dict(fan.wait())
+        assert client.chat.completions.create.call_count == 1
+        assert set(results.values()) == {"Recipe"}
+
+    def test_finished_stream_is_served_from_cache(self):
+        client = Mock()
+        client.chat.completions.create.return_value = iter([
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=part))])
+            for part in ("Re", "cipe")
+        ])
+        cache = MemoryCache()
+        flight = SingleFlight()
+        chunks = chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 100, cache=cache, flight=flight)
+        assert "".join(chunks) == "Recipe"
+        assert list(chat.stream(client, MESSAGES, "gpt-4o-mini", 0.7, 100, cache=cache, flight=flight)) == ["Recipe"]
+        assert client.chat.completions.create.call_count == 1
@@ -0,0 +1,126 @@
+"""
+Unit tests for the persistent history/favorites store
+Run with: pytest ai_core/test_storage.py
+"""
+
+import pytest
+
+from ai_core.storage import Store
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "app.sqlite3"), batch_size=3, flush_interval=0)
+    yield store
+    store.close()
+
+
+def add_entries(store, count, app="recipe", user_id="u1"):
+    for i in range(count):
+        store.add_history(user_id, app, {"cuisine": f"C{i}"}, f"Recipe {i}")
+
+
+class TestHistory:
+    """Test batched writes and paginated reads"""
+
+    def test_writes_are_batched(self, store):
+        store.add_favorite("u1", "recipe", "Recipe A")
+        store.add_favorite("u1", "recipe", "Recipe B")
+        assert len(store._pending) == 2
+        store.add_favorite("u1", "recipe", "Recipe C")
+        assert store._pending == []
+
+    def test_pages_are_newest_first(self, store):
+        add_entries(store, 7)
+        first = store.history("u1", "recipe", limit=5)
+        second = store.history("u1", "recipe", limit=5, offset=5)
+        assert [e["content"] for e in first] == [f"Recipe {i}" for i in range(6, 1, -1)]
+        assert [e["content"] for e in second] == ["Recipe 1", "Recipe 0"]
+        assert first[0]["cuisine"] == "C6"
+        assert store.count_history("u1", "recipe") == 7
+
+    def test_users_and_apps_are_separate(self, store):
+        add_entries(store, 2)
+        add_entries(store, 1, app="workout")
+        add_entries(store, 4, user_id="u2")
+        assert store.count_history("u1", "recipe") == 2
+        assert store.count_history("u1", "workout") == 1
+        assert store.count_history("u2", "recipe") == 4
+
+    def test_structured_round_trip(self, store):
+        store.add_history("u1", "recipe", {}, "Recipe", structured={"title": "Soup"})
+        assert store.history("u1", "recipe")[0]["structured"] == {"title": "Soup"}
+
+
+class TestFavoritesAndState:
+    """Test favorites and saved values"""
+
+    def test_add_and_remove_favorite(self, store):
+        store.add_favorite("u1", "recipe", "Recipe A")
+        store.add_favorite("u1", "recipe", "Recipe B")
+        assert store.has_favorite("u1", "recipe", "Recipe A")
+        favorites = store.favorites("u1", "recipe")
+        assert [f["content"] for f in favorites] == ["Recipe A", "Recipe B"]
+
+        store.remove_favorite("u1", favorites[0]["id"])
+        assert not store.has_favorite("u1", "recipe", "Recipe A")
+        assert store.count_favorites("u1", "recipe") == 1
+
+    def test_save_and_load_value(self, store):
+        assert store.load_value("u1", "recipe", "pantry", []) == []
+        store.save_value("u1", "recipe", "pantry", [{"name": "rice"}])
+        store.save_value("u1", "recipe", "pantry", [{"name": "eggs"}])
+        assert store.load_value("u1", "recipe", "pantry") == [{"name": "eggs"}]
+
+    def test_persists_across_instances(self, tmp_path):
+        path = str(tmp_path / "app.sqlite3")
+        first = Store(path, flush_interval=0)
+        add_entries(first, 2)
+        first.close()
+
+        second = Store(path, flush_interval=0)
+        assert second.count_history("u1", "recipe") == 2
+        second.close()
+
+
+class TestSearch:
+    """Test full-text search over history"""
+
+    def test_matches_params_and_content(self, store):
+        store.add_history("u1", "recipe", {"ingredients": "chicken, rice", "cuisine": "Thai"}, "Green curry")
+        store.add_history("u1", "recipe", {"ingredients": "beef, potatoes", "cuisine": "Irish"}, "Beef stew")
+        assert [e["content"] for e in store.search("u1", "recipe", "thai")] == ["Green curry"]
+        assert [e["content"] for e in store.search("u1", "recipe", "potato stew")] == ["Beef stew"]
+        assert store.search("u1", "recipe", "chicken stew") == []
+
+    def test_last_word_is_a_prefix(self, store):
+        store.add_history("u1", "workout", {"goal": "Muscle Gain", "equipment": ["Dumbbells"]}, "Plan")
+        assert len(store.search("u1", "workout", "dumb")) == 1
+
+    def test_params_rank_above_content(self, store):
+        store.add_history("u1", "recipe", {"cuisine": "Italian"}, "Garlic bread with a side of salad and soup")
+        store.add_history("u1", "recipe", {"ingredients": "garlic", "cuisine": "Italian"}, "Pasta")
+        assert store.search("u1", "recipe", "garlic")[0]["content"] == "Pasta"
+
+    def test_scoped_to_user_and_app(self, store):
+        store.add_history("u1", "recipe", {"cuisine": "Thai"}, "Curry")
+        store.add_history("u2", "recipe", {"cuisine": "Thai"}, "Curry")
+        assert len(store.search("u1", "recipe", "thai")) == 1
+        assert store.search("u1", "workout", "thai") == []
+
+    def test_punctuation_is_ignored(self, store):
+        store.add_history("u1", "recipe", {"cuisine": "Thai"}, "Curry")
+        assert len(store.search("u1", "recipe", 'thai"*(')) == 1
+        assert store.search("u1", "recipe", "  ,. ") == []
+
+    def test_index_is_backfilled(self, tmp_path):
+        path = str(tmp_path / "app.sqlite3")
+        first = Store(path, flush_interval=0)
+        first.add_history("u1", "recipe", {"cuisine": "Thai"}, "Curry")
+        first.flush()
+        first._conn.execute("DROP TABLE history_fts")
+        first.close()
+
+        second = Store(path, flush_interval=0)
+        assert len(second.search("u1", "recipe", "curry")) == 1
+        second.close()
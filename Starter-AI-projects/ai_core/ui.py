@@ -0,0 +1,95 @@
+"""
+Streamlit helpers shared by the apps.
+
+Kept separate from the rest of ``ai_core`` so workers, CLIs and tests can use
+the other modules without importing Streamlit.
+"""
+
+import os
+import uuid
+
+import streamlit as st
+
+from .profiling import DISABLED, RerunProfiler
+
+
+def get_user_id():
+    """Stable id for the current browser user, kept in the ``uid`` query parameter.
+
+    Bookmarking or reloading the page keeps the id, so stored history survives
+    reconnects and server restarts.
+    """
+    if "user_id" not in st.session_state:
+        user_id = st.query_params.get("uid")
+        if not user_id:
+            user_id = uuid.uuid4().hex
+            st.query_params["uid"] = user_id
+        st.session_state.user_id = user_id
+    return st.session_state.user_id
+
+
+def pager(label, total, page_size, key):
+    """Render previous/next controls and return the offset of the current page"""
+    pages = max(1, (total + page_size - 1) // page_size)
+    page = min(st.session_state.get(key, 0), pages - 1)
+    if pages > 1:
+        col_prev, col_info, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀", key=f"{key}_prev", disabled=page == 0, use_container_width=True):
+                page -= 1
+        with col_next:
+            if st.button("▶", key=f"{key}_next", disabled=page >= pages - 1, use_container_width=True):
+                page += 1
+        with col_info:
+            st.caption(f"{label} page {page + 1} of {pages}")
+    st.session_state[key] = page
+    return page * page_size
+
+
+def reported(action, fn, *args, **kwargs):
+    """Return ``fn(*args, **kwargs)``, or show ``Error <action>: ...`` and return None if it raises"""
+    try:
+        return fn(*args, **kwargs)
+    except Exception as e:
+        st.error(f"Error {action}: {str(e)}")
+        return None
+
+
+def rerun_profiler():
+    """This session's ``RerunProfiler``, started for the current rerun (see ai_core/profiling.py)
+
+    Enabled by PROFILE_RERUNS=1 or a ``?profile=1`` URL; otherwise a disabled
+    profiler that measures nothing is returned.
+    """
+    if os.getenv("PROFILE_RERUNS") != "1" and st.query_params.get("profile") != "1":
+        return DISABLED
+    if "rerun_profiler" not in st.session_state:
+        st.session_state.rerun_profiler = RerunProfiler()
+    profiler = st.session_state.rerun_profiler
+    profiler.start()
+    return profiler
+
+
+def profile_panel(profiler, limit=10):
+    """Finish the rerun and show the slowest sections in a sidebar debug panel"""
+    if profiler.finish() is None:
+        return
+    totals = profiler.totals()
+    with st.sidebar.expander("⏱️ Rerun profile", expanded=True):
+        st.caption(
+            f"Rerun {profiler.count}: {totals['last'] * 1000:.0f} ms · mean {totals['mean'] * 1000:.0f} ms · "
+            f"max {totals['max'] * 1000:.0f} ms over the last {totals['reruns']} reruns"
+            + (f" ({totals['interrupted']} interrupted)" if totals["interrupted"] else "")
+        )
+        st.table([
+            {
+                "Section": row["section"],
+                "Last (ms)": f"{row['last'] * 1000:.1f}",
+                "Mean (ms)": f"{row['mean'] * 1000:.1f}",
+                "Max (ms)": f"{row['max'] * 1000:.1f}",
+                "Reruns": row["reruns"]
+            }
+            for row in profiler.summary(limit)
+        ])
+        if st.button("Reset profile", key="reset_rerun_profile", use_container_width=True):
+            profiler.reset()